@@ -5,7 +5,9 @@ from app.prompts.followup import FOLLOWUP_GENERATOR
 from app.prompts.intent import INTENT_CLASSIFIER
 from app.prompts.recommender import (
     RECOMMENDER_SYSTEM,
+    RECOMMENDER_SYSTEM_INDEXED,
     RECOMMENDER_USER_TEMPLATE,
+    RECOMMENDER_USER_TEMPLATE_INDEXED,
     FALLBACK_NO_KEYWORDS,
     FALLBACK_NO_PRODUCTS,
 )
@@ -18,6 +20,8 @@ __all__ = [
     "FOLLOWUP_GENERATOR",
     "RECOMMENDER_SYSTEM",
     "RECOMMENDER_USER_TEMPLATE",
+    "RECOMMENDER_SYSTEM_INDEXED",
+    "RECOMMENDER_USER_TEMPLATE_INDEXED",
     "FALLBACK_NO_KEYWORDS",
     "FALLBACK_NO_PRODUCTS",
 ]
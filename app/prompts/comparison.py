@@ -4,12 +4,11 @@ from app.prompts.components import ROLE
 
 COMPARISON_SYSTEM = f"""{ROLE} You are comparing 2-3 products for a customer. Use ONLY the product data provided below. Do not invent attributes or make claims not in the data.
 
-Create a structured comparison with:
+The factual table (price, occasion, sizes, ingredients, chocolate type) is built separately. You write only:
 1. intro_message: A short conversational opener (1-2 sentences) that introduces the comparison—warm and natural, e.g. "Here's how these stack up for you."
-2. comparison_rows: List of {{"attribute": "Attribute Name", "values": ["Product A value", "Product B value", ...]}} for each product. Include: Price, Occasion, Size options, Key ingredients/fruit types, Chocolate type (if any), Key differentiators.
-3. best_for: List of {{"product_name": "exact name from data", "verdict": "Best for [specific use case]"}} - e.g. "Best for a large office party", "Best for an intimate anniversary". Base verdicts on the actual product data.
+2. best_for: List of {{"product_name": "exact name from data", "verdict": "Best for [specific use case]"}} - e.g. "Best for a large office party", "Best for an intimate anniversary". Base verdicts on the actual product data. Keep each verdict under 12 words.
 
 Respond with ONLY valid JSON:
-{{"intro_message": "Short conversational opener", "comparison_rows": [{{"attribute": "...", "values": ["...", "..."]}}], "best_for": [{{"product_name": "...", "verdict": "..."}}]}}
+{{"intro_message": "Short conversational opener", "best_for": [{{"product_name": "...", "verdict": "..."}}]}}
 
 Use exact product names from the input. No hallucination."""
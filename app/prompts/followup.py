@@ -10,3 +10,13 @@ FOLLOWUP_GENERATOR = f"""{ROLE} The user's message was too vague. Generate a sho
 - "preferences unclear" -> Ask about preferences (chocolate, fruit, etc.)
 
 Keep it warm and concise (1-2 sentences). No product links. Respond with ONLY the question."""
+
+# Used instead of the LLM when the request deadline is too close
+FOLLOWUP_TEMPLATES = {
+    "occasion unclear": "What's the occasion you're shopping for?",
+    "budget unclear": "Do you have a budget in mind?",
+    "occasion and budget unclear": "What's the occasion? And do you have a budget in mind?",
+    "recipient unclear": "Who is the gift for?",
+    "preferences unclear": "Do they prefer chocolate, fresh fruit, or a mix of both?",
+}
+FOLLOWUP_TEMPLATE_DEFAULT = FOLLOWUP_TEMPLATES["occasion and budget unclear"]
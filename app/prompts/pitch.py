@@ -0,0 +1,17 @@
+"""Prompts for the offline pitch job (scripts/build_pitches.py)."""
+
+from app.prompts.components import ROLE
+
+PITCH_SYSTEM = f"""{ROLE} You are writing catalog copy ahead of time. Below are real products, each numbered like [3]. For every product write:
+- pitch: 1-2 warm, gift-focused sentences on why it makes a great gift. Only use facts from the product data; no claims about popularity or ratings. Do not mention the price.
+- occasions: up to 4 lowercase occasions it suits (e.g. "birthday", "thank you", "sympathy").
+- recipients: up to 4 lowercase recipients it suits (e.g. "mom", "coworker", "kids", "couple").
+- summary: one line of at most 15 words saying what it is (main items, chocolate, size), for choosing between products.
+
+Respond with ONLY valid JSON in this exact format, one item per product:
+{{"items": [{{"i": 3, "pitch": "...", "occasions": ["..."], "recipients": ["..."], "summary": "..."}}]}}"""
+
+PITCH_USER_TEMPLATE = """Products:
+{product_context}
+
+Return JSON with one item for each of the {count} products above."""
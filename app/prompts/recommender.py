@@ -2,7 +2,7 @@
 
 from app.prompts.components import GROUNDING_RULES, ROLE
 
-RECOMMENDER_SYSTEM = f"""{ROLE} The user is looking for gift recommendations. Below are real products from our catalog. Pick 4 that best match their request.
+RECOMMENDER_SYSTEM = f"""{ROLE} The user is looking for gift recommendations. Below are real products from our catalog. Pick as many as the message asks for, choosing those that best match their request.
 
 {GROUNDING_RULES}
 - For each product you recommend, write a 1-2 sentence description of why it fits (warm, personal, gift-focused).
@@ -20,7 +20,7 @@ RECOMMENDER_USER_TEMPLATE = """User message: "{user_message}"
 Products from our catalog (evaluate each for relevance to the user's request):
 {product_context}
 
-Return JSON with the 4 BEST matching products. Use exact product_name from the list above."""
+Return JSON with the {count} BEST matching products. Use exact product_name from the list above."""
 
 RECOMMENDER_REFINEMENT_TEMPLATE = """User originally wanted: "{original_request}"
 They just saw some recommendations and gave feedback: "{user_feedback}"
@@ -28,10 +28,56 @@ Show them DIFFERENT products that better match their feedback. Do NOT recommend
 
 Products they previously saw (exclude these): {previous_product_names}
 
-New products to choose from (pick 4 that best match original request + feedback):
+New products to choose from (pick {count} that best match original request + feedback):
 {product_context}
 
-Return JSON with 4 NEW recommendations. Use exact product_name from the "New products" list above."""
+Return JSON with {count} NEW recommendations. Use exact product_name from the "New products" list above."""
+
+# Indexed protocol: candidates are numbered and the LLM answers with numbers, not names
+RECOMMENDER_SYSTEM_INDEXED = f"""{ROLE} The user is looking for gift recommendations. Below are real products from our catalog, each numbered like [3]. Pick as many as the message asks for, choosing those that best match their request.
+
+{GROUNDING_RULES}
+- For each product you recommend, write a 1-2 sentence description of why it fits (warm, personal, gift-focused).
+- Refer to products ONLY by their number. Do not repeat product names.
+- If no products match well, return empty picks and set fallback_message.
+- Write a personalized intro_message: 1-2 conversational sentences that reference the user's request (occasion, budget, who it's for). Warm and natural, not robotic.
+
+Respond with ONLY valid JSON in this exact format:
+{{"intro_message": "Personalized 1-2 sentence opener referencing their request", "picks": [{{"i": 3, "why": "1-2 sentence description"}}], "fallback_message": null}}
+
+If no products match: {{"intro_message": null, "picks": [], "fallback_message": "I couldn't find a great match. Try 'birthday', 'chocolate strawberries', or 'gifts under $50'."}}"""
+
+RECOMMENDER_USER_TEMPLATE_INDEXED = """User message: "{user_message}"
+
+Products from our catalog (evaluate each for relevance to the user's request):
+{product_context}
+
+Return JSON with the numbers of the {count} BEST matching products."""
+
+RECOMMENDER_REFINEMENT_TEMPLATE_INDEXED = """User originally wanted: "{original_request}"
+They just saw some recommendations and gave feedback: "{user_feedback}"
+Show them DIFFERENT products that better match their feedback. Do NOT recommend any of the products they already saw.
+
+Products they previously saw (exclude these): {previous_product_names}
+
+New products to choose from (pick {count} that best match original request + feedback):
+{product_context}
+
+Return JSON with the numbers of {count} NEW recommendations from the "New products" list above."""
+
+# Pitched protocol: candidates carry precomputed summaries and tags (app/service/pitches.py);
+# the LLM only chooses and orders them, and the stored pitches become the blurbs
+RECOMMENDER_SYSTEM_PITCHED = f"""{ROLE} The user is looking for gift recommendations. Below are real products from our catalog, each numbered like [3] with its price, occasions, recipients and a one-line summary. Pick as many as the message asks for, choosing those that best match their request, best first.
+
+{GROUNDING_RULES}
+- Refer to products ONLY by their number. Do not write product descriptions.
+- If no products match well, return empty picks and set fallback_message.
+- Write a short personalized intro_message: 1 conversational sentence that references the user's request (occasion, budget, who it's for).
+
+Respond with ONLY valid JSON in this exact format:
+{{"intro_message": "Personalized 1 sentence opener referencing their request", "picks": [3, 1, 7, 2], "fallback_message": null}}
+
+If no products match: {{"intro_message": null, "picks": [], "fallback_message": "I couldn't find a great match. Try 'birthday', 'chocolate strawberries', or 'gifts under $50'."}}"""
 
 FALLBACK_NO_KEYWORDS = (
     "I'd be happy to help you find a gift! Could you tell me more about what you're looking for? "
@@ -42,3 +88,23 @@ FALLBACK_NO_PRODUCTS = (
     "I couldn't find any products matching that search. Try different keywords like "
     "'birthday', 'chocolate covered strawberries', or 'gifts under $50'."
 )
+
+FALLBACK_SEARCH_UNAVAILABLE = (
+    "Our catalog search is taking longer than usual right now. Please try again in a moment."
+)
+
+# Used when the recommender LLM is skipped (local mode or deadline) - filled from product fields
+STOCK_INTRO = "Here are the top matches from our catalog:"
+STOCK_INTRO_REFINEMENT = "Here are some other top matches from our catalog:"
+
+TEMPLATE_BLURB_FULL = "A {occasion} favorite featuring {ingredients}, at {price}."
+TEMPLATE_BLURB_OCCASION = "A popular {occasion} pick at {price}."
+TEMPLATE_BLURB_INGREDIENTS = "Features {ingredients}, at {price}."
+TEMPLATE_BLURB_PRICE = "A popular pick at {price}."
+TEMPLATE_BLURB = "A popular pick from our catalog."
+
+TEMPLATE_INTRO_OCCASION_BUDGET = "Here are {count} {occasion} gift ideas under {budget}:"
+TEMPLATE_INTRO_OCCASION = "Here are {count} {occasion} gift ideas you might love:"
+TEMPLATE_INTRO_BUDGET = "Here are {count} gift ideas under {budget}:"
+TEMPLATE_INTRO = "Here are my top picks for you:"
+TEMPLATE_INTRO_REFINEMENT = "Here are some different options based on your feedback:"
@@ -0,0 +1,167 @@
+"""Admission control for /api/chat: a concurrency limit, a fair bounded queue and load shedding.
+
+At most CHAT_MAX_CONCURRENT turns run at once per process. Others wait in a queue of up to
+CHAT_MAX_QUEUE; freed slots go to waiting clients round-robin, so one client with many
+requests can't starve the rest, and a client may hold at most CHAT_MAX_PER_CLIENT running
+or queued turns. A turn that can't be queued, or that waits longer than
+CHAT_QUEUE_TIMEOUT seconds, is shed with Overloaded and the route answers 503 with
+Retry-After. Worker threads then return quickly instead of piling up behind a slow LLM,
+so the page, the shelf and /metrics stay responsive.
+
+Metrics: admission_inflight and admission_queue_depth (gauges), admission_queue_wait_seconds
+and admission_shed_total{reason} (queue_full, client_limit or timeout).
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Iterator
+
+from app.service import metrics
+
+CHAT_MAX_CONCURRENT = int(os.getenv("CHAT_MAX_CONCURRENT", "32"))  # 0 = no admission control
+CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "64"))
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "2"))
+CHAT_MAX_PER_CLIENT = int(os.getenv("CHAT_MAX_PER_CLIENT", "4"))  # 0 = no per-client limit
+
+SHED_QUEUE_FULL = "queue_full"
+SHED_CLIENT_LIMIT = "client_limit"
+SHED_TIMEOUT = "timeout"
+
+# Weight of the newest turn in the moving average of service time (for Retry-After)
+_SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a turn is shed. retry_after is a whole number of seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server busy ({reason}); retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, client: str):
+        self.client = client
+        self.enqueued = time.perf_counter()
+        self.admitted = False  # Set under the lock when a slot is handed over
+        self.event = threading.Event()
+
+
+class AdmissionController:
+    """Per-process concurrency limit with a round-robin queue across clients. Thread-safe."""
+
+    def __init__(
+        self,
+        max_concurrent: int = CHAT_MAX_CONCURRENT,
+        max_queue: int = CHAT_MAX_QUEUE,
+        queue_timeout: float = CHAT_QUEUE_TIMEOUT,
+        max_per_client: int = CHAT_MAX_PER_CLIENT,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_per_client = max_per_client
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._queued = 0
+        self._per_client: dict[str, int] = {}  # Running + queued turns
+        self._waiting: OrderedDict[str, deque[_Waiter]] = OrderedDict()  # Next client to serve first
+        self._service_time = max(queue_timeout, 1.0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"inflight": self._inflight, "queued": self._queued}
+
+    @contextmanager
+    def admit(self, client: str) -> Iterator[None]:
+        """Hold a slot for the duration of the block. Raises Overloaded if the turn is shed."""
+        if not self.enabled:
+            yield
+            return
+        self._acquire(client)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(client, time.perf_counter() - start)
+
+    def _retry_after(self) -> int:
+        """Rough seconds until the queue drains (lock held)."""
+        return max(1, math.ceil(self._service_time * (self._queued + 1) / self.max_concurrent))
+
+    def _shed(self, reason: str) -> Overloaded:
+        metrics.inc("admission_shed_total", reason=reason)
+        return Overloaded(reason, self._retry_after())
+
+    def _publish(self) -> None:
+        metrics.set_gauge("admission_inflight", self._inflight)
+        metrics.set_gauge("admission_queue_depth", self._queued)
+
+    def _acquire(self, client: str) -> None:
+        with self._lock:
+            if self.max_per_client and self._per_client.get(client, 0) >= self.max_per_client:
+                raise self._shed(SHED_CLIENT_LIMIT)
+            if self._inflight < self.max_concurrent and not self._queued:
+                self._inflight += 1
+                self._per_client[client] = self._per_client.get(client, 0) + 1
+                self._publish()
+                return
+            if self._queued >= self.max_queue:
+                raise self._shed(SHED_QUEUE_FULL)
+            waiter = _Waiter(client)
+            self._waiting.setdefault(client, deque()).append(waiter)
+            self._queued += 1
+            self._per_client[client] = self._per_client.get(client, 0) + 1
+            self._publish()
+
+        waiter.event.wait(self.queue_timeout)
+        with self._lock:
+            metrics.observe("admission_queue_wait_seconds", time.perf_counter() - waiter.enqueued)
+            if waiter.admitted:
+                return
+            queue = self._waiting[client]
+            queue.remove(waiter)
+            if not queue:
+                del self._waiting[client]
+            self._queued -= 1
+            self._drop(client)
+            self._publish()
+            raise self._shed(SHED_TIMEOUT)
+
+    def _release(self, client: str, elapsed: float) -> None:
+        with self._lock:
+            self._service_time += _SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+            self._drop(client)
+            if self._waiting:
+                # Hand the slot straight to the next client in rotation
+                next_client, queue = next(iter(self._waiting.items()))
+                waiter = queue.popleft()
+                if queue:
+                    self._waiting.move_to_end(next_client)
+                else:
+                    del self._waiting[next_client]
+                self._queued -= 1
+                waiter.admitted = True
+                waiter.event.set()
+            else:
+                self._inflight -= 1
+            self._publish()
+
+    def _drop(self, client: str) -> None:
+        left = self._per_client.get(client, 0) - 1
+        if left > 0:
+            self._per_client[client] = left
+        else:
+            self._per_client.pop(client, None)
+
+
+chat_admission = AdmissionController()
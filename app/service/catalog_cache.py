@@ -0,0 +1,188 @@
+"""Process-wide search result cache and product index, shared by all EdibleAPIClient instances."""
+
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from app.service import metrics
+from app.service.catalog_store import get_catalog
+from app.service.suggest import suggest_index
+
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "600"))  # seconds
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "512"))
+# Distinct keywords counted for top_queries; past this, the least searched are forgotten
+SEARCH_QUERY_COUNT_MAX_KEYS = int(os.getenv("SEARCH_QUERY_COUNT_MAX_KEYS", "4096"))
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Cache key for a search keyword (case / whitespace-insensitive)."""
+    return " ".join((keyword or "").lower().split())
+
+
+class SearchCache:
+    """
+    TTL + LRU cache of normalized search results keyed by keyword, plus decaying per-keyword
+    query counts (see decay_queries). Thread-safe.
+    """
+
+    def __init__(
+        self,
+        ttl: float = SEARCH_CACHE_TTL,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        max_query_keys: int = SEARCH_QUERY_COUNT_MAX_KEYS,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_query_keys = max_query_keys
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._query_counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, keyword: str) -> list[dict] | None:
+        """Cached products for keyword (copies), or None if missing / expired."""
+        key = normalize_keyword(keyword)
+        now = time.monotonic()
+        with self._lock:
+            self._query_counts[key] += 1
+            if len(self._query_counts) > self.max_query_keys:
+                self._query_counts = Counter(dict(self._query_counts.most_common(self.max_query_keys // 2)))
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                metrics.inc("search_cache_misses_total")
+                return None
+            self._entries.move_to_end(key)
+        metrics.inc("search_cache_hits_total")
+        return [dict(p) for p in entry[1]]
+
+    def put(self, keyword: str, products: list[dict]) -> None:
+        key = normalize_keyword(keyword)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), [dict(p) for p in products])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        metrics.set_gauge("search_cache_entries", size)
+
+    def contains(self, keyword: str) -> bool:
+        """True if keyword has a fresh entry (does not count as a query)."""
+        with self._lock:
+            entry = self._entries.get(normalize_keyword(keyword))
+            return entry is not None and time.monotonic() - entry[0] <= self.ttl
+
+    def top_queries(self, n: int = 10) -> list[str]:
+        """Most frequently searched keywords, weighted towards recent traffic."""
+        with self._lock:
+            return [k for k, _ in self._query_counts.most_common(n)]
+
+    def decay_queries(self) -> None:
+        """Halve every query count, forgetting keywords that reach zero (once per warm-up pass)."""
+        with self._lock:
+            self._query_counts = Counter({k: c // 2 for k, c in self._query_counts.items() if c > 1})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._query_counts.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class ProductIndex:
+    """
+    Latest normalized product by id, for every product seen in search results. Thread-safe.
+
+    With a mapped catalog (CATALOG_FILE), products whose search copy matches the file are
+    read from the shared mapping instead of being copied into each worker's memory. A search
+    copy that differs (new price, description, ...) is kept in memory as an overlay, so the
+    freshest data wins until the file is rebuilt.
+    """
+
+    def __init__(self):
+        self._products: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def update(self, products: list[dict]) -> int:
+        """Add or refresh products (and their typeahead entries). Returns the number of ids not seen before."""
+        suggest_index.add(products)
+        catalog = get_catalog()
+        added = 0
+        with self._lock:
+            for p in products:
+                pid = p.get("id")
+                if not pid:
+                    continue
+                pid = str(pid)
+                product = dict(p)
+                product.pop("_search_score", None)
+                stored = catalog.get(pid) if catalog is not None else None
+                if stored is not None:
+                    if all(product.get(k) == v for k, v in stored.items()):
+                        self._products.pop(pid, None)  # The mapping is current again
+                        continue
+                elif pid not in self._products:
+                    added += 1
+                self._products[pid] = product
+            size = len(self._products)
+        metrics.set_gauge("product_index_size", size)
+        return added
+
+    def get(self, product_id) -> dict | None:
+        with self._lock:
+            p = self._products.get(str(product_id))
+        if p is not None:
+            return dict(p)
+        catalog = get_catalog()
+        return catalog.get(product_id) if catalog is not None else None
+
+    def filter_ids(
+        self, ids: list[str], *, min_price: float | None = None, max_price: float | None = None
+    ) -> list[str]:
+        """
+        The ids (in order) whose current price is within the range, without building
+        product dicts: in-memory products are checked directly and the rest through the
+        mapped catalog's price column. Unknown ids and unpriced products are dropped.
+        """
+        catalog = get_catalog()
+        rows: dict[int, str] = {}
+        matched: set[str] = set()
+        with self._lock:
+            for pid in ids:
+                p = self._products.get(str(pid))
+                if p is not None:
+                    price = p.get("price")
+                    if (
+                        isinstance(price, (int, float))
+                        and (min_price is None or price >= min_price)
+                        and (max_price is None or price <= max_price)
+                    ):
+                        matched.add(str(pid))
+                elif catalog is not None:
+                    i = catalog.index_of(pid)
+                    if i is not None:
+                        rows[i] = str(pid)
+        if rows:
+            matched.update(rows[i] for i in catalog.filter(rows, min_price=min_price, max_price=max_price))
+        return [str(pid) for pid in ids if str(pid) in matched]
+
+    def all(self) -> list[dict]:
+        """Products held in memory (not those only in the mapped catalog)."""
+        with self._lock:
+            return [dict(p) for p in self._products.values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._products.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._products)
+
+
+search_cache = SearchCache()
+product_index = ProductIndex()
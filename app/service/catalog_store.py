@@ -0,0 +1,258 @@
+"""Memory-mapped columnar catalog file, shared read-only by all worker processes.
+
+build_catalog() writes normalized products to one file: fixed-width columns (price,
+occasion code, size count, id sort order) plus an offset-indexed UTF-8 string blob.
+Workers mmap it, and the OS shares the pages between processes, so per-worker memory no
+longer grows with catalog size. Columns are typed memoryviews over the mapping, so reads
+copy nothing. A new version is written next to the old one and published with an atomic
+rename; get_catalog() notices the swap and remaps.
+
+Layout (native byte order, recorded in the header):
+    header   | price f64[n] | occasion u16[n] | size_count i32[n] | id_order u32[n]
+    | string offsets u32[n * len(STRING_FIELDS) + n_occasions + 1] | string blob
+"""
+
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Iterable
+
+from app.service import metrics
+
+CATALOG_FILE = os.getenv("CATALOG_FILE", "")  # Unset = no mapped catalog
+CATALOG_RECHECK_SECONDS = float(os.getenv("CATALOG_RECHECK_SECONDS", "5"))  # swap detection
+
+MAGIC = b"EDCATLG1"
+# magic, byte order, count, fields, occasions, then section offsets: price, occasion,
+# size_count, id_order, string offsets, blob
+_HEADER = struct.Struct("<8s1s3xIII6Q")
+STRING_FIELDS = ("id", "name", "url", "image_url", "description", "category", "ingredients", "allergy_info")
+_NO_SIZE = -1
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def build_catalog(products: Iterable[dict], path: str | Path) -> int:
+    """
+    Write products (normalized; the first of each id wins) to `path` atomically. Returns the count.
+
+    products may be any iterable, e.g. a streamed snapshot: rows are consumed one at a time
+    and their strings spilled to a temp file, so memory holds only the fixed-width columns
+    and ids, never the product dicts. The file is written to a temp file in the same
+    directory and renamed over `path`, so readers see either the old or the new version,
+    never a partial one.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ids: list[str] = []
+    seen: set[str] = set()
+    prices = array("d")
+    occasion_col = array("H")
+    sizes = array("i")
+    offsets = array("I", [0])
+    occasion_codes: dict[str, int] = {}
+    with tempfile.TemporaryFile(dir=path.parent) as spill:
+        blob_size = 0
+
+        def _spill(text: str) -> None:
+            nonlocal blob_size
+            data = text.encode("utf-8")
+            spill.write(data)
+            blob_size += len(data)
+            offsets.append(blob_size)
+
+        for r in products:
+            pid = str(r.get("id") or "")
+            if not pid or pid in seen:
+                continue
+            seen.add(pid)
+            ids.append(pid)
+            prices.append(float(r["price"]) if isinstance(r.get("price"), (int, float)) else math.nan)
+            occasion_col.append(occasion_codes.setdefault(r.get("occasion") or "", len(occasion_codes)))
+            sizes.append(int(r["size_count"]) if r.get("size_count") is not None else _NO_SIZE)
+            for field in STRING_FIELDS:
+                _spill(pid if field == "id" else str(r.get(field) or ""))
+        occasions = list(occasion_codes)
+        for o in occasions:
+            _spill(o)
+        n = len(ids)
+        id_order = array("I", sorted(range(n), key=ids.__getitem__))
+
+        sections = [prices.tobytes(), occasion_col.tobytes(), sizes.tobytes(), id_order.tobytes(), offsets.tobytes()]
+        positions = []
+        pos = _align(_HEADER.size)
+        for data in sections:
+            positions.append(pos)
+            pos = _align(pos + len(data))
+        blob_pos = pos
+
+        byteorder = b"<" if sys.byteorder == "little" else b">"
+        header = _HEADER.pack(MAGIC, byteorder, n, len(STRING_FIELDS), len(occasions), *positions, blob_pos)
+
+        fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                for position, data in zip(positions, sections):
+                    f.write(b"\0" * (position - f.tell()))
+                    f.write(data)
+                f.write(b"\0" * (blob_pos - f.tell()))
+                spill.seek(0)
+                shutil.copyfileobj(spill, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return n
+
+
+class MappedCatalog:
+    """Read-only view of a catalog file. Column reads go straight to the shared mapping."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, n, n_fields, n_occasions, *positions = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or n_fields != len(STRING_FIELDS):
+            raise ValueError(f"{self.path} is not a catalog file (or an incompatible version)")
+        if byteorder != (b"<" if sys.byteorder == "little" else b">"):
+            raise ValueError(f"{self.path} was built on a machine with a different byte order")
+        price_pos, occasion_pos, size_pos, order_pos, offsets_pos, blob_pos = positions
+        view = memoryview(self._mm)
+        self._n = n
+        self._n_occasions = n_occasions
+        self.prices = view[price_pos:price_pos + 8 * n].cast("d")
+        self.occasion_codes = view[occasion_pos:occasion_pos + 2 * n].cast("H")
+        self.size_counts = view[size_pos:size_pos + 4 * n].cast("i")
+        self._id_order = view[order_pos:order_pos + 4 * n].cast("I")
+        n_strings = n * n_fields + n_occasions + 1
+        self._offsets = view[offsets_pos:offsets_pos + 4 * n_strings].cast("I")
+        self._blob = view[blob_pos:]
+        self.occasions = [self._string(n * n_fields + i) for i in range(n_occasions)]
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _string(self, k: int) -> str:
+        return bytes(self._blob[self._offsets[k]:self._offsets[k + 1]]).decode("utf-8")
+
+    def _field(self, i: int, field: int) -> str:
+        return self._string(i * len(STRING_FIELDS) + field)
+
+    def index_of(self, product_id) -> int | None:
+        """Row of a product id (binary search over the id order column), or None."""
+        target = str(product_id)
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._field(self._id_order[mid], 0) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n and self._field(self._id_order[lo], 0) == target:
+            return self._id_order[lo]
+        return None
+
+    def product(self, i: int) -> dict:
+        """Row i as a normalized product dict (same keys as the search client, minus the score)."""
+        p = {field: self._field(i, k) for k, field in enumerate(STRING_FIELDS)}
+        price = self.prices[i]
+        size = self.size_counts[i]
+        p["price"] = None if math.isnan(price) else price
+        p["occasion"] = self.occasions[self.occasion_codes[i]]
+        p["size_count"] = None if size == _NO_SIZE else size
+        return p
+
+    def get(self, product_id) -> dict | None:
+        i = self.index_of(product_id)
+        return self.product(i) if i is not None else None
+
+    def filter(
+        self,
+        rows: Iterable[int] | None = None,
+        *,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        occasion: str | None = None,
+    ) -> list[int]:
+        """
+        Rows (all, or those in `rows`, in order) matching a price range and/or occasion.
+
+        Reads only the price and occasion columns, so no product dict is built for a row
+        that doesn't match. Rows without a price never match a price range.
+        """
+        code = None
+        if occasion is not None:
+            wanted = occasion.strip().lower()
+            code = next((c for c, o in enumerate(self.occasions) if o.lower() == wanted), -1)
+        matched = []
+        for i in range(self._n) if rows is None else rows:
+            price = self.prices[i]
+            if (min_price is not None or max_price is not None) and math.isnan(price):
+                continue
+            if min_price is not None and price < min_price:
+                continue
+            if max_price is not None and price > max_price:
+                continue
+            if code is not None and self.occasion_codes[i] != code:
+                continue
+            matched.append(i)
+        return matched
+
+
+_catalog: MappedCatalog | None = None
+_catalog_stat: tuple | None = None
+_checked_at = 0.0
+_catalog_lock = threading.Lock()
+
+
+def get_catalog(path: str | None = None) -> MappedCatalog | None:
+    """
+    The mapped catalog at CATALOG_FILE, or None if unset / missing / unreadable.
+
+    Re-checks the file every CATALOG_RECHECK_SECONDS and remaps after an atomic swap. The
+    old mapping stays valid for readers still holding it.
+    """
+    global _catalog, _catalog_stat, _checked_at
+    path = path if path is not None else os.getenv("CATALOG_FILE", CATALOG_FILE)
+    if not path:
+        return None
+    now = time.monotonic()
+    with _catalog_lock:
+        if _catalog is not None and _catalog.path == Path(path) and now - _checked_at < CATALOG_RECHECK_SECONDS:
+            return _catalog
+        _checked_at = now
+        try:
+            st = os.stat(path)
+        except OSError:
+            _catalog, _catalog_stat = None, None
+            return None
+        stat = (path, st.st_ino, st.st_mtime_ns, st.st_size)
+        if _catalog is None or stat != _catalog_stat:
+            try:
+                _catalog, _catalog_stat = MappedCatalog(path), stat
+                metrics.inc("catalog_loads_total", result="ok")
+                metrics.set_gauge("catalog_products", len(_catalog))
+            except (OSError, ValueError, struct.error):
+                metrics.inc("catalog_loads_total", result="error")
+        return _catalog
+
+
+def reset_catalog() -> None:
+    """Forget the current mapping (tests)."""
+    global _catalog, _catalog_stat, _checked_at
+    with _catalog_lock:
+        _catalog, _catalog_stat, _checked_at = None, None, 0.0
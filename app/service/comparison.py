@@ -1,10 +1,24 @@
 """Side-by-Side AI Comparison Engine."""
 
+import os
 from typing import TypedDict
 
+import requests
+from openai import APITimeoutError
+
 from app.prompts.comparison import COMPARISON_SYSTEM
-from app.service.edible_client import EdibleAPIClient
+from app.service import metrics
+from app.service.catalog_cache import product_index
+from app.service.comparison_cache import comparison_cache
+from app.service.deadline import COMPARISON_PARTIAL, SEARCH_TRUNCATED, Deadline, remaining_timeout
+from app.service.edible_client import MIN_SEARCH_BUDGET, EdibleAPIClient, parse_chocolate_types, parse_ingredients
 from app.service.llm_client import complete_json
+from app.service.llm_governor import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+MIN_COMPARISON_BUDGET = 2.0  # seconds; below this, return the factual rows without the LLM
+# Most-compared product sets to (re)compute ahead of time on each warm-up pass (0 = off)
+COMPARISON_PRECOMPUTE_TOP = int(os.getenv("COMPARISON_PRECOMPUTE_TOP", "10"))
+COMPARISON_PRECOMPUTE_BUDGET = float(os.getenv("COMPARISON_PRECOMPUTE_BUDGET", "60"))  # seconds per pass; 0 = no limit
 
 
 class ComparisonResult(TypedDict):
@@ -21,6 +35,12 @@ def _is_url(s: str) -> bool:
     return s.startswith(("http://", "https://")) or "ediblearrangements.com" in s
 
 
+def _hydrate(p: dict) -> dict:
+    """Full product fields for a (possibly slim, card-only) product from the client."""
+    full = product_index.get(p.get("id")) if p.get("id") else None
+    return {**p, **full} if full else p
+
+
 def _match_product_from_last(
     item: str, last_products: list[dict]
 ) -> dict | None:
@@ -66,15 +86,110 @@ def _expand_ordinals(
     return [x for x in expanded if x]
 
 
+def _fact_rows(products: list[dict]) -> list[dict]:
+    """Comparison rows taken straight from product fields (no LLM)."""
+
+    def _price(p: dict) -> str:
+        price = p.get("price")
+        return f"${float(price):.2f}" if isinstance(price, (int, float)) else str(price or "N/A")
+
+    def _chocolate(p: dict) -> str:
+        types = parse_chocolate_types(p.get("ingredients") or "")
+        if types:
+            return ", ".join(types)
+        return "N/A" if not p.get("ingredients") else "None"
+
+    return [
+        {"attribute": "Price", "values": [_price(p) for p in products]},
+        {"attribute": "Occasion", "values": [p.get("occasion") or "N/A" for p in products]},
+        {"attribute": "Size options", "values": [str(p.get("size_count") or "N/A") for p in products]},
+        {
+            "attribute": "Ingredients",
+            "values": [", ".join(parse_ingredients(p.get("ingredients") or "")) or "N/A" for p in products],
+        },
+        {"attribute": "Chocolate type", "values": [_chocolate(p) for p in products]},
+    ]
+
+
+def _pid(p: dict) -> str:
+    return str(p.get("id") or p.get("name", ""))
+
+
+def _table(products: list[dict], verdicts: dict[str, str]) -> list[dict]:
+    """Factual rows plus a Best For row (verdicts by product id), in the products' order."""
+    table = _fact_rows(products)
+    if any(verdicts.values()):
+        table.append({"attribute": "Best For", "values": [verdicts.get(_pid(p), "") for p in products]})
+    return table
+
+
+def _llm_verdicts(
+    products: list[dict], *, timeout: float | None = None, priority: str = PRIORITY_INTERACTIVE
+) -> tuple[str, dict[str, str]]:
+    """(intro message, Best For verdict by product id) from the LLM."""
+    product_context = EdibleAPIClient().format_for_comparison(products)
+
+    user_content = f"""Compare these products:
+
+{product_context}
+
+Return JSON with intro_message and best_for."""
+
+    data = complete_json(COMPARISON_SYSTEM, user_content, call_site="comparison", timeout=timeout, priority=priority)
+    best_for = data.get("best_for") or []
+    verdicts = {}
+    for p in products:
+        name = p.get("name", "").strip().lower()
+        verdicts[_pid(p)] = next(
+            (b.get("verdict", "") for b in best_for if (b.get("product_name") or "").strip().lower() == name), ""
+        ) or ""
+    return (data.get("intro_message") or "").strip(), verdicts
+
+
+def _clean(products: list[dict]) -> list[dict]:
+    """Strip internal fields before returning to frontend."""
+    clean_products = []
+    for p in products:
+        cp = dict(p)
+        cp.pop("_search_score", None)
+        clean_products.append(cp)
+    return clean_products
+
+
+def _partial_result(products: list[dict], degraded: list[str]) -> ComparisonResult:
+    """Factual rows only, used when there is no time left for the LLM."""
+    result: dict = {
+        "message": f"Here's a quick look at how these compare: {', '.join(p.get('name', '?') for p in products)}",
+        "products": _clean(products),
+        "comparison_table": _fact_rows(products),
+        "degraded": degraded + [COMPARISON_PARTIAL],
+    }
+    return result
+
+
+def _with_degraded(result: ComparisonResult, degraded: list[str]) -> ComparisonResult:
+    if degraded:
+        result["degraded"] = degraded  # type: ignore[typeddict-unknown-key]
+    return result
+
+
 def get_comparison(
     products_to_compare: list[str],
     last_products: list[dict] | None = None,
+    *,
+    deadline: Deadline | None = None,
 ) -> ComparisonResult:
     """
-    Resolve products and generate AI comparison table.
+    Resolve products and build the comparison table.
+
+    Factual rows come from product fields; the LLM only writes the intro and "Best For" verdicts.
+    Those are cached per product set (any order) until the products' data changes.
 
     products_to_compare: Product names, URLs, or ordinals ("first two")
     last_products: Recently shown products (for "compare these" flow)
+    deadline: Request deadline. Lookups get the remaining budget and stop (search_truncated)
+        when it runs out or a lookup times out; if too little is left for the LLM (or it times
+        out), a partial table of factual rows is returned.
     """
     if not products_to_compare:
         return ComparisonResult(
@@ -93,6 +208,7 @@ def get_comparison(
 
     resolved: list[dict] = []
     seen_ids: set[str] = set()
+    degraded: list[str] = []
 
     for item in items[:5]:  # Cap at 5, we'll take 3
         if len(resolved) >= 3:
@@ -105,31 +221,40 @@ def get_comparison(
         if last_products:
             p = _match_product_from_last(item, last_products)
             if p:
-                pid = str(p.get("id") or p.get("name", ""))
+                p = _hydrate(p)
+                pid = _pid(p)
                 if pid not in seen_ids:
                     seen_ids.add(pid)
                     resolved.append(p)
                 continue
 
-        # 2. Try URL lookup
-        if _is_url(item):
-            p = client.lookup_by_url(item)
-            if p:
-                pid = str(p.get("id") or p.get("name", ""))
-                if pid not in seen_ids:
-                    seen_ids.add(pid)
-                    resolved.append(p)
-            continue
-
-        # 3. Search by name
-        p = client.lookup_by_name(item)
+        # 2. Try URL lookup, else 3. search by name
+        if deadline is not None and not deadline.allows(MIN_SEARCH_BUDGET):
+            degraded.append(SEARCH_TRUNCATED)
+            break
+        lookup = client.lookup_by_url if _is_url(item) else client.lookup_by_name
+        try:
+            p = lookup(item, timeout=remaining_timeout(deadline))
+        except (requests.Timeout, requests.ConnectionError):
+            metrics.inc("search_errors_total")
+            degraded.append(SEARCH_TRUNCATED)
+            break
         if p:
-            pid = str(p.get("id") or p.get("name", ""))
+            pid = _pid(p)
             if pid not in seen_ids:
                 seen_ids.add(pid)
                 resolved.append(p)
 
     if len(resolved) < 2:
+        if degraded:
+            return _with_degraded(
+                ComparisonResult(
+                    message="I couldn't look those products up just now. Please try again in a moment.",
+                    products=_clean(resolved),
+                    comparison_table=None,
+                ),
+                degraded,
+            )
         if len(resolved) == 1:
             return ComparisonResult(
                 message="I found one product. Please specify at least one more to compare.",
@@ -144,54 +269,65 @@ def get_comparison(
         )
 
     products = resolved[:3]
-    product_context = client.format_for_comparison(products)
-
-    user_content = f"""Compare these products and create a side-by-side comparison:
-
-{product_context}
-
-Return JSON with intro_message, comparison_rows, and best_for."""
+    default_message = f"Here's how these compare: {', '.join(p.get('name', '?') for p in products)}"
+    cached = comparison_cache.get(products)
+    if cached is not None:
+        return _with_degraded(
+            ComparisonResult(
+                message=cached["intro"] or default_message,
+                products=_clean(products),
+                comparison_table=_table(products, cached["verdicts"]),
+            ),
+            degraded,
+        )
+    if deadline is not None and not deadline.allows(MIN_COMPARISON_BUDGET):
+        return _partial_result(products, degraded)
 
     try:
-        data = complete_json(COMPARISON_SYSTEM, user_content)
-        rows = data.get("comparison_rows") or []
-        best_for = data.get("best_for") or []
-
-        # Build comparison_table for frontend: list of {attribute, values}
-        comparison_table = []
-        for r in rows:
-            if isinstance(r, dict) and r.get("attribute"):
-                comparison_table.append({
-                    "attribute": r["attribute"],
-                    "values": r.get("values") or [],
-                })
-        # Add Best For row
-        if best_for:
-            verdicts = []
-            for p in products:
-                name = p.get("name", "")
-                v = next((b.get("verdict", "") for b in best_for if (b.get("product_name") or "").strip().lower() == name.strip().lower()), "")
-                verdicts.append(v or "")
-            comparison_table.append({"attribute": "Best For", "values": verdicts})
-
-        intro = (data.get("intro_message") or "").strip()
-        message = intro or f"Here's how these compare: {', '.join(p.get('name', '?') for p in products)}"
-
-        # Strip internal fields before returning to frontend
-        clean_products = []
-        for p in products:
-            cp = dict(p)
-            cp.pop("_search_score", None)
-            clean_products.append(cp)
-
-        return ComparisonResult(
-            message=message,
-            products=clean_products,
-            comparison_table=comparison_table,
+        intro, verdicts = _llm_verdicts(products, timeout=remaining_timeout(deadline))
+        comparison_cache.put(products, intro, verdicts)
+        return _with_degraded(
+            ComparisonResult(
+                message=intro or default_message,
+                products=_clean(products),
+                comparison_table=_table(products, verdicts),
+            ),
+            degraded,
         )
+    except APITimeoutError:
+        return _partial_result(products, degraded)
     except Exception:
-        return ComparisonResult(
-            message="I had trouble generating the comparison. Please try again.",
-            products=products,
-            comparison_table=None,
-        )
+        result: dict = {
+            "message": "I had trouble generating the comparison. Please try again.",
+            "products": products,
+            "comparison_table": None,
+            "error": True,
+        }
+        return result
+
+
+def precompute_comparisons(n: int = COMPARISON_PRECOMPUTE_TOP, *, budget: float = COMPARISON_PRECOMPUTE_BUDGET) -> int:
+    """
+    Compute the n most-compared product sets whose cache entry is missing or stale, at
+    background LLM priority, within `budget` seconds in all (the rest wait for the next
+    pass). Products come from the product index; sets with a product no longer in it are
+    skipped. Returns the number computed.
+    """
+    deadline = Deadline(budget)
+    computed = 0
+    for ids in comparison_cache.top_sets(n) if n > 0 else []:
+        products = [product_index.get(pid) for pid in ids]
+        if any(p is None for p in products) or comparison_cache.get(products, count=False) is not None:
+            continue
+        if not deadline.allows(MIN_COMPARISON_BUDGET):
+            metrics.inc("comparison_precompute_total", result="out_of_budget")
+            break
+        try:
+            intro, verdicts = _llm_verdicts(products, timeout=deadline.timeout(), priority=PRIORITY_BACKGROUND)
+        except Exception:
+            metrics.inc("comparison_precompute_total", result="error")
+            continue
+        comparison_cache.put(products, intro, verdicts)
+        metrics.inc("comparison_precompute_total", result="ok")
+        computed += 1
+    return computed
@@ -0,0 +1,129 @@
+"""Comparison cache keyed by the set of product ids, independent of the order they're asked in.
+
+Only the LLM part of a comparison (intro and per-product "Best For" verdicts) is stored;
+the factual rows are rebuilt from product fields in the requested order. Each entry
+carries a version hash of the fields the comparison is written from (name, price,
+occasion, ingredients, size_count), so it stops matching as soon as any of those change.
+Sets are counted as they're compared, and after each warm-up pass the most-compared sets
+that are missing or stale are precomputed (see precompute_comparisons in
+app/service/comparison.py); the counts are then halved, so they follow recent traffic.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import TypedDict
+
+from app.service import metrics
+
+COMPARISON_CACHE_TTL = float(os.getenv("COMPARISON_CACHE_TTL", "86400"))  # 0 = off
+COMPARISON_CACHE_MAX_ENTRIES = int(os.getenv("COMPARISON_CACHE_MAX_ENTRIES", "2048"))
+# Distinct product sets counted for top_sets; past this, the least compared are forgotten
+COMPARISON_COUNT_MAX_KEYS = int(os.getenv("COMPARISON_COUNT_MAX_KEYS", "4096"))
+VERSION_FIELDS = ("name", "price", "occasion", "ingredients", "size_count")
+
+
+class ComparisonEntry(TypedDict):
+    version: str
+    intro: str
+    verdicts: dict[str, str]  # product id -> "Best For" verdict
+
+
+def comparison_key(products: list[dict]) -> str | None:
+    """Order-insensitive key for a product set; None if any product has no id."""
+    ids = [str(p.get("id") or "") for p in products]
+    if not all(ids):
+        return None
+    return ",".join(sorted(ids))
+
+
+def comparison_version(products: list[dict]) -> str:
+    """Hash of the fields a comparison is written from, in id order."""
+    rows = sorted(([str(p.get("id"))] + [p.get(f) for f in VERSION_FIELDS] for p in products), key=lambda r: r[0])
+    return hashlib.sha1(json.dumps(rows, default=str).encode()).hexdigest()[:16]
+
+
+class ComparisonCache:
+    """TTL + LRU cache of comparison entries, plus decaying per-set request counts. Thread-safe."""
+
+    def __init__(
+        self,
+        ttl: float = COMPARISON_CACHE_TTL,
+        max_entries: int = COMPARISON_CACHE_MAX_ENTRIES,
+        max_count_keys: int = COMPARISON_COUNT_MAX_KEYS,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_count_keys = max_count_keys
+        self._entries: OrderedDict[str, tuple[float, ComparisonEntry]] = OrderedDict()
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def _fresh(self, key: str, version: str, now: float) -> ComparisonEntry | None:
+        stored = self._entries.get(key)
+        if stored is None:
+            return None
+        if now - stored[0] > self.ttl or stored[1]["version"] != version:
+            del self._entries[key]
+            return None
+        return stored[1]
+
+    def get(self, products: list[dict], *, count: bool = True) -> ComparisonEntry | None:
+        """Entry for this product set if cached and its products haven't changed."""
+        key = comparison_key(products)
+        if key is None or self.ttl <= 0:
+            return None
+        version = comparison_version(products)
+        with self._lock:
+            if count:
+                self._counts[key] += 1
+                if len(self._counts) > self.max_count_keys:
+                    self._counts = Counter(dict(self._counts.most_common(self.max_count_keys // 2)))
+            stored = self._entries.get(key)
+            entry = self._fresh(key, version, time.monotonic())
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            metrics.inc("comparison_cache_total", result="stale" if stored is not None else "miss")
+            return None
+        metrics.inc("comparison_cache_total", result="hit")
+        return copy.deepcopy(entry)
+
+    def put(self, products: list[dict], intro: str, verdicts: dict[str, str]) -> None:
+        key = comparison_key(products)
+        if key is None or self.ttl <= 0:
+            return
+        entry = ComparisonEntry(version=comparison_version(products), intro=intro, verdicts=dict(verdicts))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        metrics.set_gauge("comparison_cache_entries", size)
+
+    def top_sets(self, n: int) -> list[list[str]]:
+        """The n most-compared product id sets, weighted towards recent traffic."""
+        with self._lock:
+            return [key.split(",") for key, _ in self._counts.most_common(n)]
+
+    def decay_counts(self) -> None:
+        """Halve every set's count, forgetting sets that reach zero (once per warm-up pass)."""
+        with self._lock:
+            self._counts = Counter({k: c // 2 for k, c in self._counts.items() if c > 1})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counts.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+comparison_cache = ComparisonCache()
@@ -0,0 +1,128 @@
+"""Rolling conversation state sent to the intent classifier instead of the raw transcript.
+
+Updated with cheap rules (no LLM) after each turn. Every field is capped, so the
+classifier prompt stays roughly the same size however long the conversation gets.
+"""
+
+import re
+from typing import TypedDict
+
+from app.service.local_ranker import extract_budget, extract_occasion
+
+MAX_SHOWN_NAMES = 6
+MAX_SUMMARY_NOTES = 4
+MAX_NOTE_CHARS = 80
+MAX_ASSISTANT_CHARS = 200
+
+_RECIPIENT_RE = re.compile(
+    r"\bfor (?:my |our |a |an |the )?"
+    r"(mom|mother|dad|father|wife|husband|girlfriend|boyfriend|partner|sister|brother|"
+    r"daughter|son|kids?|friend|coworkers?|colleagues?|boss|team|grandma|grandmother|"
+    r"grandpa|grandfather|teacher|neighbou?r|client|her|him|them)\b",
+    re.I,
+)
+
+
+class ConversationState(TypedDict):
+    """What the classifier needs to know about earlier turns."""
+
+    occasion: str | None
+    budget: float | None
+    recipient: str | None
+    shown_product_names: list[str]
+    summary: list[str]  # Short notes for the last few turns
+    last_assistant_message: str
+    turns: int
+
+
+def new_state() -> ConversationState:
+    return ConversationState(
+        occasion=None,
+        budget=None,
+        recipient=None,
+        shown_product_names=[],
+        summary=[],
+        last_assistant_message="",
+        turns=0,
+    )
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def extract_recipient(text: str) -> str | None:
+    m = _RECIPIENT_RE.search(text or "")
+    return m.group(1).lower() if m else None
+
+
+def update_state(
+    state: ConversationState | None,
+    user_message: str,
+    *,
+    assistant_message: str = "",
+    intent: dict | None = None,
+    products: list[dict] | None = None,
+) -> ConversationState:
+    """Return the state after one turn (user message + assistant reply). Does not mutate `state`."""
+    new = ConversationState(**(state or new_state()))
+    new["shown_product_names"] = list(new["shown_product_names"])
+    new["summary"] = list(new["summary"])
+
+    text = " ".join([user_message or "", *((intent or {}).get("keywords") or [])])
+    new["occasion"] = extract_occasion(text) or new["occasion"]
+    new["budget"] = extract_budget(text) or new["budget"]
+    new["recipient"] = extract_recipient(user_message) or new["recipient"]
+
+    names = [p.get("name") for p in (products or []) if p.get("name")]
+    if names:
+        new["shown_product_names"] = names[:MAX_SHOWN_NAMES]
+
+    note = f'user: "{_clip(user_message, MAX_NOTE_CHARS)}"'
+    if intent and intent.get("intent_type"):
+        note += f" ({intent['intent_type']})"
+    if names:
+        note += f"; showed {len(names)} products"
+    new["summary"] = (new["summary"] + [note])[-MAX_SUMMARY_NOTES:]
+    if assistant_message:
+        new["last_assistant_message"] = _clip(assistant_message, MAX_ASSISTANT_CHARS)
+    new["turns"] += 1
+    return new
+
+
+def state_from_history(history: list[dict] | None) -> ConversationState | None:
+    """Rebuild state from a raw {"role", "content"} history (no server-side state yet)."""
+    if not history:
+        return None
+    state = new_state()
+    pending_user: str | None = None
+    for m in history:
+        if m.get("role") == "user":
+            if pending_user is not None:
+                state = update_state(state, pending_user)
+            pending_user = m.get("content") or ""
+        elif m.get("role") == "assistant":
+            state = update_state(state, pending_user or "", assistant_message=m.get("content") or "")
+            pending_user = None
+    if pending_user is not None:
+        state = update_state(state, pending_user)
+    return state
+
+
+def render_state(state: ConversationState, *, include_shown: bool = True) -> str:
+    """Compact text block for the classifier prompt."""
+    lines = ["Conversation so far (summarized):"]
+    if state["occasion"]:
+        lines.append(f"- occasion: {state['occasion']}")
+    if state["budget"]:
+        lines.append(f"- budget: under ${state['budget']:g}")
+    if state["recipient"]:
+        lines.append(f"- recipient: {state['recipient']}")
+    if include_shown and state["shown_product_names"]:
+        lines.append(f"- recently shown: {', '.join(state['shown_product_names'])}")
+    if state["summary"]:
+        lines.append(f"- recent turns: {' | '.join(state['summary'])}")
+    if state["last_assistant_message"]:
+        lines.append(f'- last assistant message: "{state["last_assistant_message"]}"')
+    return "\n".join(lines)
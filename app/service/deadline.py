@@ -0,0 +1,45 @@
+"""Per-request deadline passed through the orchestrator to each stage."""
+
+import time
+
+# Degradation labels reported in OrchestratorResponse["degraded"]
+INTENT_TIMEOUT = "intent_timeout"
+GREETING_TEMPLATE = "greeting_template"
+FOLLOWUP_TEMPLATE = "followup_template"
+SEARCH_TRUNCATED = "search_truncated"
+RECOMMENDER_SKIPPED = "recommender_skipped"
+COMPARISON_PARTIAL = "comparison_partial"
+
+
+class Deadline:
+    """Absolute deadline on the monotonic clock. Deadline(None) never expires."""
+
+    def __init__(self, seconds: float | None):
+        self.budget = seconds
+        self._expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> float | None:
+        """Seconds left (>= 0), or None if unlimited."""
+        if self._expires_at is None:
+            return None
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self._expires_at is not None and time.monotonic() >= self._expires_at
+
+    def allows(self, seconds: float) -> bool:
+        """True if at least `seconds` remain (always True when unlimited)."""
+        remaining = self.remaining()
+        return remaining is None or remaining >= seconds
+
+    def timeout(self, cap: float | None = None) -> float | None:
+        """Remaining budget capped at `cap`, for passing to a stage. None = no limit."""
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        return remaining if cap is None else min(remaining, cap)
+
+
+def remaining_timeout(deadline: "Deadline | None", cap: float | None = None) -> float | None:
+    """deadline.timeout(cap), tolerating deadline=None."""
+    return deadline.timeout(cap) if deadline is not None else cap
@@ -1,11 +1,19 @@
 import json
+import os
 import re
+import time
 import requests
 from typing import Optional
 from urllib.parse import urlparse
 
+from app.service import metrics
+from app.service.catalog_cache import product_index, search_cache
+from app.service.deadline import Deadline, remaining_timeout
+
 SITE_BASE = "https://www.ediblearrangements.com"
 FRUIT_GIFTS_PREFIX = f"{SITE_BASE}/fruit-gifts/"
+SEARCH_TIMEOUT = 10  # seconds per search request
+MIN_SEARCH_BUDGET = 0.5  # Don't start another search with less than this left
 
 
 def parse_product_url(url: str) -> str | None:
@@ -27,6 +35,40 @@ def parse_product_url(url: str) -> str | None:
     return None
 
 
+def parse_ingredients(ingredients: str) -> list[str]:
+    """
+    Split the comma-separated ingredients string into distinct base items.
+
+    "Box Berry - Semi - Sprinkles,Box Berry - White Chocolate,Pineapple Cake - White Chocolate"
+    -> ["Box Berry", "Pineapple Cake"]
+    """
+    names: list[str] = []
+    for item in (ingredients or "").split(","):
+        base = item.split(" - ")[0].strip()
+        if base and base.lower() not in (n.lower() for n in names):
+            names.append(base)
+    return names
+
+
+# Chocolate variants as they appear after " - " in ingredient names, in display order
+CHOCOLATE_TYPES = [("dark", "Dark"), ("milk", "Milk"), ("semi", "Semisweet"), ("white", "White")]
+
+
+def parse_chocolate_types(ingredients: str) -> list[str]:
+    """
+    Chocolate types named in the ingredients string, e.g.
+    "Box Berry - Semi - Sprinkles,Pineapple - White Chocolate" -> ["Semisweet", "White"].
+    """
+    found: set[str] = set()
+    for item in (ingredients or "").split(","):
+        for modifier in item.split(" - ")[1:]:
+            modifier = modifier.strip().lower()
+            for needle, label in CHOCOLATE_TYPES:
+                if modifier.startswith(needle):
+                    found.add(label)
+    return [label for _, label in CHOCOLATE_TYPES if label in found]
+
+
 def _normalize_product(p: dict) -> dict:
     """Extract display-ready fields from API product."""
     url_slug = p.get("url") or ""
@@ -47,7 +89,7 @@ def _normalize_product(p: dict) -> dict:
 
 
 class EdibleAPIClient:
-    BASE_URL = "https://www.ediblearrangements.com/api/search/"
+    BASE_URL = os.getenv("EDIBLE_API_URL", "https://www.ediblearrangements.com/api/search/")
     
     HEADERS = {
         "Content-Type": "application/json",
@@ -65,19 +107,49 @@ class EdibleAPIClient:
         response.raise_for_status()
         return response.json()
 
-    def search(self, keyword: str, limit: Optional[int] = None) -> dict:
+    def search(
+        self,
+        keyword: str,
+        limit: Optional[int] = None,
+        *,
+        timeout: float | None = None,
+        refresh: bool = False,
+    ) -> dict:
         """
         Search Edible Arrangements catalog by keyword.
+
+        Results are served from the shared search cache when fresh; refresh=True always
+        fetches (and re-caches). timeout caps the request (default SEARCH_TIMEOUT), e.g. to
+        a request's remaining budget.
         """
+        products = None if refresh else search_cache.get(keyword)
+        if products is None:
+            products = self._fetch(keyword, timeout=timeout)
+            search_cache.put(keyword, products)
+            product_index.update(products)
+
+        if limit:
+            products = products[:limit]
+
+        return {"products": products}
+
+    def _fetch(self, keyword: str, *, timeout: float | None = None) -> list[dict]:
+        """Call the search API and return all results, normalized."""
         payload = {"keyword": keyword}
-        
+        if timeout is not None and timeout <= 0:
+            # requests rejects a zero timeout with ValueError; treat it as a timeout
+            raise requests.Timeout(f"No time left to search {keyword!r}")
+
+        start = time.perf_counter()
         response = requests.post(
             self.BASE_URL,
             json=payload,
             headers=self.HEADERS,
-            timeout=10
+            timeout=min(timeout, SEARCH_TIMEOUT) if timeout is not None else SEARCH_TIMEOUT
         )
         response.raise_for_status()
+        metrics.inc("search_requests_total")
+        metrics.observe("search_latency_seconds", time.perf_counter() - start)
         
         data = response.json()
         
@@ -85,27 +157,40 @@ class EdibleAPIClient:
             products = data
         else:
             products = data.get("products", [])
-        
-        if limit:
-            products = products[:limit]
 
-        return {"products": [_normalize_product(p) for p in products]}
+        return [_normalize_product(p) for p in products]
     
-    def search_multiple(self, keywords: list[str]) -> dict:
-        """Search multiple keywords and combine results (deduplicated by id)."""
+    def search_multiple(self, keywords: list[str], *, deadline: Deadline | None = None) -> dict:
+        """
+        Search multiple keywords and combine results (deduplicated by id).
+
+        With a deadline, each search gets the remaining budget and none is started with less
+        than MIN_SEARCH_BUDGET left. When the budget runs out, or a search times out or can't
+        connect, the remaining keywords are skipped and "truncated" is set. "searched" lists
+        the keywords whose results are included.
+        """
         all_products = {}
+        searched: list[str] = []
         for kw in keywords:
-            for p in self.search(kw).get("products", []):
+            if deadline is not None and not deadline.allows(MIN_SEARCH_BUDGET):
+                return {"products": list(all_products.values()), "searched": searched, "truncated": True}
+            try:
+                found = self.search(kw, timeout=remaining_timeout(deadline)).get("products", [])
+            except (requests.Timeout, requests.ConnectionError):
+                metrics.inc("search_errors_total")
+                return {"products": list(all_products.values()), "searched": searched, "truncated": True}
+            searched.append(kw)
+            for p in found:
                 pid = p.get("id")
                 if pid and pid not in all_products:
                     all_products[pid] = p
-        return {"products": list(all_products.values())}
-    
-    def lookup_by_name(self, product_name: str) -> dict | None:
+        return {"products": list(all_products.values()), "searched": searched}
+
+    def lookup_by_name(self, product_name: str, *, timeout: float | None = None) -> dict | None:
         """Search by product name, return best match (highest relevance) or None."""
         if not product_name or not product_name.strip():
             return None
-        result = self.search(product_name.strip(), limit=5)
+        result = self.search(product_name.strip(), limit=5, timeout=timeout)
         products = result.get("products", [])
         if not products:
             return None
@@ -117,22 +202,31 @@ class EdibleAPIClient:
         best = max(products, key=_score)
         return best
 
-    def lookup_by_url(self, url: str) -> dict | None:
+    def lookup_by_url(self, url: str, *, timeout: float | None = None) -> dict | None:
         """Extract slug from URL, search by slug, return best match or None."""
         slug = parse_product_url(url)
         if not slug:
             return None
-        return self.lookup_by_name(slug)
+        return self.lookup_by_name(slug, timeout=timeout)
 
-    def format_for_llm(self, products: list[dict]) -> str:
-        """Format product data as context for LLM prompts (includes description for relevance)."""
+    def format_for_llm(
+        self, products: list[dict], *, numbered: bool = False, description_chars: int | None = None
+    ) -> str:
+        """
+        Format product data as context for LLM prompts (includes description for relevance).
+
+        numbered=True labels products [1], [2], ... so the LLM can answer with numbers.
+        description_chars cuts each description to that length (0 leaves it out).
+        """
         blocks = []
-        for p in products:
+        for n, p in enumerate(products, 1):
             name = p.get("name", "Unknown")
             price = p.get("price", "N/A")
             desc = (p.get("description") or "").strip()
+            if description_chars is not None:
+                desc = desc[:description_chars].strip()
             occasion = (p.get("occasion") or "").strip()
-            block = [f"- {name} | ${price}"]
+            block = [f"[{n}] {name} | ${price}" if numbered else f"- {name} | ${price}"]
             if occasion:
                 block.append(f"  Occasion: {occasion}")
             if desc:
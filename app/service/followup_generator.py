@@ -1,11 +1,19 @@
 """Follow-up question generator for vague intent - Layer 2a."""
 
-from app.prompts.followup import FOLLOWUP_GENERATOR
+from app.prompts.followup import FOLLOWUP_GENERATOR, FOLLOWUP_TEMPLATE_DEFAULT, FOLLOWUP_TEMPLATES
 from app.service.llm_client import complete
 
 
-def generate_followup_question(user_message: str, followup_reason: str) -> str:
+def generate_followup_question(
+    user_message: str, followup_reason: str, *, timeout: float | None = None
+) -> str:
     """Generate a clarifying question when user intent is vague."""
     reason = followup_reason or "occasion and budget unclear"
     user_content = f"User said: \"{user_message}\"\n\nWe need to ask about: {reason}"
-    return complete(FOLLOWUP_GENERATOR, user_content).strip()
+    return complete(FOLLOWUP_GENERATOR, user_content, call_site="followup", timeout=timeout).strip()
+
+
+def template_followup_question(followup_reason: str | None) -> str:
+    """Clarifying question from a fixed template (no LLM)."""
+    reason = (followup_reason or "").strip().lower()
+    return FOLLOWUP_TEMPLATES.get(reason, FOLLOWUP_TEMPLATE_DEFAULT)
@@ -0,0 +1,164 @@
+"""Micro-batching for intent classification (opt-in with INTENT_BATCHING=1).
+
+Requests that arrive within INTENT_BATCH_WINDOW_MS of each other (up to INTENT_BATCH_MAX)
+share one LLM call. The classifier instructions are sent once, not per request. The
+messages go in as a JSON array of {"key", "message"} objects, so a message can't forge
+another request's boundary, and the reply is a JSON object keyed by request key. Keys are
+random (uuid4), so a message can't name a neighbour's key to steer its result. The first request in a batch waits out the
+window and makes the call; the others block until it fans results back. An unparseable
+reply, a request missing from it, or a batch call that times out falls back to individual
+calls, each within its own remaining budget. A request with less than
+INTENT_BATCH_MIN_BUDGET seconds left is kept out of the batch (whose timeout is the
+smallest budget among its members), so it can't cut the call short for the others. A lone
+request is always classified individually.
+
+The batch call's token usage is split evenly across its members (usage.split_call), so
+per-request and per-conversation totals stay correct.
+
+Metrics: intent_batch_size, intent_batch_wait_seconds (latency added by the window),
+intent_batch_tokens_saved_total (estimated instruction tokens not re-sent) and
+intent_batch_fallbacks_total{reason} (error, parse, missing, timeout or budget).
+"""
+
+import os
+import json
+import threading
+import time
+from uuid import uuid4
+
+from openai import APITimeoutError
+
+from app.prompts.intent import INTENT_CLASSIFIER, INTENT_CLASSIFIER_BATCH
+from app.service import metrics, usage
+from app.service.llm_client import RateLimited, complete_json
+from app.service.llm_governor import GovernorRejected
+
+INTENT_BATCHING = os.getenv("INTENT_BATCHING", "0") == "1"
+INTENT_BATCH_WINDOW_MS = float(os.getenv("INTENT_BATCH_WINDOW_MS", "15"))
+INTENT_BATCH_MAX = int(os.getenv("INTENT_BATCH_MAX", "8"))
+INTENT_BATCH_MIN_BUDGET = float(os.getenv("INTENT_BATCH_MIN_BUDGET", "2"))  # seconds
+
+BATCH_SIZE_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16)
+# Rough tokens per instructions copy (~4 characters per token)
+_INSTRUCTION_TOKENS = len(INTENT_CLASSIFIER) // 4
+
+
+class _Pending:
+    """One waiting request."""
+
+    def __init__(self, key: str, user_content: str, timeout: float | None):
+        self.key = key
+        self.user_content = user_content
+        self.timeout = timeout
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result: dict | None = None  # None after done = classify individually
+        self.error: BaseException | None = None
+        self.usage: list[usage.CallUsage] = []  # This request's share of the batch call
+
+
+class _Batch:
+    def __init__(self):
+        self.items: list[_Pending] = []
+        self.full = threading.Event()
+
+
+class IntentBatcher:
+    """Collects concurrent classify() calls into batches. Thread-safe."""
+
+    def __init__(self, window: float = INTENT_BATCH_WINDOW_MS / 1000, max_size: int = INTENT_BATCH_MAX):
+        self.window = window
+        self.max_size = max(1, max_size)
+        self._lock = threading.Lock()
+        self._open: _Batch | None = None
+
+    def classify(self, user_content: str, *, timeout: float | None = None) -> dict:
+        """Raw classifier JSON for one request (same shape as an individual call)."""
+        item = _Pending(uuid4().hex, user_content, timeout)
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.items.append(item)
+            if len(batch.items) >= self.max_size:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._dispatch(batch.items)
+        else:
+            item.done.wait()
+
+        usage.attach_calls(item.usage)
+        if item.error is not None:
+            raise item.error
+        if item.result is not None:
+            return item.result
+        left = None if timeout is None else timeout - (time.perf_counter() - item.enqueued)
+        if left is not None and left <= 0:
+            raise APITimeoutError(request=None)  # type: ignore[arg-type]
+        return complete_json(INTENT_CLASSIFIER, user_content, call_site="intent", timeout=left)
+
+    def _dispatch(self, items: list[_Pending]) -> None:
+        """Classify a closed batch and wake its members."""
+        now = time.perf_counter()
+        metrics.observe("intent_batch_size", len(items), buckets=BATCH_SIZE_BUCKETS)
+        for it in items:
+            metrics.observe("intent_batch_wait_seconds", now - it.enqueued)
+        try:
+            if len(items) < 2:
+                return
+            left = {it.key: None if it.timeout is None else it.timeout - (now - it.enqueued) for it in items}
+            batch = [it for it in items if left[it.key] is None or left[it.key] >= INTENT_BATCH_MIN_BUDGET]
+            if len(batch) < len(items):
+                metrics.inc("intent_batch_fallbacks_total", len(items) - len(batch), reason="budget")
+            if len(batch) < 2:
+                return
+            timeouts = [left[it.key] for it in batch if left[it.key] is not None]
+            user_content = json.dumps(
+                [{"key": it.key, "message": it.user_content} for it in batch], ensure_ascii=False
+            )
+            try:
+                # Record the call apart from the leader's request, then share it out
+                with usage.track_request() as calls:
+                    data = complete_json(
+                        INTENT_CLASSIFIER_BATCH,
+                        user_content,
+                        call_site="intent_batch",
+                        timeout=min(timeouts) if timeouts else None,
+                    )
+                for call in calls:
+                    for it, share in zip(batch, usage.split_call(call, len(batch))):
+                        it.usage.append(share)
+            except (GovernorRejected, RateLimited) as e:
+                # Saturated: individual calls would only queue on the same limits
+                for it in batch:
+                    it.error = e
+                return
+            except APITimeoutError:
+                metrics.inc("intent_batch_fallbacks_total", len(batch), reason="timeout")
+                return
+            except Exception:
+                metrics.inc("intent_batch_fallbacks_total", len(batch), reason="error")
+                return
+            if not isinstance(data, dict):
+                metrics.inc("intent_batch_fallbacks_total", len(batch), reason="parse")
+                return
+            for it in batch:
+                result = data.get(it.key)
+                if isinstance(result, dict):
+                    it.result = result
+                else:
+                    metrics.inc("intent_batch_fallbacks_total", reason="missing")
+            metrics.inc("intent_batch_tokens_saved_total", _INSTRUCTION_TOKENS * (len(batch) - 1))
+        finally:
+            for it in items:
+                it.done.set()
+
+
+intent_batcher = IntentBatcher()
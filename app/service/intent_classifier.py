@@ -3,6 +3,8 @@
 from typing import TypedDict
 
 from app.prompts.intent import INTENT_CLASSIFIER
+from app.service import intent_batcher
+from app.service.conversation_state import ConversationState, render_state
 from app.service.llm_client import complete_json
 
 
@@ -24,6 +26,8 @@ def get_intent(
     *,
     recent_recommendations_shown: bool = False,
     recent_product_names: list[str] | None = None,
+    conversation_state: ConversationState | None = None,
+    timeout: float | None = None,
 ) -> Intent:
     """
     Classify user intent from their message.
@@ -33,11 +37,19 @@ def get_intent(
         conversation_history: Optional list of {"role": "user"|"assistant", "content": "..."} for context.
         recent_recommendations_shown: If True, the assistant just showed product recommendations;
             the user's message may be feedback (e.g. "cheaper", "more fun").
+        conversation_state: Rolling summary of earlier turns. When given, it is sent
+            instead of the raw history so the prompt size stays bounded.
+        timeout: Optional LLM budget in seconds (the request's remaining time).
+
+    With INTENT_BATCHING=1, concurrent calls share one LLM request (see intent_batcher).
 
     Returns:
         Intent dict with intent_type, keywords, needs_followup, etc.
     """
-    if conversation_history:
+    if conversation_state:
+        context = render_state(conversation_state, include_shown=not recent_product_names)
+        user_content = f"{context}\n\nLatest user message: {user_message}"
+    elif conversation_history:
         context = "\n".join(
             f"{m['role']}: {m['content']}" for m in conversation_history[-6:]
         )
@@ -51,7 +63,10 @@ def get_intent(
     if recent_product_names:
         user_content += f"\n\n[Recently shown products (use these names for 'compare these' or 'first two'): {', '.join(recent_product_names)}]"
 
-    result = complete_json(INTENT_CLASSIFIER, user_content)
+    if intent_batcher.INTENT_BATCHING:
+        result = intent_batcher.intent_batcher.classify(user_content, timeout=timeout)
+    else:
+        result = complete_json(INTENT_CLASSIFIER, user_content, call_site="intent", timeout=timeout)
 
     products_to_compare = result.get("products_to_compare")
     if not isinstance(products_to_compare, list):
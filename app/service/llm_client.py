@@ -2,54 +2,251 @@
 
 import json
 import os
+import threading
+import time
 
 import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APITimeoutError, OpenAI, RateLimitError
 
-load_dotenv()
+from app.service import metrics
+from app.service.llm_governor import PRIORITY_INTERACTIVE, GovernorRejected, estimate_tokens, llm_governor
+from app.service.llm_routing import get_route
+from app.service.usage import record_call
+
+_env_loaded = False
+_client: OpenAI | None = None
+_client_key: tuple[str, str | None] | None = None
+_client_lock = threading.Lock()
+
+
+def _load_env() -> None:
+    """Load .env once, on first use rather than at import (create_app loads it earlier)."""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+def _new_client(api_key: str) -> OpenAI:
+    """Build an OpenAI client. Handles httpx 0.28+ compatibility."""
+    try:
+        return OpenAI()
+    except TypeError as e:
+        if "proxies" in str(e):
+            http_client = httpx.Client(timeout=60.0, follow_redirects=True)
+            return OpenAI(api_key=api_key, http_client=http_client)
+        raise
 
 
 def _get_client() -> OpenAI:
-    """Return OpenAI client. Uses env OPENAI_API_KEY. Handles httpx 0.28+ compatibility."""
+    """
+    Return the shared OpenAI client. Uses env OPENAI_API_KEY (and OPENAI_BASE_URL).
+
+    One client per process keeps its connection pool warm across calls; it is rebuilt if
+    the key or base URL changes.
+    """
+    global _client, _client_key
+    _load_env()
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError(
             "OPENAI_API_KEY not set. Add it to .env or export it. "
             "Copy .env.example to .env and add your key."
         )
+    key = (api_key, os.getenv("OPENAI_BASE_URL"))
+    with _client_lock:
+        if _client is None or _client_key != key:
+            _client = _new_client(api_key)
+            _client_key = key
+        return _client
+
+
+def _record_usage(call_site: str, model: str, response, latency_ms: float) -> None:
+    """Record token usage from a Responses API result (missing fields count as 0)."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "input_tokens_details", None)
+    record_call(
+        call_site,
+        getattr(response, "model", None) or model,
+        input_tokens=getattr(usage, "input_tokens", 0) or 0,
+        cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+        output_tokens=getattr(usage, "output_tokens", 0) or 0,
+        latency_ms=latency_ms,
+    )
+
+
+# Minimal Responses API reply, used by prewarm()
+_PREWARM_RESPONSE = {
+    "id": "resp_prewarm",
+    "object": "response",
+    "created_at": 0,
+    "model": "prewarm",
+    "status": "completed",
+    "parallel_tool_calls": False,
+    "tool_choice": "auto",
+    "tools": [],
+    "output": [{
+        "type": "message",
+        "id": "msg_prewarm",
+        "role": "assistant",
+        "status": "completed",
+        "content": [{"type": "output_text", "text": "{}", "annotations": []}],
+    }],
+    "usage": {
+        "input_tokens": 0,
+        "input_tokens_details": {"cached_tokens": 0},
+        "output_tokens": 0,
+        "output_tokens_details": {"reasoning_tokens": 0},
+        "total_tokens": 0,
+    },
+}
+
+
+def prewarm() -> None:
+    """
+    Run one canned request/response through the SDK over an in-process transport (no network).
+
+    The SDK builds its pydantic response schemas on first parse, which otherwise lands on
+    the first real call (~0.5s). Calling this before fork lets workers inherit them.
+    """
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=_PREWARM_RESPONSE))
+    client = OpenAI(
+        api_key="prewarm",
+        base_url="http://prewarm.invalid/v1",
+        http_client=httpx.Client(transport=transport),
+    )
+    response = client.responses.create(model="prewarm", instructions="", input="")
+    _ = response.output_text, response.usage
+
+
+def _retry_after(error: RateLimitError) -> float:
+    """Seconds the provider asked us to wait (retry-after-ms / retry-after headers; default 1)."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
     try:
-        return OpenAI()
-    except TypeError as e:
-        if "proxies" in str(e):
-            http_client = httpx.Client(timeout=60.0, follow_redirects=True)
-            return OpenAI(api_key=api_key, http_client=http_client)
-        raise
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        return float(headers.get("retry-after") or 1.0)
+    except ValueError:
+        return 1.0
+
+
+class RateLimited(APITimeoutError):
+    """The provider still answered 429 after the governor waited out its Retry-After once."""
+
+    retry_after = 1.0  # Seconds, from the last 429
+
+
+def _governed_create(client: OpenAI, *, call_site: str, priority: str, estimate: int,
+                     budget_end: float | None, timeout: float, **kwargs):
+    """
+    responses.create behind the governor. A 429 pauses the governor for the provider's
+    Retry-After and the call queues once more (within budget_end) instead of failing. A
+    second 429 raises RateLimited, which callers degrade on like a timeout.
+    """
+    for retried in (False, True):
+        wait_budget = None if budget_end is None else budget_end - time.perf_counter()
+        lease = llm_governor.acquire(priority, estimate, timeout=wait_budget)
+        used = None
+        try:
+            attempt_timeout = timeout if budget_end is None else min(timeout, budget_end - time.perf_counter())
+            if attempt_timeout <= 0:
+                raise APITimeoutError(request=None)  # type: ignore[arg-type]
+            response = client.responses.create(timeout=attempt_timeout, **kwargs)
+            usage = getattr(response, "usage", None)
+            used = getattr(usage, "total_tokens", None)
+            return response
+        except RateLimitError as e:
+            metrics.inc("llm_rate_limited_total", call_site=call_site, model=kwargs.get("model"))
+            llm_governor.throttle(_retry_after(e))
+            if retried:
+                error = RateLimited(request=None)  # type: ignore[arg-type]
+                error.retry_after = _retry_after(e)
+                raise error from e
+        finally:
+            llm_governor.release(lease, used)
 
 
 def complete(
     system_prompt: str,
     user_message: str,
     *,
-    model: str = "gpt-4o-mini",
+    model: str | None = None,
     json_mode: bool = False,
+    call_site: str = "default",
+    timeout: float | None = None,
+    priority: str = PRIORITY_INTERACTIVE,
 ) -> str:
     """
     Send a completion request using the Responses API. Return the assistant's text.
+
+    call_site labels the calling flow (intent, greeting, followup, recommender, comparison)
+    for usage accounting and selects its route (model, max output tokens, latency budget).
+    If the primary model exceeds its budget and the route has a fallback_model, the call
+    is retried once on the fallback. model overrides the route's model; timeout is the
+    caller's total remaining budget (e.g. from a request Deadline) and caps both attempts.
+    Every attempt goes through the LLM governor; priority is PRIORITY_INTERACTIVE for the
+    chat flow or PRIORITY_BACKGROUND for jobs that shouldn't compete with it. A call the
+    governor can't admit in time raises GovernorRejected, and a repeated 429 RateLimited;
+    both are APITimeoutErrors (so callers degrade) and skip the fallback model.
     """
     client = _get_client()
+    route = get_route(call_site)
     # Responses API requires "json" in input when using json_object format
     input_text = f"{user_message}\n\nRespond with JSON." if json_mode else user_message
     kwargs = {
-        "model": model,
         "instructions": system_prompt,
         "input": input_text,
     }
     if json_mode:
         kwargs["text"] = {"format": {"type": "json_object"}}
+    if route["max_output_tokens"]:
+        kwargs["max_output_tokens"] = route["max_output_tokens"]
+
+    primary = model or route["model"]
+    attempts = [(primary, route["timeout"])]
+    fallback = route["fallback_model"]
+    if fallback and fallback != primary:
+        attempts.append((fallback, route["fallback_timeout"]))
 
-    response = client.responses.create(**kwargs)
-    return response.output_text or ""
+    # Prompt size plus the most the reply may use, as providers count it against TPM
+    estimate = estimate_tokens(system_prompt + input_text) + (route["max_output_tokens"] or 0)
+    call_start = time.perf_counter()
+    budget_end = None if timeout is None else call_start + timeout
+    for i, (attempt_model, attempt_timeout) in enumerate(attempts):
+        is_last = i == len(attempts) - 1
+        if budget_end is not None and budget_end - time.perf_counter() <= 0:
+            metrics.inc("llm_timeouts_total", call_site=call_site, model=attempt_model)
+            raise APITimeoutError(request=None)  # type: ignore[arg-type]
+        # Don't burn the budget on SDK retries when a fallback or a deadline is waiting
+        attempt_client = client if (is_last and timeout is None) else client.with_options(max_retries=0)
+        start = time.perf_counter()
+        try:
+            response = _governed_create(
+                attempt_client,
+                call_site=call_site,
+                priority=priority,
+                estimate=estimate,
+                budget_end=budget_end,
+                timeout=attempt_timeout,
+                model=attempt_model,
+                **kwargs,
+            )
+        except (GovernorRejected, RateLimited):
+            # Saturated, not slow: the fallback model would wait on the same governor
+            raise
+        except APITimeoutError:
+            metrics.inc("llm_timeouts_total", call_site=call_site, model=attempt_model)
+            if is_last:
+                raise
+            metrics.inc("llm_fallbacks_total", call_site=call_site, model=attempts[i + 1][0])
+            continue
+        except Exception:
+            metrics.inc("llm_call_errors_total", call_site=call_site, model=attempt_model)
+            raise
+        _record_usage(call_site, attempt_model, response, (time.perf_counter() - start) * 1000)
+        return response.output_text or ""
+    return ""
 
 
 def complete_json(
@@ -0,0 +1,178 @@
+"""Process-wide governor for outbound LLM calls: a concurrency cap and per-minute budgets.
+
+Every llm_client.complete attempt takes a slot here first. A call may start when it is at
+the head of the queue, a concurrency slot is free, and the request and token buckets
+(LLM_RPM, LLM_TPM; refilled continuously, like the provider's limits) hold enough for
+it. The token cost is estimated from the prompt size plus the route's max output tokens,
+then corrected with the reported usage when the call returns. Interactive calls (the
+chat flow) queue ahead of background ones (precompute jobs, prefetch, evaluation), and
+background calls may use at most LLM_BACKGROUND_SHARE of the concurrency slots. A 429
+from the provider pauses the governor for the Retry-After period.
+
+Calls wait at most LLM_MAX_QUEUE_WAIT seconds (or the caller's remaining budget) and then
+raise GovernorRejected, an APITimeoutError that callers already degrade on. llm_client
+tells it apart from a provider timeout: it isn't counted in llm_timeouts_total and doesn't
+trigger the fallback model, which would only queue on the same governor.
+
+Metrics: llm_governor_wait_seconds{priority}, llm_governor_queue_depth,
+llm_governor_inflight, llm_governor_rejected_total{priority}.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+
+from openai import APITimeoutError
+
+from app.service import metrics
+
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "32"))  # 0 = no cap
+LLM_RPM = int(os.getenv("LLM_RPM", "0"))  # Requests per minute; 0 = no budget
+LLM_TPM = int(os.getenv("LLM_TPM", "0"))  # Tokens per minute; 0 = no budget
+LLM_MAX_QUEUE_WAIT = float(os.getenv("LLM_MAX_QUEUE_WAIT", "10"))
+LLM_BACKGROUND_SHARE = float(os.getenv("LLM_BACKGROUND_SHARE", "0.5"))
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)  # Served in this order
+
+
+class GovernorRejected(APITimeoutError):
+    """A call waited too long for a governor slot (never reached the provider)."""
+
+    retry_after = 1.0  # Seconds; for a 503's Retry-After
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text or "") // 4)
+
+
+class _Bucket:
+    """Token bucket holding up to `capacity`, refilled at capacity per `window` seconds."""
+
+    def __init__(self, capacity: float, window: float):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        amount = min(amount, self.capacity)  # A call bigger than the bucket waits for a full one
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class Lease:
+    """A granted slot. Pass it back to release() with the tokens actually used."""
+
+    def __init__(self, priority: str, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+
+
+class LLMGovernor:
+    """Concurrency cap plus request/token buckets, with a priority queue. Thread-safe."""
+
+    def __init__(
+        self,
+        max_concurrent: int = LLM_MAX_CONCURRENT,
+        rpm: int = LLM_RPM,
+        tpm: int = LLM_TPM,
+        max_wait: float = LLM_MAX_QUEUE_WAIT,
+        background_share: float = LLM_BACKGROUND_SHARE,
+        window: float = 60.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.background_slots = max(1, math.floor(max_concurrent * background_share)) if max_concurrent else 0
+        self._requests = _Bucket(rpm, window) if rpm > 0 else None
+        self._tokens = _Bucket(tpm, window) if tpm > 0 else None
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int]] = []  # (priority rank, seq) heap
+        self._seq = itertools.count()
+        self._inflight = {p: 0 for p in PRIORITIES}
+        self._paused_until = 0.0
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"inflight": sum(self._inflight.values()), "queued": len(self._queue)}
+
+    def _blocked_for(self, priority: str, tokens: int, now: float) -> float | None:
+        """0 if the call can start now, seconds until a bucket refills, or None (wait for a release)."""
+        inflight = sum(self._inflight.values())
+        if self.max_concurrent and inflight >= self.max_concurrent:
+            return None
+        if priority == PRIORITY_BACKGROUND and self.max_concurrent and self._inflight[priority] >= self.background_slots:
+            return None
+        wait = max(0.0, self._paused_until - now)
+        for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_for(amount))
+        return wait
+
+    def _publish(self) -> None:
+        metrics.set_gauge("llm_governor_queue_depth", len(self._queue))
+        metrics.set_gauge("llm_governor_inflight", sum(self._inflight.values()))
+
+    def acquire(self, priority: str = PRIORITY_INTERACTIVE, tokens: int = 0, *, timeout: float | None = None) -> Lease:
+        """Wait for a slot and budget. Raises GovernorRejected after max_wait (or timeout, if sooner)."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {PRIORITIES}")
+        start = time.monotonic()
+        limit = self.max_wait if timeout is None else min(self.max_wait, timeout)
+        entry = (PRIORITIES.index(priority), next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            self._publish()
+            try:
+                while True:
+                    now = time.monotonic()
+                    blocked = self._blocked_for(priority, tokens, now) if self._queue[0] == entry else None
+                    if blocked == 0:
+                        break
+                    left = limit - (now - start)
+                    if left <= 0:
+                        metrics.inc("llm_governor_rejected_total", priority=priority)
+                        raise GovernorRejected(request=None)  # type: ignore[arg-type]
+                    self._cond.wait(left if blocked is None else min(left, blocked))
+                for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                    if bucket is not None:
+                        bucket.take(amount)
+                self._inflight[priority] += 1
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._publish()
+                self._cond.notify_all()  # The head may have changed
+        metrics.observe("llm_governor_wait_seconds", time.monotonic() - start, priority=priority)
+        return Lease(priority, tokens)
+
+    def release(self, lease: Lease, used_tokens: int | None = None) -> None:
+        """Free the slot. used_tokens (from the response's usage) corrects the estimate."""
+        with self._cond:
+            self._inflight[lease.priority] -= 1
+            if self._tokens is not None and used_tokens is not None:
+                self._tokens.refill(time.monotonic())
+                self._tokens.level = min(self._tokens.capacity, self._tokens.level + lease.tokens - used_tokens)
+            self._publish()
+            self._cond.notify_all()
+
+    def throttle(self, seconds: float) -> None:
+        """Hold all new calls for `seconds` (after a 429 from the provider)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+llm_governor = LLMGovernor()
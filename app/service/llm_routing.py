@@ -0,0 +1,101 @@
+"""Per-call-site LLM routing: model, output cap, latency budget and fast-tier fallback.
+
+Defaults live in DEFAULT_ROUTES. Override without code changes via:
+- LLM_ROUTING_FILE: path to a JSON file {"recommender": {"model": "...", "timeout": 12}, ...}
+- LLM_ROUTING: the same JSON inline
+- LLM_<SITE>_MODEL, LLM_<SITE>_MAX_OUTPUT_TOKENS, LLM_<SITE>_TIMEOUT,
+  LLM_<SITE>_FALLBACK_MODEL, LLM_<SITE>_FALLBACK_TIMEOUT (e.g. LLM_GREETING_MODEL)
+
+Env vars win over LLM_ROUTING, which wins over the file.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import TypedDict
+
+
+class Route(TypedDict):
+    """Routing settings for one call site."""
+
+    model: str
+    max_output_tokens: int | None
+    timeout: float  # Latency budget (seconds) for the primary model
+    fallback_model: str | None  # Fast tier, tried once if the primary exceeds its budget
+    fallback_timeout: float
+
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+DEFAULT_ROUTES: dict[str, Route] = {
+    "default": Route(model=DEFAULT_MODEL, max_output_tokens=None, timeout=30.0, fallback_model=None, fallback_timeout=15.0),
+    "intent": Route(model=DEFAULT_MODEL, max_output_tokens=300, timeout=8.0, fallback_model=None, fallback_timeout=5.0),
+    "intent_batch": Route(model=DEFAULT_MODEL, max_output_tokens=2400, timeout=10.0, fallback_model=None, fallback_timeout=6.0),
+    "greeting": Route(model=DEFAULT_MODEL, max_output_tokens=120, timeout=6.0, fallback_model=None, fallback_timeout=4.0),
+    "followup": Route(model=DEFAULT_MODEL, max_output_tokens=120, timeout=6.0, fallback_model=None, fallback_timeout=4.0),
+    "recommender": Route(model=DEFAULT_MODEL, max_output_tokens=900, timeout=20.0, fallback_model=None, fallback_timeout=10.0),
+    "comparison": Route(model=DEFAULT_MODEL, max_output_tokens=300, timeout=20.0, fallback_model=None, fallback_timeout=10.0),
+    "pitch": Route(model=DEFAULT_MODEL, max_output_tokens=2000, timeout=60.0, fallback_model=None, fallback_timeout=30.0),
+}
+
+_FIELD_TYPES = {
+    "model": str,
+    "max_output_tokens": int,
+    "timeout": float,
+    "fallback_model": str,
+    "fallback_timeout": float,
+}
+
+_routes: dict[str, Route] | None = None
+
+
+def _coerce(field: str, value):
+    """Coerce a config value; empty / "none" clears optional fields."""
+    if value is None or (isinstance(value, str) and value.strip().lower() in ("", "none", "null")):
+        if field in ("max_output_tokens", "fallback_model"):
+            return None
+        raise ValueError(f"LLM routing: {field} cannot be empty")
+    return _FIELD_TYPES[field](value)
+
+
+def _apply(routes: dict[str, Route], overrides: dict) -> None:
+    for site, fields in (overrides or {}).items():
+        if not isinstance(fields, dict):
+            raise ValueError(f"LLM routing for {site!r} must be an object")
+        route = routes.setdefault(site, Route(**routes["default"]))
+        for field, value in fields.items():
+            if field not in _FIELD_TYPES:
+                raise ValueError(f"Unknown LLM routing field {field!r} for {site!r}")
+            route[field] = _coerce(field, value)
+
+
+def load_routes(env: dict | None = None) -> dict[str, Route]:
+    """Build the routing table from defaults plus file / inline JSON / env overrides."""
+    env = os.environ if env is None else env
+    routes = {site: Route(**r) for site, r in DEFAULT_ROUTES.items()}
+
+    path = env.get("LLM_ROUTING_FILE")
+    if path:
+        _apply(routes, json.loads(Path(path).read_text()))
+    if env.get("LLM_ROUTING"):
+        _apply(routes, json.loads(env["LLM_ROUTING"]))
+
+    for site in list(routes):
+        for field in _FIELD_TYPES:
+            value = env.get(f"LLM_{site.upper()}_{field.upper()}")
+            if value is not None:
+                routes[site][field] = _coerce(field, value)
+    return routes
+
+
+def reload_routes() -> dict[str, Route]:
+    """Re-read config (e.g. after env changes in tests)."""
+    global _routes
+    _routes = load_routes()
+    return _routes
+
+
+def get_route(call_site: str) -> Route:
+    """Routing settings for a call site (falls back to "default")."""
+    routes = _routes if _routes is not None else reload_routes()
+    return routes.get(call_site) or routes["default"]
@@ -0,0 +1,92 @@
+"""Local (LLM-free) candidate ranking: search score, budget / occasion match, category diversity."""
+
+import re
+
+OCCASIONS = (
+    "birthday", "anniversary", "mother's day", "father's day", "valentine's day", "thank you",
+    "sympathy", "get well", "congratulations", "graduation", "christmas", "holiday",
+    "wedding", "new baby", "retirement", "back to school", "easter", "halloween",
+)
+# Categories that say nothing about what the product is
+GENERIC_CATEGORIES = {"all products", "featured arrangements", "business gifts", "dippedfruit.com", "best sellers"}
+
+SCORE_WEIGHT = 1.0
+BUDGET_WEIGHT = 0.6
+OCCASION_WEIGHT = 0.5
+DIVERSITY_PENALTY = 0.35  # Per already-picked product in the same category
+
+
+def extract_budget(text: str) -> float | None:
+    """Upper price bound from text like "under $50", "$40", "around 40 dollars"."""
+    low = (text or "").lower().replace(",", "")
+    m = re.search(r"\$\s?(\d+(?:\.\d+)?)", low) or re.search(r"(\d+(?:\.\d+)?)\s*(?:dollars|bucks|usd)", low)
+    return float(m.group(1)) if m else None
+
+
+def extract_occasion(text: str) -> str | None:
+    """First known occasion mentioned in text (apostrophes optional)."""
+    low = (text or "").lower()
+    for occasion in OCCASIONS:
+        if occasion in low or occasion.replace("'", "") in low:
+            return occasion
+    if "valentine" in low:
+        return "valentine's day"
+    return None
+
+
+def primary_category(p: dict) -> str:
+    """Most specific category of a product ("" if none)."""
+    for c in (p.get("category") or "").split(","):
+        c = c.strip()
+        if c and c.lower() not in GENERIC_CATEGORIES:
+            return c.lower()
+    return ""
+
+
+def _matches_occasion(p: dict, occasion: str) -> bool:
+    haystack = f"{p.get('occasion') or ''} {p.get('name') or ''}".lower()
+    return occasion in haystack or occasion.replace("'", "") in haystack
+
+
+def rank_products(
+    products: list[dict],
+    *,
+    budget: float | None = None,
+    occasion: str | None = None,
+    limit: int = 4,
+) -> list[dict]:
+    """
+    Pick `limit` products by relevance, budget / occasion fit and category diversity.
+
+    Relevance is the search score normalized to 0-1. Products over budget are penalized in
+    proportion to how far over they are. Selection is greedy: each pick lowers the score of
+    remaining products in the same category, so results span categories when scores are close.
+    """
+    if not products:
+        return []
+    scores = [float(p.get("_search_score") or 0.0) for p in products]
+    top = max(scores) or 1.0
+
+    base: list[float] = []
+    for p, s in zip(products, scores):
+        value = SCORE_WEIGHT * s / top
+        price = p.get("price")
+        if budget and isinstance(price, (int, float)):
+            value += BUDGET_WEIGHT if price <= budget else -BUDGET_WEIGHT * min((price - budget) / budget, 2.0)
+        if occasion and _matches_occasion(p, occasion):
+            value += OCCASION_WEIGHT
+        base.append(value)
+
+    remaining = list(range(len(products)))
+    picked: list[int] = []
+    category_counts: dict[str, int] = {}
+    while remaining and len(picked) < limit:
+        best = max(
+            remaining,
+            key=lambda i: base[i] - DIVERSITY_PENALTY * category_counts.get(primary_category(products[i]), 0),
+        )
+        remaining.remove(best)
+        picked.append(best)
+        cat = primary_category(products[best])
+        category_counts[cat] = category_counts.get(cat, 0) + 1
+    return [products[i] for i in picked]
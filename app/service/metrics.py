@@ -0,0 +1,105 @@
+"""In-process metrics registry with Prometheus text export."""
+
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple], float] = {}
+_gauges: dict[tuple[str, tuple], float] = {}
+_histograms: dict[tuple[str, tuple], dict] = {}
+
+
+def _key(name: str, labels: dict) -> tuple[str, tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    """Increment a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Set a gauge to an absolute value."""
+    with _lock:
+        _gauges[_key(name, labels)] = float(value)
+
+
+def observe(name: str, value: float, *, buckets: tuple = DEFAULT_BUCKETS, **labels) -> None:
+    """Record one observation in a histogram."""
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            _histograms[key] = h
+        for i, bound in enumerate(h["buckets"]):
+            if value <= bound:
+                h["counts"][i] += 1
+        h["sum"] += value
+        h["count"] += 1
+
+
+def snapshot() -> dict:
+    """Return a JSON-friendly copy of all metrics."""
+
+    def _fmt(key: tuple[str, tuple]) -> str:
+        name, labels = key
+        if not labels:
+            return name
+        return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+    with _lock:
+        return {
+            "counters": {_fmt(k): v for k, v in _counters.items()},
+            "gauges": {_fmt(k): v for k, v in _gauges.items()},
+            "histograms": {
+                _fmt(k): {"count": h["count"], "sum": round(h["sum"], 6)}
+                for k, h in _histograms.items()
+            },
+        }
+
+
+def _labels_text(labels: tuple, extra: tuple = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    parts = []
+    for k, v in pairs:
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines: list[str] = []
+    with _lock:
+        for kind, store in (("counter", _counters), ("gauge", _gauges)):
+            seen: set[str] = set()
+            for (name, labels), value in sorted(store.items()):
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name}{_labels_text(labels)} {value:g}")
+        seen = set()
+        for (name, labels), h in sorted(_histograms.items()):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            for bound, count in zip(h["buckets"], h["counts"]):
+                lines.append(f"{name}_bucket{_labels_text(labels, (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{name}_bucket{_labels_text(labels, (('le', '+Inf'),))} {h['count']}")
+            lines.append(f"{name}_sum{_labels_text(labels)} {h['sum']:g}")
+            lines.append(f"{name}_count{_labels_text(labels)} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Clear all metrics (tests and benchmarks)."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
@@ -1,21 +1,54 @@
 """Orchestrator - ties intent (Layer 1) to response (Layer 2)."""
 
+import math
 from typing import TypedDict
 
+from openai import APITimeoutError
+
+from app.service import metrics
+from app.service.admission import Overloaded
+from app.service.catalog_cache import product_index
 from app.service.comparison import ComparisonResult, get_comparison
-from app.service.followup_generator import generate_followup_question
+from app.service.conversation_state import ConversationState, state_from_history, update_state
+from app.service.deadline import (
+    FOLLOWUP_TEMPLATE,
+    GREETING_TEMPLATE,
+    INTENT_TIMEOUT,
+    Deadline,
+    remaining_timeout,
+)
+from app.service.followup_generator import generate_followup_question, template_followup_question
 from app.service.intent_classifier import Intent, get_intent
-from app.service.llm_client import complete
+from app.service.llm_client import RateLimited, complete
+from app.service.llm_governor import GovernorRejected
+from app.service.prefetch import refinement_prefetcher
 from app.service.recommender import (
+    MODE_LLM,
     REFINEMENT_SEARCH_ADDITIONS,
     RecommendationResult,
     get_recommendations,
 )
+from app.service.response_cache import normalize_message, response_cache
+from app.service.sessions import sessions
+from app.service.usage import conversation_usage, summarize, track_request
 
 GREETING_PROMPT = """You are a friendly gift shopping assistant for edible.com (Edible Arrangements). The user just said hello or greeted you (e.g. "hi", "how are you", "hey").
 
 Respond warmly and naturally, like a real person. Keep it short (1-2 sentences). Then gently invite them to tell you what gift they're looking for—occasion, who it's for, or budget. Don't be robotic or salesy. Sound like a helpful friend."""
 
+GREETING_TEMPLATE_MESSAGE = (
+    "Hi there! I'd love to help you find a gift. "
+    "What's the occasion, who is it for, or do you have a budget in mind?"
+)
+
+# Skip a stage's LLM call (and use its template) with less than this many seconds left
+MIN_GREETING_BUDGET = 1.0
+MIN_FOLLOWUP_BUDGET = 1.0
+SHED_LLM_BUSY = "llm_busy"  # admission_shed_total reason when the intent call can't get through
+
+# A cached first-turn answer is dropped once a product it shows changes any of these
+CACHE_CHECK_FIELDS = ("name", "price")
+
 
 class OrchestratorResponse(TypedDict):
     """Response from the orchestrator."""
@@ -26,12 +59,39 @@ class OrchestratorResponse(TypedDict):
     comparison_table: list[dict] | None
 
 
+def _cacheable(result: dict) -> bool:
+    """
+    Whether a first-turn answer may be replayed: not degraded (a deadline artifact), not an
+    error fallback, and a search or comparison turn actually found something.
+    """
+    if result["degraded"] or result.get("error"):
+        return False
+    intent = result.get("intent") or {}
+    if intent.get("intent_type") in ("search", "clarify", "refinement") or intent.get("comparison_requested"):
+        return bool(result.get("products") or result.get("comparison_table"))
+    return True
+
+
+def _products_current(entry: dict) -> bool:
+    """False if a product in a cached answer has since changed name or price (or disappeared)."""
+    for p in entry["result"].get("products") or []:
+        if not p.get("id"):
+            continue
+        current = product_index.get(p["id"])
+        if current is None or any(current.get(f) != p.get(f) for f in CACHE_CHECK_FIELDS):
+            return False
+    return True
+
+
 def respond(
     user_message: str,
     conversation_history: list[dict] | None = None,
     *,
     last_products: list[dict] | None = None,
     last_search_query: str | None = None,
+    conversation_id: str | None = None,
+    deadline: Deadline | None = None,
+    recommendation_mode: str = MODE_LLM,
     debug: bool = False,
 ) -> OrchestratorResponse:
     """
@@ -49,43 +109,176 @@ def respond(
         conversation_history: Optional list of {"role": "user"|"assistant", "content": "..."}.
         last_products: Products shown in the last assistant message (for refinement).
         last_search_query: The user message that led to last_products (for refinement).
+        conversation_id: Optional client conversation id; LLM usage is rolled up per conversation.
+        deadline: Optional request deadline. Each stage gets the remaining budget; when it
+            runs short, stages degrade (template follow-up, stock recommendations, partial
+            comparison) and the response's "degraded" list says which.
+        recommendation_mode: "llm" (default) or "local" (ranked and templated without the LLM).
+        debug: If True, include raw LLM output and token usage in the response (never cached).
+
+    Stateless first turns (no history, last products or earlier server-side turns) are
+    served from the response cache when an equivalent message was answered recently.
 
     Returns:
         OrchestratorResponse with message, products, and intent.
     """
+    # Rolling summary of earlier turns, sent to the intent classifier instead of raw history
+    session = sessions.get(conversation_id) if conversation_id else None
+    state = (session or {}).get("conversation_state") or state_from_history(conversation_history)
+
+    stateless = not (conversation_history or last_products or last_search_query or state or debug)
+    cache_key = f"{recommendation_mode}:{normalize_message(user_message)}" if stateless else None
+    cached = response_cache.get(cache_key, valid=_products_current) if cache_key else None
+
+    with track_request(conversation_id) as calls:
+        if cached is not None:
+            result = cached["result"]
+            if session is not None and cached.get("candidate_pool"):
+                session["candidate_pool"] = cached["candidate_pool"]
+        else:
+            result = _respond(
+                user_message,
+                conversation_history,
+                last_products=last_products,
+                last_search_query=last_search_query,
+                conversation_id=conversation_id,
+                conversation_state=state,
+                deadline=deadline,
+                recommendation_mode=recommendation_mode,
+                debug=debug,
+            )
+    result.setdefault("degraded", [])
+    if cache_key and cached is None and _cacheable(result):
+        response_cache.put(
+            cache_key,
+            {"result": result, "candidate_pool": (session or {}).get("candidate_pool")},
+        )
+    if session is not None:
+        session["conversation_state"] = update_state(
+            state,
+            user_message,
+            assistant_message=result["message"],
+            intent=result.get("intent"),
+            products=result.get("products"),
+        )
+    intent_type = (result.get("intent") or {}).get("intent_type")
+    if conversation_id and result.get("products") and intent_type in ("search", "clarify"):
+        # The next turn is often "cheaper" or "fancier": search its expansions while the user reads.
+        # Anonymous turns would all share one per-session share, so they aren't prefetched.
+        pool = (session or {}).get("candidate_pool") or {}
+        refinement_prefetcher.schedule(conversation_id, exclude=pool.get("keywords") or [])
+    for kind in result["degraded"]:
+        metrics.inc("chat_degradations_total", kind=kind)
+    if debug:
+        result["usage"] = {
+            "request": summarize(calls),
+            "calls": list(calls),
+            "conversation": conversation_usage(conversation_id),
+        }
+    return result
+
+
+def _respond(
+    user_message: str,
+    conversation_history: list[dict] | None = None,
+    *,
+    last_products: list[dict] | None = None,
+    last_search_query: str | None = None,
+    conversation_id: str | None = None,
+    conversation_state: ConversationState | None = None,
+    deadline: Deadline | None = None,
+    recommendation_mode: str = MODE_LLM,
+    debug: bool = False,
+) -> OrchestratorResponse:
+    """Route one turn by intent. See respond()."""
+    # Server-side state for this conversation (candidate pool for refinements)
+    session = sessions.get(conversation_id) if conversation_id else None
     recent_recs = bool(last_products and last_search_query)
     recent_product_names = (
         [p.get("name") for p in last_products if p.get("name")]
         if last_products
         else None
     )
-    intent = get_intent(
-        user_message,
-        conversation_history,
-        recent_recommendations_shown=recent_recs,
-        recent_product_names=recent_product_names,
-    )
+    try:
+        intent = get_intent(
+            user_message,
+            conversation_history,
+            recent_recommendations_shown=recent_recs,
+            recent_product_names=recent_product_names,
+            conversation_state=conversation_state,
+            timeout=remaining_timeout(deadline),
+        )
+    except (GovernorRejected, RateLimited) as e:
+        # Nothing to answer from without an intent: shed the turn (503 + Retry-After)
+        metrics.inc("admission_shed_total", reason=SHED_LLM_BUSY)
+        raise Overloaded(SHED_LLM_BUSY, max(1, math.ceil(e.retry_after))) from e
+    except APITimeoutError:
+        if deadline is None:
+            raise
+        # No intent to route on within the deadline: ask the templated clarifying question
+        resp = {
+            "message": template_followup_question(None),
+            "products": [],
+            "intent": Intent(
+                intent_type="vague",
+                keywords=[],
+                needs_followup=True,
+                followup_reason=None,
+                comparison_requested=False,
+                products_to_compare=[],
+                confidence="low",
+            ),
+            "comparison_table": None,
+            "degraded": [INTENT_TIMEOUT],
+        }
+        return resp
 
     if intent["intent_type"] == "greeting":
-        message = complete(GREETING_PROMPT, user_message).strip()
-        return OrchestratorResponse(
-            message=message,
-            products=[],
-            intent=intent,
-            comparison_table=None,
-        )
+        degraded = []
+        message = ""
+        if deadline is None or deadline.allows(MIN_GREETING_BUDGET):
+            try:
+                message = complete(
+                    GREETING_PROMPT, user_message, call_site="greeting", timeout=remaining_timeout(deadline)
+                ).strip()
+            except APITimeoutError:
+                if deadline is None:
+                    raise
+        if not message:
+            message = GREETING_TEMPLATE_MESSAGE
+            degraded.append(GREETING_TEMPLATE)
+        resp: dict = {
+            "message": message,
+            "products": [],
+            "intent": intent,
+            "comparison_table": None,
+            "degraded": degraded,
+        }
+        return resp
 
     if intent["needs_followup"] and not (intent["intent_type"] == "refinement" and recent_recs):
-        message = generate_followup_question(
-            user_message,
-            intent.get("followup_reason") or "occasion and budget unclear",
-        )
-        return OrchestratorResponse(
-            message=message,
-            products=[],
-            intent=intent,
-            comparison_table=None,
-        )
+        reason = intent.get("followup_reason") or "occasion and budget unclear"
+        degraded = []
+        message = ""
+        if deadline is None or deadline.allows(MIN_FOLLOWUP_BUDGET):
+            try:
+                message = generate_followup_question(
+                    user_message, reason, timeout=remaining_timeout(deadline)
+                )
+            except APITimeoutError:
+                if deadline is None:
+                    raise
+        if not message:
+            message = template_followup_question(reason)
+            degraded.append(FOLLOWUP_TEMPLATE)
+        resp = {
+            "message": message,
+            "products": [],
+            "intent": intent,
+            "comparison_table": None,
+            "degraded": degraded,
+        }
+        return resp
 
     if intent["comparison_requested"]:
         products_to_compare = intent.get("products_to_compare") or []
@@ -93,13 +286,18 @@ def respond(
             result: ComparisonResult = get_comparison(
                 products_to_compare,
                 last_products=last_products,
+                deadline=deadline,
             )
-            return OrchestratorResponse(
-                message=result["message"],
-                products=result["products"],
-                intent=intent,
-                comparison_table=result.get("comparison_table"),
-            )
+            resp = {
+                "message": result["message"],
+                "products": result["products"],
+                "intent": intent,
+                "comparison_table": result.get("comparison_table"),
+                "degraded": result.get("degraded") or [],
+            }
+            if result.get("error"):
+                resp["error"] = True
+            return resp
         if last_products:
             message = (
                 "Which of these would you like to compare? "
@@ -134,14 +332,22 @@ def respond(
             previous_products=last_products,
             user_feedback=user_message,
             original_request=last_search_query,
+            deadline=deadline,
+            mode=recommendation_mode,
+            candidate_pool=session.get("candidate_pool") if session is not None else None,
             debug=debug,
         )
-        resp: dict = {
+        if session is not None and result.get("candidate_pool"):
+            session["candidate_pool"] = result["candidate_pool"]
+        resp = {
             "message": result["message"],
             "products": result["products"],
             "intent": intent,
             "comparison_table": None,
+            "degraded": result.get("degraded") or [],
         }
+        if result.get("error"):
+            resp["error"] = True
         if result.get("debug_llm_response"):
             resp["debug_llm_response"] = result["debug_llm_response"]
         return resp
@@ -150,14 +356,21 @@ def respond(
         result = get_recommendations(
             intent["keywords"],
             user_message,
+            deadline=deadline,
+            mode=recommendation_mode,
             debug=debug,
         )
+        if session is not None and result.get("candidate_pool"):
+            session["candidate_pool"] = result["candidate_pool"]
         resp = {
             "message": result["message"],
             "products": result["products"],
             "intent": intent,
             "comparison_table": None,
+            "degraded": result.get("degraded") or [],
         }
+        if result.get("error"):
+            resp["error"] = True
         if result.get("debug_llm_response"):
             resp["debug_llm_response"] = result["debug_llm_response"]
         return resp
@@ -0,0 +1,253 @@
+"""Precomputed per-product pitch text and tags, written offline by scripts/build_pitches.py.
+
+For each catalog product the job asks the LLM, in concurrent batches, for a short pitch
+(used as the recommendation blurb), occasion and recipient tags, and a one-line summary.
+Results go to PITCH_FILE as JSON lines, appended and fsynced per batch, so an interrupted
+run resumes where it stopped: products whose line is still current are skipped. Each line
+carries a hash of the product fields it was written from, so a product whose name,
+description, occasion, category or ingredients change is regenerated on the next run and
+its old pitch is not served meanwhile.
+
+At request time the recommender's "pitched" protocol sends the LLM only these summaries
+and tags and asks it to choose and order products; the blurbs come from the file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TypedDict
+
+from app.prompts.pitch import PITCH_SYSTEM, PITCH_USER_TEMPLATE
+from app.service import metrics
+from app.service.llm_client import complete_json
+from app.service.llm_governor import PRIORITY_BACKGROUND
+
+PITCH_FILE = os.getenv("PITCH_FILE", "")  # Unset = no precomputed pitches
+PITCH_RECHECK_SECONDS = float(os.getenv("PITCH_RECHECK_SECONDS", "30"))
+PITCH_BATCH_SIZE = int(os.getenv("PITCH_BATCH_SIZE", "10"))
+PITCH_CONCURRENCY = int(os.getenv("PITCH_CONCURRENCY", "4"))
+VERSION_FIELDS = ("name", "description", "occasion", "category", "ingredients")
+MAX_TAGS = 4
+MAX_DESCRIPTION_CHARS = 600  # Per product in the job's prompt
+
+
+class Pitch(TypedDict):
+    id: str
+    version: str
+    pitch: str
+    occasions: list[str]
+    recipients: list[str]
+    summary: str
+
+
+class PitchRunStats(TypedDict):
+    products: int
+    skipped: int  # Already current in the file
+    written: int
+    failed: int  # Products in batches that failed or came back incomplete
+
+
+def pitch_version(product: dict) -> str:
+    """Hash of the product fields a pitch is written from."""
+    fields = [str(product.get(f) or "") for f in VERSION_FIELDS]
+    return hashlib.sha1(json.dumps(fields).encode()).hexdigest()[:16]
+
+
+def read_pitches(path: str | Path) -> dict[str, Pitch]:
+    """Pitches by product id; later lines win. Unreadable lines (a crash mid-write) are skipped."""
+    pitches: dict[str, Pitch] = {}
+    try:
+        f = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return pitches
+    with f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(row, dict) and row.get("id") and row.get("pitch"):
+                pitches[str(row["id"])] = row  # type: ignore[assignment]
+    return pitches
+
+
+def write_pitches(pitches: dict[str, Pitch], path: str | Path) -> None:
+    """Rewrite the file with one line per product (atomic rename, like the catalog file)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for pid in sorted(pitches):
+                f.write(json.dumps(pitches[pid]) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _tags(value) -> list[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(t).strip().lower() for t in value if str(t).strip()][:MAX_TAGS]
+
+
+def _format_products(products: list[dict]) -> str:
+    blocks = []
+    for n, p in enumerate(products, 1):
+        block = [f"[{n}] {p.get('name', 'Unknown')}"]
+        for label, field in (("Occasion", "occasion"), ("Category", "category"), ("Ingredients", "ingredients")):
+            if p.get(field):
+                block.append(f"  {label}: {p[field]}")
+        desc = (p.get("description") or "").strip()
+        if desc:
+            block.append(f"  {desc[:MAX_DESCRIPTION_CHARS]}")
+        blocks.append("\n".join(block))
+    return "\n\n".join(blocks)
+
+
+def pitch_batch(products: list[dict]) -> list[Pitch]:
+    """One background LLM call for a batch; products the reply misses are left out."""
+    user_content = PITCH_USER_TEMPLATE.format(product_context=_format_products(products), count=len(products))
+    data = complete_json(PITCH_SYSTEM, user_content, call_site="pitch", priority=PRIORITY_BACKGROUND)
+    pitches = []
+    seen: set[int] = set()
+    for item in data.get("items") or []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            i = int(item.get("i"))
+        except (TypeError, ValueError):
+            continue
+        pitch = (item.get("pitch") or "").strip()
+        if not 1 <= i <= len(products) or i in seen or not pitch:
+            continue
+        seen.add(i)
+        p = products[i - 1]
+        pitches.append(Pitch(
+            id=str(p["id"]),
+            version=pitch_version(p),
+            pitch=pitch,
+            occasions=_tags(item.get("occasions")),
+            recipients=_tags(item.get("recipients")),
+            summary=(item.get("summary") or "").strip(),
+        ))
+    return pitches
+
+
+def generate_pitches(
+    products: list[dict],
+    path: str | Path,
+    *,
+    batch_size: int = PITCH_BATCH_SIZE,
+    concurrency: int = PITCH_CONCURRENCY,
+    progress=None,
+) -> PitchRunStats:
+    """
+    Write pitches for every product in `products` that doesn't have a current one in `path`.
+
+    Batches run concurrently; each finished batch is appended to the file before the next
+    is reported, so a crash loses at most the batches in flight. Failed batches are counted,
+    not raised; run again to retry them. The file is compacted to one line per product at
+    the end. progress, if given, is called with the running stats after each batch.
+    """
+    existing = read_pitches(path)
+    todo = []
+    for p in products:
+        if p.get("id") and p.get("name"):
+            current = existing.get(str(p["id"]))
+            if current is None or current.get("version") != pitch_version(p):
+                todo.append(p)
+    stats = PitchRunStats(products=len(products), skipped=len(products) - len(todo), written=0, failed=0)
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), max(1, batch_size))]
+    write_lock = threading.Lock()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "a", encoding="utf-8") as out:
+
+        def _run(batch: list[dict]) -> None:
+            start = time.monotonic()
+            try:
+                pitches = pitch_batch(batch)
+                result = "ok" if len(pitches) == len(batch) else "partial"
+            except Exception:
+                pitches, result = [], "error"
+            metrics.inc("pitch_batches_total", result=result)
+            metrics.observe("pitch_batch_seconds", time.monotonic() - start)
+            with write_lock:
+                for pitch in pitches:
+                    out.write(json.dumps(pitch) + "\n")
+                    existing[pitch["id"]] = pitch
+                out.flush()
+                os.fsync(out.fileno())
+                stats["written"] += len(pitches)
+                stats["failed"] += len(batch) - len(pitches)
+                if progress is not None:
+                    progress(dict(stats))
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="pitch") as pool:
+            list(pool.map(_run, batches))
+
+    if stats["written"]:
+        write_pitches(existing, path)
+    return stats
+
+
+class PitchStore:
+    """Read side of PITCH_FILE: reloaded when the file changes, checked every PITCH_RECHECK_SECONDS."""
+
+    def __init__(self):
+        self._pitches: dict[str, Pitch] = {}
+        self._stat: tuple | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, Pitch]:
+        path = os.getenv("PITCH_FILE", PITCH_FILE)
+        if not path:
+            return {}
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < PITCH_RECHECK_SECONDS and self._stat and self._stat[0] == path:
+                return self._pitches
+            self._checked_at = now
+            try:
+                st = os.stat(path)
+            except OSError:
+                self._pitches, self._stat = {}, None
+                return self._pitches
+            stat = (path, st.st_ino, st.st_mtime_ns, st.st_size)
+            if stat != self._stat:
+                self._pitches, self._stat = read_pitches(path), stat
+                metrics.set_gauge("pitch_store_products", len(self._pitches))
+            return self._pitches
+
+    def get(self, product: dict) -> Pitch | None:
+        """The product's pitch, if there is one written from its current fields."""
+        pitch = self._load().get(str(product.get("id") or ""))
+        if pitch is None or pitch.get("version") != pitch_version(product):
+            return None
+        return pitch
+
+    def lookup(self, products: list[dict]) -> dict[str, Pitch]:
+        """Current pitches for these products, by id."""
+        found = {}
+        for p in products:
+            pitch = self.get(p)
+            if pitch is not None:
+                found[pitch["id"]] = pitch
+        return found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pitches, self._stat, self._checked_at = {}, None, 0.0
+
+
+pitch_store = PitchStore()
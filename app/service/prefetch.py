@@ -0,0 +1,151 @@
+"""Background prefetch of likely refinement searches.
+
+After a search turn is answered, the next turn is very often "cheaper", "fancier" or
+"for kids", whose REFINEMENT_SEARCH_ADDITIONS expansions ("affordable", "luxury", ...) would
+otherwise be searched while the user waits. The orchestrator hands them to
+refinement_prefetcher, which searches them on a small worker pool (PREFETCH_WORKERS) into
+the shared search cache and product index, so the refinement turn finds them warm. Only
+turns with a conversation id are prefetched, since the per-session share needs a session.
+
+Prefetching is best effort and never competes with chat turns: keywords already fresh in
+the cache, already in the conversation's candidate pool or already queued are skipped; a
+conversation may have at most PREFETCH_MAX_PER_SESSION searches queued or running, the
+whole queue at most PREFETCH_MAX_QUEUE; and nothing is queued while chat turns are waiting
+for admission.
+
+Metrics: prefetch_searches_total{result} (ok or error), prefetch_skipped_total{reason}
+(cached, in_flight, session_cap, queue_full or busy) and prefetch_pending (gauge).
+"""
+
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from app.service import metrics
+from app.service.admission import chat_admission
+from app.service.catalog_cache import normalize_keyword, search_cache
+from app.service.edible_client import EdibleAPIClient
+from app.service.recommender import REFINEMENT_SEARCH_ADDITIONS
+
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))  # 0 = no prefetch
+PREFETCH_MAX_PER_SESSION = int(os.getenv("PREFETCH_MAX_PER_SESSION", "8"))  # Queued or running
+PREFETCH_MAX_QUEUE = int(os.getenv("PREFETCH_MAX_QUEUE", "64"))
+
+SKIP_CACHED = "cached"
+SKIP_IN_FLIGHT = "in_flight"
+SKIP_SESSION_CAP = "session_cap"
+SKIP_QUEUE_FULL = "queue_full"
+SKIP_BUSY = "busy"
+
+
+def refinement_keywords() -> list[str]:
+    """REFINEMENT_SEARCH_ADDITIONS expansions, deduplicated, in table order."""
+    keywords: dict[str, str] = {}
+    for additions in REFINEMENT_SEARCH_ADDITIONS.values():
+        for kw in additions:
+            keywords.setdefault(normalize_keyword(kw), kw)
+    return list(keywords.values())
+
+
+class RefinementPrefetcher:
+    """Bounded background search queue with a per-session share. Thread-safe."""
+
+    def __init__(
+        self,
+        workers: int = PREFETCH_WORKERS,
+        max_per_session: int = PREFETCH_MAX_PER_SESSION,
+        max_queue: int = PREFETCH_MAX_QUEUE,
+    ):
+        self.workers = workers
+        self.max_per_session = max_per_session
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending: set[str] = set()  # Normalized keywords queued or running
+        self._per_session: Counter[str] = Counter()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def schedule(self, session_id: str, exclude: Iterable[str] = ()) -> list[str]:
+        """
+        Queue background searches for the refinement expansions not in `exclude`
+        (e.g. the keywords the conversation's candidate pool already holds).
+
+        Returns the keywords queued.
+        """
+        if not self.enabled:
+            return []
+        if chat_admission.stats()["queued"]:
+            metrics.inc("prefetch_skipped_total", reason=SKIP_BUSY)
+            return []
+        excluded = {normalize_keyword(kw) for kw in exclude}
+        queued: list[str] = []
+        for kw in refinement_keywords():
+            key = normalize_keyword(kw)
+            if key in excluded:
+                continue
+            if search_cache.contains(kw):
+                metrics.inc("prefetch_skipped_total", reason=SKIP_CACHED)
+                continue
+            with self._lock:
+                if key in self._pending:
+                    reason = SKIP_IN_FLIGHT
+                elif self._per_session[session_id] >= self.max_per_session:
+                    reason = SKIP_SESSION_CAP
+                elif len(self._pending) >= self.max_queue:
+                    reason = SKIP_QUEUE_FULL
+                else:
+                    reason = None
+                    self._pending.add(key)
+                    self._per_session[session_id] += 1
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch")
+                    executor = self._executor
+                    metrics.set_gauge("prefetch_pending", len(self._pending))
+            if reason:
+                metrics.inc("prefetch_skipped_total", reason=reason)
+                continue
+            executor.submit(self._search, session_id, kw, key)
+            queued.append(kw)
+        return queued
+
+    def _search(self, session_id: str, keyword: str, key: str) -> None:
+        try:
+            EdibleAPIClient().search(keyword, refresh=True)
+            ok = True
+        except Exception:
+            ok = False  # The refinement turn searches it on demand instead
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+                self._per_session[session_id] -= 1
+                if self._per_session[session_id] <= 0:
+                    del self._per_session[session_id]
+                metrics.set_gauge("prefetch_pending", len(self._pending))
+                if not self._pending:
+                    self._idle.notify_all()
+        metrics.inc("prefetch_searches_total", result="ok" if ok else "error")
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until nothing is queued or running (tests). False on timeout."""
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": len(self._pending), "sessions": len(self._per_session)}
+
+    def shutdown(self) -> None:
+        """Finish queued searches and stop the workers; the next schedule() starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+refinement_prefetcher = RefinementPrefetcher()
@@ -0,0 +1,111 @@
+"""Opt-in per-request profiling (cProfile), written as .pstats files with a JSON summary.
+
+Enabled server-side with PROFILING_ENABLED=1; a request then asks for it with "profile".
+The default wall clock includes time blocked in the search API (requests.post) and the
+OpenAI client, which is usually where a slow turn goes. "cpu" profiles thread CPU time
+instead. Open a file with `python -m pstats <file>` or snakeviz.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, TypedDict
+
+from app.service import metrics
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(Path(__file__).resolve().parents[2] / "data" / "profiles")))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))  # newest profiles kept on disk
+PROFILE_TOP_FUNCTIONS = 15
+
+CLOCKS: dict[str, Callable[[], float]] = {"wall": time.perf_counter, "cpu": time.thread_time}
+
+
+class ProfileInfo(TypedDict):
+    """Summary written next to each .pstats file."""
+
+    id: str
+    label: str
+    clock: str
+    created_at: float
+    wall_ms: float
+    cpu_ms: float
+    file: str
+    top: list[dict]  # {"function", "calls", "self_ms", "cumulative_ms"}, by self time
+
+
+def _top_functions(profiler: cProfile.Profile, n: int) -> list[dict]:
+    stats = pstats.Stats(profiler).stats  # {(file, line, name): (cc, nc, tt, ct, callers)}
+    rows = sorted(stats.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+    return [
+        {
+            "function": pstats.func_std_string(func),
+            "calls": nc,
+            "self_ms": round(tt * 1000, 2),
+            "cumulative_ms": round(ct * 1000, 2),
+        }
+        for func, (_, nc, tt, ct, _) in rows
+    ]
+
+
+def _prune(directory: Path, keep: int) -> None:
+    summaries = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in summaries[keep:]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".pstats").unlink(missing_ok=True)
+
+
+def profile_call(fn: Callable, *args, label: str = "", clock: str = "wall", **kwargs) -> tuple[Any, ProfileInfo]:
+    """
+    Run fn(*args, **kwargs) under cProfile and write <id>.pstats + <id>.json to PROFILE_DIR.
+
+    Returns (fn's result, summary). The profile is written even if fn raises.
+    """
+    if clock not in CLOCKS:
+        raise ValueError(f"Unknown profile clock {clock!r}; expected one of {sorted(CLOCKS)}")
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    profiler = cProfile.Profile(CLOCKS[clock])
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        profiler.enable()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+    finally:
+        wall_ms = (time.perf_counter() - wall_start) * 1000
+        cpu_ms = (time.thread_time() - cpu_start) * 1000
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{profile_id}.pstats"
+        profiler.dump_stats(path)
+        info = ProfileInfo(
+            id=profile_id,
+            label=label,
+            clock=clock,
+            created_at=time.time(),
+            wall_ms=round(wall_ms, 1),
+            cpu_ms=round(cpu_ms, 1),
+            file=path.name,
+            top=_top_functions(profiler, PROFILE_TOP_FUNCTIONS),
+        )
+        path.with_suffix(".json").write_text(json.dumps(info, indent=2))
+        _prune(PROFILE_DIR, PROFILE_KEEP)
+        metrics.inc("profiles_written_total", clock=clock)
+    return result, info
+
+
+def list_profiles(limit: int = 20) -> list[ProfileInfo]:
+    """Summaries of the most recent profiles, newest first."""
+    if not PROFILE_DIR.exists():
+        return []
+    summaries = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    profiles = []
+    for path in summaries[:limit]:
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, json.JSONDecodeError):
+            continue
+    return profiles
@@ -1,21 +1,76 @@
 """Search + grounded recommendations - Layer 2b."""
 
+import math
+import os
 import re
+import string
 from typing import TypedDict
 
+from openai import APITimeoutError
+
 from app.prompts.recommender import (
     FALLBACK_NO_KEYWORDS,
     FALLBACK_NO_PRODUCTS,
+    FALLBACK_SEARCH_UNAVAILABLE,
     RECOMMENDER_REFINEMENT_TEMPLATE,
+    RECOMMENDER_REFINEMENT_TEMPLATE_INDEXED,
     RECOMMENDER_SYSTEM,
+    RECOMMENDER_SYSTEM_INDEXED,
+    RECOMMENDER_SYSTEM_PITCHED,
     RECOMMENDER_USER_TEMPLATE,
+    RECOMMENDER_USER_TEMPLATE_INDEXED,
+    STOCK_INTRO,
+    STOCK_INTRO_REFINEMENT,
+    TEMPLATE_BLURB,
+    TEMPLATE_BLURB_FULL,
+    TEMPLATE_BLURB_INGREDIENTS,
+    TEMPLATE_BLURB_OCCASION,
+    TEMPLATE_BLURB_PRICE,
+    TEMPLATE_INTRO,
+    TEMPLATE_INTRO_BUDGET,
+    TEMPLATE_INTRO_OCCASION,
+    TEMPLATE_INTRO_OCCASION_BUDGET,
+    TEMPLATE_INTRO_REFINEMENT,
+)
+from app.service.deadline import (
+    RECOMMENDER_SKIPPED,
+    SEARCH_TRUNCATED,
+    Deadline,
+    remaining_timeout,
 )
-from app.service.edible_client import EdibleAPIClient
+from app.service import metrics
+from app.service.catalog_cache import normalize_keyword, product_index
+from app.service.edible_client import EdibleAPIClient, parse_ingredients
 from app.service.llm_client import complete_json
+from app.service.local_ranker import extract_budget, extract_occasion, rank_products
+from app.service.pitches import Pitch, pitch_store
 
 # this is used to fine-tune
 MAX_RECOMMENDATIONS = 4
-MAX_PRODUCTS_FOR_LLM = 15  # Limit context size
+MAX_PRODUCTS_FOR_LLM = int(os.getenv("RECOMMENDER_MAX_CANDIDATES", "15"))  # Limit context size
+LLM_DESCRIPTION_CHARS = int(os.getenv("RECOMMENDER_DESCRIPTION_CHARS", "500"))  # Per candidate in the prompt
+MIN_RECOMMENDER_BUDGET = 2.0  # seconds; below this, skip the LLM and use stock blurbs
+
+# "llm": the LLM picks and describes products. "local": ranked locally, templated text, no LLM call.
+MODE_LLM = "llm"
+MODE_LOCAL = "local"
+RECOMMENDATION_MODES = (MODE_LLM, MODE_LOCAL)
+
+# How the LLM refers to candidates: "indexed" (numbers, {"i": 3, "why": ...}), "names"
+# (exact product names, matched back after normalization) or "pitched" (numbered one-line
+# summaries from the pitch file; the LLM only orders them and blurbs are the stored pitches)
+PROTOCOL_INDEXED = "indexed"
+PROTOCOL_NAMES = "names"
+PROTOCOL_PITCHED = "pitched"
+RECOMMENDER_PROTOCOLS = (PROTOCOL_INDEXED, PROTOCOL_NAMES, PROTOCOL_PITCHED)
+RECOMMENDER_PROTOCOL = os.getenv("RECOMMENDER_PROTOCOL", PROTOCOL_INDEXED)
+
+_PROMPTS = {
+    PROTOCOL_INDEXED: (RECOMMENDER_SYSTEM_INDEXED, RECOMMENDER_USER_TEMPLATE_INDEXED, RECOMMENDER_REFINEMENT_TEMPLATE_INDEXED),
+    PROTOCOL_NAMES: (RECOMMENDER_SYSTEM, RECOMMENDER_USER_TEMPLATE, RECOMMENDER_REFINEMENT_TEMPLATE),
+    PROTOCOL_PITCHED: (RECOMMENDER_SYSTEM_PITCHED, RECOMMENDER_USER_TEMPLATE_INDEXED, RECOMMENDER_REFINEMENT_TEMPLATE_INDEXED),
+}
+PITCHED_DESCRIPTION_CHARS = 120  # Candidates without a pitch get a short description slice
 
 
 class RecommendationResult(TypedDict):
@@ -25,6 +80,13 @@ class RecommendationResult(TypedDict):
     products: list[dict]
 
 
+class CandidatePool(TypedDict):
+    """A conversation's scored search candidates, reused on refinement turns."""
+
+    keywords: list[str]  # Normalized keywords already searched
+    scores: dict[str, float]  # Product id -> best search score (products live in product_index)
+
+
 # Feedback keywords to expand search when user wants refinement
 REFINEMENT_SEARCH_ADDITIONS: dict[str, list[str]] = {
     "cheaper": ["affordable", "gifts under $50"],
@@ -42,6 +104,243 @@ REFINEMENT_SEARCH_ADDITIONS: dict[str, list[str]] = {
     "for kids": ["for kids", "kids"],
 }
 
+# Feedback patterns that re-order a refinement's candidates by price (1 = cheapest first)
+REFINEMENT_PRICE_ORDER: dict[str, int] = {
+    "cheaper": 1,
+    "less expensive": 1,
+    "more affordable": 1,
+    "budget": 1,
+    "more luxurious": -1,
+    "fancier": -1,
+}
+
+
+_EXPANSION_KEYWORDS = {normalize_keyword(kw) for adds in REFINEMENT_SEARCH_ADDITIONS.values() for kw in adds}
+
+
+def _is_feedback_phrase(keyword: str) -> bool:
+    """True for feedback words like "cheaper" / "different" that aren't useful catalog searches."""
+    kw = normalize_keyword(keyword)
+    return kw not in _EXPANSION_KEYWORDS and any(kw in pattern for pattern in REFINEMENT_SEARCH_ADDITIONS)
+
+
+def _score(p: dict) -> float:
+    s = p.get("_search_score")
+    return float(s) if s is not None else 0.0
+
+
+def _pool_products(pool: CandidatePool, ids: list[str] | None = None) -> list[dict]:
+    """Resolve a candidate pool (or the given ids from it) to product dicts, with their search scores."""
+    products = []
+    for pid in pool["scores"] if ids is None else ids:
+        p = product_index.get(pid)
+        if p is not None:
+            p["_search_score"] = pool["scores"][pid]
+            products.append(p)
+    return products
+
+
+def _pool_ids_beyond_shown(
+    pool: CandidatePool, user_feedback: str, previous_products: list[dict], limit: int
+) -> list[str] | None:
+    """
+    For a "cheaper" / "fancier" refinement, the pool ids priced beyond the shown range, found
+    from prices alone (the mapped catalog's price column), so only those are resolved to
+    product dicts. None when the feedback isn't about price or fewer than `limit` qualify
+    (then _rerank_for_feedback falls back to the whole pool).
+    """
+    direction, bound = _price_bound(user_feedback, previous_products)
+    if bound is None:
+        return None
+    ids = list(pool["scores"])
+    if direction > 0:
+        beyond = product_index.filter_ids(ids, max_price=math.nextafter(bound, -math.inf))
+    else:
+        beyond = product_index.filter_ids(ids, min_price=math.nextafter(bound, math.inf))
+    return beyond if len(beyond) >= limit else None
+
+
+def _updated_pool(pool: CandidatePool | None, searched: list[str], products: list[dict]) -> CandidatePool:
+    """Pool plus newly searched keywords and their products (keeping the best score per id)."""
+    keywords = set(pool["keywords"]) if pool else set()
+    keywords.update(normalize_keyword(kw) for kw in searched)
+    scores = dict(pool["scores"]) if pool else {}
+    for p in products:
+        pid = p.get("id")
+        if pid:
+            scores[str(pid)] = max(scores.get(str(pid), 0.0), _score(p))
+    return CandidatePool(keywords=sorted(keywords), scores=scores)
+
+
+def _price_bound(user_feedback: str, previous_products: list[dict]) -> tuple[int, float | None]:
+    """Price direction of the feedback (REFINEMENT_PRICE_ORDER, 0 = none) and the shown price to beat."""
+    fb_lower = (user_feedback or "").lower()
+    direction = next((d for pattern, d in REFINEMENT_PRICE_ORDER.items() if pattern in fb_lower), 0)
+    shown = [p["price"] for p in previous_products if isinstance(p.get("price"), (int, float))]
+    if not direction or not shown:
+        return direction, None
+    return direction, min(shown) if direction > 0 else max(shown)
+
+
+def _rerank_for_feedback(
+    products: list[dict], user_feedback: str, previous_products: list[dict], limit: int
+) -> list[dict]:
+    """
+    Order refinement candidates for the feedback: price-sorted for "cheaper" / "fancier"
+    (keeping only products beyond the shown price range when enough remain), else by score.
+    """
+    products = sorted(products, key=_score, reverse=True)
+    direction, bound = _price_bound(user_feedback, previous_products)
+    if not direction:
+        return products
+    priced = [p for p in products if isinstance(p.get("price"), (int, float))]
+    if bound is not None:
+        beyond = [p for p in priced if (p["price"] < bound if direction > 0 else p["price"] > bound)]
+        if len(beyond) >= limit:
+            priced = beyond
+    # Stable sort keeps relevance order among equal prices
+    return sorted(priced, key=lambda p: direction * p["price"])
+
+
+def _norm_name(s: str) -> str:
+    """Normalize names (strip ®, ™) so "Delicious Fruit Design" matches "Delicious Fruit Design®"."""
+    s = re.sub(r"[\u00ae\u2122]", "", (s or "").strip()).lower()
+    # Strip " | $price" suffix that LLM may copy from format_for_llm
+    s = re.sub(r"\s*\|\s*\$[\d.]+$", "", s).strip()
+    return s
+
+
+def _picks_by_index(data: dict, candidates: list[dict]) -> list[tuple[dict | None, str]]:
+    """(candidate or None if the number is invalid, blurb) for each {"i", "why"} pick or bare number."""
+    picks = []
+    for r in data.get("picks") or []:
+        if isinstance(r, dict):
+            i, why = r.get("i"), r.get("why") or ""
+        elif isinstance(r, (int, str)) and not isinstance(r, bool):
+            i, why = r, ""
+        else:
+            continue
+        try:
+            i = int(i)
+        except (TypeError, ValueError):
+            i = 0
+        picks.append((candidates[i - 1] if 1 <= i <= len(candidates) else None, why))
+    return picks
+
+
+def format_pitched(products: list[dict], pitches: dict[str, Pitch]) -> str:
+    """One numbered line per candidate: price, tags and summary from its pitch (PROTOCOL_PITCHED)."""
+    lines = []
+    for n, p in enumerate(products, 1):
+        parts = [f"[{n}] {p.get('name', 'Unknown')}", f"${p.get('price', 'N/A')}"]
+        pitch = pitches.get(str(p.get("id")))
+        if pitch is not None:
+            if pitch["occasions"]:
+                parts.append(", ".join(pitch["occasions"]))
+            if pitch["recipients"]:
+                parts.append("for " + ", ".join(pitch["recipients"]))
+            parts.append(pitch["summary"])
+        else:
+            if p.get("occasion"):
+                parts.append(p["occasion"].lower())
+            parts.append((p.get("description") or "").strip()[:PITCHED_DESCRIPTION_CHARS])
+        lines.append(" | ".join(part for part in parts if part))
+    return "\n".join(lines)
+
+
+def _picks_by_name(data: dict, candidates: list[dict]) -> list[tuple[dict | None, str]]:
+    """(candidate or None if the name doesn't match, blurb) for each {"product_name", ...} pick."""
+    name_to_product = {_norm_name(p.get("name", "")): p for p in candidates if _norm_name(p.get("name", ""))}
+    return [
+        (name_to_product.get(_norm_name(r.get("product_name") or "")), r.get("recommendation") or "")
+        for r in data.get("recommendations") or []
+        if isinstance(r, dict)
+    ]
+
+
+def _format_price(price) -> str | None:
+    return f"${float(price):.2f}" if isinstance(price, (int, float)) else None
+
+
+def template_blurb(p: dict) -> str:
+    """Recommendation text filled from product fields: occasion, ingredients, price (no LLM)."""
+    occasion = (p.get("occasion") or "").split(",")[0].strip().lower()
+    ingredients = " and ".join(i.lower() for i in parse_ingredients(p.get("ingredients") or "")[:2])
+    price = _format_price(p.get("price"))
+    if price and occasion and ingredients:
+        return TEMPLATE_BLURB_FULL.format(occasion=occasion, ingredients=ingredients, price=price)
+    if price and occasion:
+        return TEMPLATE_BLURB_OCCASION.format(occasion=occasion, price=price)
+    if price and ingredients:
+        return TEMPLATE_BLURB_INGREDIENTS.format(ingredients=ingredients, price=price)
+    if price:
+        return TEMPLATE_BLURB_PRICE.format(price=price)
+    return TEMPLATE_BLURB
+
+
+def template_intro(count: int, occasion: str | None, budget: float | None, is_refinement: bool) -> str:
+    """Intro message templated from the extracted occasion / budget (no LLM)."""
+    if is_refinement:
+        return TEMPLATE_INTRO_REFINEMENT
+    budget_str = f"${budget:g}" if budget else None
+    occasion_str = string.capwords(occasion) if occasion else None
+    if occasion_str and budget_str:
+        return TEMPLATE_INTRO_OCCASION_BUDGET.format(count=count, occasion=occasion_str, budget=budget_str)
+    if occasion_str:
+        return TEMPLATE_INTRO_OCCASION.format(count=count, occasion=occasion_str)
+    if budget_str:
+        return TEMPLATE_INTRO_BUDGET.format(count=count, budget=budget_str)
+    return TEMPLATE_INTRO
+
+
+def _top_ranked_result(
+    products_sorted: list[dict], limit: int, is_refinement: bool, degraded: list[str]
+) -> RecommendationResult:
+    """Top search-ranked products with stock blurbs, used when the LLM is skipped."""
+    picks = []
+    for p in products_sorted[:limit]:
+        p = dict(p)
+        p.pop("_search_score", None)
+        picks.append({**p, "recommendation": template_blurb(p)})
+    result: dict = {
+        "message": STOCK_INTRO_REFINEMENT if is_refinement else STOCK_INTRO,
+        "products": picks,
+        "degraded": degraded,
+    }
+    return result
+
+
+def _local_result(
+    products_sorted: list[dict],
+    *,
+    request_text: str,
+    previous_products: list[dict] | None,
+    user_feedback: str | None,
+    limit: int,
+    degraded: list[str],
+) -> RecommendationResult:
+    """Rank and describe products locally (MODE_LOCAL)."""
+    budget = extract_budget(request_text)
+    occasion = extract_occasion(request_text)
+    is_refinement = bool(previous_products and user_feedback)
+    if is_refinement and any(w in user_feedback.lower() for w in ("cheaper", "affordable", "less expensive", "budget")):
+        # "Cheaper" means cheaper than anything shown so far
+        shown = [p["price"] for p in previous_products if isinstance(p.get("price"), (int, float))]
+        if shown:
+            budget = min([min(shown)] + ([budget] if budget else []))
+    picks = []
+    for p in rank_products(products_sorted, budget=budget, occasion=occasion, limit=limit):
+        p = dict(p)
+        p.pop("_search_score", None)
+        picks.append({**p, "recommendation": template_blurb(p)})
+    result: dict = {
+        "message": template_intro(len(picks), occasion, budget, is_refinement),
+        "products": picks,
+    }
+    if degraded:
+        result["degraded"] = degraded
+    return result
+
 
 def get_recommendations(
     keywords: list[str],
@@ -51,6 +350,10 @@ def get_recommendations(
     previous_products: list[dict] | None = None,
     user_feedback: str | None = None,
     original_request: str | None = None,
+    deadline: Deadline | None = None,
+    mode: str = MODE_LLM,
+    candidate_pool: CandidatePool | None = None,
+    protocol: str | None = None,
     debug: bool = False,
 ) -> RecommendationResult:
     """
@@ -63,10 +366,29 @@ def get_recommendations(
         previous_products: When user gave feedback, the products they saw before.
         user_feedback: User's feedback (e.g. "cheaper", "more fun").
         original_request: The user's original search query (for refinement context).
+        deadline: Request deadline. Searches get the remaining budget; if too little is
+            left for the LLM (or it times out), the top search-ranked products are
+            returned with stock blurbs and "degraded" lists what was skipped.
+        mode: MODE_LLM (default) or MODE_LOCAL, which never calls the LLM: candidates are
+            ranked by search score, budget / occasion match and category diversity, and
+            the intro and blurbs are filled from templates.
+        candidate_pool: The conversation's pool from the previous turn's result. On a
+            refinement, candidates come from the pool, and only keywords the pool hasn't
+            searched yet hit the search API.
+        protocol: How the LLM refers to candidates (default RECOMMENDER_PROTOCOL):
+            PROTOCOL_INDEXED (numbered candidates, O(1) lookup), PROTOCOL_NAMES, or
+            PROTOCOL_PITCHED (precomputed summaries in, numbers out, stored pitches as
+            blurbs; falls back to PROTOCOL_INDEXED when no candidate has a pitch).
 
     Returns:
-        RecommendationResult with message and products list.
+        RecommendationResult with message and products list. Search turns also return
+        "candidate_pool" (the updated pool) for the caller to keep per conversation.
     """
+    if mode not in RECOMMENDATION_MODES:
+        raise ValueError(f"Unknown recommendation mode {mode!r}; expected one of {RECOMMENDATION_MODES}")
+    protocol = protocol or RECOMMENDER_PROTOCOL
+    if protocol not in RECOMMENDER_PROTOCOLS:
+        raise ValueError(f"Unknown recommender protocol {protocol!r}; expected one of {RECOMMENDER_PROTOCOLS}")
     if not keywords:
         return RecommendationResult(
             message=FALLBACK_NO_KEYWORDS,
@@ -85,10 +407,32 @@ def get_recommendations(
                 break
 
     client = EdibleAPIClient()
-    results = client.search_multiple(search_keywords)
+    use_pool = bool(is_refinement and candidate_pool and candidate_pool.get("scores"))
+    if use_pool:
+        # Feedback phrases ("cheaper") aren't catalog terms; their expansions are
+        seen = set(candidate_pool["keywords"])
+        to_search = [
+            kw for kw in dict.fromkeys(search_keywords)
+            if normalize_keyword(kw) not in seen and not _is_feedback_phrase(kw)
+        ]
+        metrics.inc("candidate_pool_refinements_total")
+        metrics.inc("candidate_pool_searches_saved_total", len(search_keywords) - len(to_search))
+    else:
+        to_search = search_keywords
+    results = client.search_multiple(to_search, deadline=deadline) if to_search else {"products": [], "searched": []}
     products = results["products"]
+    degraded = [SEARCH_TRUNCATED] if results.get("truncated") else []
+    # Only keywords actually searched join the pool, so a skipped one is retried next turn
+    new_pool = _updated_pool(candidate_pool if use_pool else None, results["searched"], products)
+    if use_pool:
+        beyond = _pool_ids_beyond_shown(new_pool, user_feedback, previous_products, limit)
+        pooled = {str(p.get("id")): p for p in _pool_products(new_pool, beyond)}
+        products = list(pooled.values())
 
     if not products:
+        if degraded:
+            result: dict = {"message": FALLBACK_SEARCH_UNAVAILABLE, "products": [], "degraded": degraded}
+            return result
         return RecommendationResult(
             message=FALLBACK_NO_PRODUCTS,
             products=[],
@@ -99,70 +443,105 @@ def get_recommendations(
     if previous_ids:
         products = [p for p in products if str(p.get("id")) not in previous_ids]
         if not products:
-            return RecommendationResult(
-                message="I've shown you the best matches for that search. Try different keywords like 'chocolate strawberries' or 'fruit bouquet' for more options.",
-                products=[],
-            )
+            result = {
+                "message": "I've shown you the best matches for that search. Try different keywords like 'chocolate strawberries' or 'fruit bouquet' for more options.",
+                "products": [],
+                "candidate_pool": new_pool,
+            }
+            return result
 
-    # Sort by API relevance (higher score = better match), then limit for LLM context
-    def _score(p: dict) -> float:
-        s = p.get("_search_score")
-        return float(s) if s is not None else 0.0
-
-    products_sorted = sorted(products, key=_score, reverse=True)
+    # Sort by API relevance (higher score = better match), or by price for "cheaper" / "fancier"
+    # refinements, then limit for LLM context
+    if is_refinement:
+        products_sorted = _rerank_for_feedback(products, user_feedback, previous_products, limit)
+    else:
+        products_sorted = sorted(products, key=_score, reverse=True)
+    if mode == MODE_LOCAL:
+        result = _local_result(
+            products_sorted,
+            request_text=" ".join([original_request or "", user_message or "", *keywords]),
+            previous_products=previous_products,
+            user_feedback=user_feedback,
+            limit=limit,
+            degraded=degraded,
+        )
+        result["candidate_pool"] = new_pool
+        return result
+    if deadline is not None and not deadline.allows(MIN_RECOMMENDER_BUDGET):
+        result = _top_ranked_result(products_sorted, limit, is_refinement, degraded + [RECOMMENDER_SKIPPED])
+        result["candidate_pool"] = new_pool
+        return result
     products_for_context = products_sorted[:MAX_PRODUCTS_FOR_LLM]
-    product_context = client.format_for_llm(products_for_context)
+    pitches = pitch_store.lookup(products_for_context) if protocol == PROTOCOL_PITCHED else {}
+    if protocol == PROTOCOL_PITCHED and not pitches:
+        protocol = PROTOCOL_INDEXED  # Pitch job not run (or stale for these products)
+    indexed = protocol != PROTOCOL_NAMES
+    if protocol == PROTOCOL_PITCHED:
+        product_context = format_pitched(products_for_context, pitches)
+    else:
+        product_context = client.format_for_llm(
+            products_for_context, numbered=indexed, description_chars=LLM_DESCRIPTION_CHARS
+        )
+    system_prompt, user_template, refinement_template = _PROMPTS[protocol]
 
     if is_refinement:
         previous_names = ", ".join(p.get("name", "?") for p in previous_products[:8])
-        user_content = RECOMMENDER_REFINEMENT_TEMPLATE.format(
+        user_content = refinement_template.format(
             original_request=original_request or user_message,
             user_feedback=user_feedback,
             previous_product_names=previous_names,
             product_context=product_context,
+            count=limit,
         )
     else:
-        user_content = RECOMMENDER_USER_TEMPLATE.format(
+        user_content = user_template.format(
             user_message=user_message,
             product_context=product_context,
+            count=limit,
         )
 
+    timeout = remaining_timeout(deadline)
+    failed = False
     try:
         if debug:
-            data, raw_text = complete_json(RECOMMENDER_SYSTEM, user_content, return_raw=True)
+            data, raw_text = complete_json(
+                system_prompt, user_content, return_raw=True, call_site="recommender", timeout=timeout
+            )
         else:
-            data = complete_json(RECOMMENDER_SYSTEM, user_content)
+            data = complete_json(system_prompt, user_content, call_site="recommender", timeout=timeout)
             raw_text = None
-        recs = data.get("recommendations") or []
+        picks = (_picks_by_index if indexed else _picks_by_name)(data, products_for_context)
         fallback = data.get("fallback_message")
+    except APITimeoutError:
+        result = _top_ranked_result(products_sorted, limit, is_refinement, degraded + [RECOMMENDER_SKIPPED])
+        result["candidate_pool"] = new_pool
+        return result
     except Exception:
         data = None
-        recs = []
+        picks = []
         fallback = None
         raw_text = None
+        failed = True
 
     # Build products in LLM recommendation order, with descriptions
-    # Normalize names (strip ®, ™) so "Delicious Fruit Design" matches "Delicious Fruit Design®"
-    def _norm(s: str) -> str:
-        s = re.sub(r"[\u00ae\u2122]", "", (s or "").strip()).lower()
-        # Strip " | $price" suffix that LLM may copy from format_for_llm
-        s = re.sub(r"\s*\|\s*\$[\d.]+$", "", s).strip()
-        return s
-
-    name_to_product = {_norm(p.get("name", "")): p for p in products_for_context if _norm(p.get("name", ""))}
+    unmatched = sum(1 for p, _ in picks if p is None)
+    if unmatched:
+        metrics.inc("recommender_unmatched_picks_total", unmatched, protocol=protocol)
     products_with_recs = []
     seen = set()
-    for r in recs:
+    for candidate, blurb in picks:
         if len(products_with_recs) >= limit:
             break
-        key = _norm(r.get("product_name") or "")
-        if key in name_to_product and key not in seen:
-            seen.add(key)
-            p = dict(name_to_product[key])
+        if candidate is not None and id(candidate) not in seen:
+            seen.add(id(candidate))
+            p = dict(candidate)
             p.pop("_search_score", None)  # Internal only; don't expose to frontend
+            if not blurb and protocol == PROTOCOL_PITCHED:
+                pitch = pitches.get(str(p.get("id")))
+                blurb = pitch["pitch"] if pitch is not None else template_blurb(p)
             products_with_recs.append({
                 **p,
-                "recommendation": r.get("recommendation") or "",
+                "recommendation": blurb,
             })
 
     # Intro message: use LLM-generated intro when present, else fallback
@@ -176,7 +555,11 @@ def get_recommendations(
         message = (intro or "").strip() or "I couldn't find a great match. Try different keywords?"
         products_with_recs = []
 
-    result: dict = {"message": message, "products": products_with_recs}
+    result = {"message": message, "products": products_with_recs, "candidate_pool": new_pool}
+    if degraded:
+        result["degraded"] = degraded
+    if failed:
+        result["error"] = True  # LLM call failed; not an answer to cache
     if debug and raw_text:
         result["debug_llm_response"] = raw_text
     return result
@@ -0,0 +1,114 @@
+"""Response cache for stateless first turns (no history, no last products).
+
+Many conversations open with the same few messages ("hi", "I need a gift", "birthday gift
+under $50"), and their full responses can be served from memory. Keys are normalized
+messages; entries expire with the catalog (default TTL = SEARCH_CACHE_TTL), and the caller
+can reject an entry earlier (e.g. when a product it shows has changed price).
+"""
+
+import copy
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from app.service import metrics
+from app.service.catalog_cache import SEARCH_CACHE_TTL
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", str(SEARCH_CACHE_TTL)))  # 0 = off
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# Distinct responses kept per key. With more than 1, the first N requests for a key are
+# answered fresh (and stored); later ones get a random stored variant.
+RESPONSE_CACHE_VARIANTS = int(os.getenv("RESPONSE_CACHE_VARIANTS", "1"))
+
+_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_TRAILING_ZEROS_RE = re.compile(r"\b(\d+)\.0+\b")
+_MONEY_WORDS_RE = re.compile(r"(?:\$\s*)?(\d+(?:\.\d+)?)\s*(?:dollars?|bucks|usd)\b")
+_DOLLAR_SPACE_RE = re.compile(r"\$\s+(?=\d)")
+_NON_DECIMAL_DOT_RE = re.compile(r"(?<!\d)\.|\.(?!\d)")
+_PUNCT_RE = re.compile(r"[^a-z0-9$.\s]")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Cache key for a first-turn message: case, punctuation, whitespace and number formatting
+    are ignored. "Birthday gift under 50 dollars!" -> "birthday gift under $50".
+    """
+    text = (message or "").lower().replace("'", "").replace("’", "")
+    text = _THOUSANDS_RE.sub("", text)
+    text = _TRAILING_ZEROS_RE.sub(r"\1", text)
+    text = _MONEY_WORDS_RE.sub(r"$\1", text)
+    text = _DOLLAR_SPACE_RE.sub("$", text)
+    text = _NON_DECIMAL_DOT_RE.sub(" ", text)
+    text = _PUNCT_RE.sub(" ", text)
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """TTL + LRU cache of up to max_variants response entries per key. Thread-safe."""
+
+    def __init__(
+        self,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_variants: int = RESPONSE_CACHE_VARIANTS,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_variants = max(1, max_variants)
+        self._entries: OrderedDict[str, list[tuple[float, dict]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, valid: Callable[[dict], bool] | None = None) -> dict | None:
+        """
+        A stored entry (deep copy) once the key has all its variants, else None.
+
+        If valid(entry) is False, all of the key's variants are dropped (counted as stale).
+        """
+        if self.ttl <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            variants = [v for v in self._entries.get(key, []) if now - v[0] <= self.ttl]
+            if variants:
+                self._entries[key] = variants
+                self._entries.move_to_end(key)
+            else:
+                self._entries.pop(key, None)
+            if len(variants) < self.max_variants:
+                metrics.inc("response_cache_total", result="miss")
+                return None
+            entry = random.choice(variants)[1]
+        if valid is not None and not valid(entry):
+            with self._lock:
+                self._entries.pop(key, None)
+            metrics.inc("response_cache_total", result="stale")
+            return None
+        metrics.inc("response_cache_total", result="hit")
+        return copy.deepcopy(entry)
+
+    def put(self, key: str, entry: dict) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            variants = self._entries.pop(key, [])
+            variants.append((time.monotonic(), copy.deepcopy(entry)))
+            self._entries[key] = variants[-self.max_variants:]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        metrics.set_gauge("response_cache_entries", size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,53 @@
+"""Per-conversation server-side state, keyed by the client's conversation_id."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))  # seconds since last use
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "2000"))
+
+
+class SessionStore:
+    """
+    LRU + idle-TTL map of conversation_id -> mutable state dict. Thread-safe.
+
+    Keep values small (ids, not product dicts): full products live in the shared product index.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, conversation_id: str) -> dict:
+        """State for a conversation, created empty if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(conversation_id, None)
+            state = entry[1] if entry is not None and now - entry[0] <= self.ttl else {}
+            self._sessions[conversation_id] = (now, state)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return state
+
+    def peek(self, conversation_id: str) -> dict | None:
+        """State for a conversation without creating or touching it."""
+        with self._lock:
+            entry = self._sessions.get(conversation_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+sessions = SessionStore()
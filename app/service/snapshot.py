@@ -0,0 +1,333 @@
+"""Catalog snapshots: a crawl of the search API streamed to sharded JSON-lines files.
+
+crawl() searches a keyword seed set with bounded concurrency and a request-rate cap,
+optionally expanding it with the occasions and categories it finds. Each product is
+deduplicated by id and appended to one of SNAPSHOT_SHARDS files (by id hash) as soon as
+it's seen, so memory stays flat however large the catalog is (only ids are kept).
+
+finish() compares each shard with the previous snapshot in the same directory: shards
+whose products didn't change are left untouched, changed ones are sorted by id and swapped
+in atomically. Products missing from this crawl are dropped, unless a keyword failed, in
+which case they're carried over (their absence proves nothing). manifest.json records
+per-shard counts and checksums plus added / changed / removed totals, so loaders (the
+catalog file builder, caches) can verify a snapshot and reload only the shards that moved.
+
+Layout:
+    <dir>/manifest.json
+    <dir>/products-00.jsonl ... products-0f.jsonl   one normalized product per line, by id
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, TypedDict
+
+import requests
+
+from app.service import metrics
+from app.service.edible_client import EdibleAPIClient
+
+SNAPSHOT_SHARDS = 16
+SNAPSHOT_CONCURRENCY = int(os.getenv("SNAPSHOT_CONCURRENCY", "4"))
+SNAPSHOT_RATE = float(os.getenv("SNAPSHOT_RATE", "2"))  # Search requests per second; 0 = no cap
+SNAPSHOT_RETRIES = 2
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+_SKIP_EXPANSIONS = {"all products"}
+
+
+class ShardInfo(TypedDict):
+    file: str
+    count: int
+    sha256: str
+
+
+class CrawlResult(TypedDict):
+    searched: int  # Keywords searched, including expansions
+    failed: list[str]  # Keywords that failed after retries
+
+
+class Manifest(TypedDict):
+    version: int
+    created_at: str
+    keywords: int
+    keywords_failed: list[str]
+    products: int
+    added: int
+    changed: int
+    removed: int
+    carried_over: int  # Not seen this crawl but kept because a keyword failed
+    shards_rewritten: int
+    shards: list[ShardInfo]
+    sha256: str  # Over the shard checksums, in order
+
+
+def shard_of(product_id: str, shards: int = SNAPSHOT_SHARDS) -> int:
+    return int(hashlib.sha1(product_id.encode()).hexdigest()[:8], 16) % shards
+
+
+def shard_name(i: int) -> str:
+    return f"products-{i:02x}.jsonl"
+
+
+def _line(product: dict) -> str:
+    """Stable JSON line for a product (search score dropped: it depends on the keyword)."""
+    p = {k: v for k, v in product.items() if k != "_search_score"}
+    return json.dumps(p, sort_keys=True, ensure_ascii=False) + "\n"
+
+
+def _line_id(line: str) -> str:
+    return str(json.loads(line)["id"])
+
+
+def load_manifest(directory: str | Path) -> Manifest | None:
+    try:
+        manifest = json.loads((Path(directory) / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def iter_snapshot(directory: str | Path, *, verify: bool = True) -> Iterator[dict]:
+    """Products in a snapshot, shard by shard. verify=True checks each shard's checksum first."""
+    directory = Path(directory)
+    manifest = load_manifest(directory)
+    if manifest is None:
+        raise ValueError(f"{directory} has no readable snapshot manifest")
+    for shard in manifest["shards"]:
+        path = directory / shard["file"]
+        if verify and _file_sha256(path) != shard["sha256"]:
+            raise ValueError(f"{path} doesn't match its manifest checksum")
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        pass
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, lines) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class _Pacer:
+    """Spaces request starts at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def back_off(self, seconds: float) -> None:
+        """Push every later start back (after a 429)."""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+class SnapshotWriter:
+    """Streams deduplicated products into per-shard staging files. add() is thread-safe."""
+
+    def __init__(self, directory: str | Path, shards: int = SNAPSHOT_SHARDS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shards = shards
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+        self._staging = [
+            open(self.directory / f".staging-{shard_name(i)}", "w", encoding="utf-8") for i in range(shards)
+        ]
+
+    def add(self, product: dict) -> bool:
+        """Write the product unless its id was already seen. Returns True if written."""
+        pid = str(product.get("id") or "")
+        if not pid:
+            return False
+        line = _line(product)
+        with self._lock:
+            if pid in self._seen:
+                return False
+            self._seen.add(pid)
+            self._staging[shard_of(pid, self.shards)].write(line)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _read_shard(self, path: Path) -> dict[str, str]:
+        lines = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    lines[_line_id(line)] = line
+        except FileNotFoundError:
+            pass
+        return lines
+
+    def finish(self, *, keywords: int, keywords_failed: list[str]) -> Manifest:
+        """Merge staging into the shard files (rewriting only changed ones) and write the manifest."""
+        for f in self._staging:
+            f.close()
+        previous = load_manifest(self.directory)
+        if previous is not None and len(previous["shards"]) != self.shards:
+            previous = None  # Different shard count: treat every product as new
+        carry_over = bool(keywords_failed)
+        totals = {"added": 0, "changed": 0, "removed": 0, "carried_over": 0, "rewritten": 0}
+        shards: list[ShardInfo] = []
+        for i in range(self.shards):
+            path = self.directory / shard_name(i)
+            staging = self.directory / f".staging-{shard_name(i)}"
+            new = self._read_shard(staging)
+            old = self._read_shard(path) if previous is not None else {}
+            for pid, line in old.items():
+                if pid not in new:
+                    if carry_over:
+                        new[pid] = line
+                        totals["carried_over"] += 1
+                    else:
+                        totals["removed"] += 1
+            totals["added"] += sum(1 for pid in new if pid not in old)
+            totals["changed"] += sum(1 for pid, line in new.items() if pid in old and old[pid] != line)
+            if new != old or not path.exists():
+                _write_atomic(path, (new[pid] for pid in sorted(new)))
+                totals["rewritten"] += 1
+            staging.unlink()
+            shards.append(ShardInfo(file=path.name, count=len(new), sha256=_file_sha256(path)))
+
+        manifest = Manifest(
+            version=MANIFEST_VERSION,
+            created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            keywords=keywords,
+            keywords_failed=sorted(keywords_failed),
+            products=sum(s["count"] for s in shards),
+            added=totals["added"],
+            changed=totals["changed"],
+            removed=totals["removed"],
+            carried_over=totals["carried_over"],
+            shards_rewritten=totals["rewritten"],
+            shards=shards,
+            sha256=hashlib.sha256("".join(s["sha256"] for s in shards).encode()).hexdigest(),
+        )
+        _write_atomic(self.directory / MANIFEST_NAME, [json.dumps(manifest, indent=2) + "\n"])
+        return manifest
+
+
+def _expansions(product: dict) -> list[str]:
+    """Occasion and category names on a product, as candidate keywords."""
+    found = []
+    for field in ("occasion", "category"):
+        for part in (product.get(field) or "").split(","):
+            part = part.strip()
+            if part and part.lower() not in _SKIP_EXPANSIONS:
+                found.append(part)
+    return found
+
+
+def _retry_after(error: requests.HTTPError) -> float | None:
+    response = error.response
+    if response is None or response.status_code != 429:
+        return None
+    try:
+        return float(response.headers.get("Retry-After", "1"))
+    except ValueError:
+        return 1.0
+
+
+def crawl(
+    keywords: list[str],
+    writer: SnapshotWriter,
+    *,
+    concurrency: int = SNAPSHOT_CONCURRENCY,
+    rate: float = SNAPSHOT_RATE,
+    retries: int = SNAPSHOT_RETRIES,
+    expand: bool = False,
+    max_keywords: int = 200,
+    progress=None,
+) -> CrawlResult:
+    """
+    Search every keyword (and, with expand=True, the occasions and categories found, up to
+    max_keywords in all) and stream the products into writer. Failed searches are retried
+    with backoff (a 429's Retry-After pauses every worker). progress, if given, is called with (keyword, products found, new products).
+    """
+    client = EdibleAPIClient()
+    pacer = _Pacer(rate)
+    queued = {kw.strip().lower() for kw in keywords if kw.strip()}
+    pending = [kw.strip() for kw in dict.fromkeys(keywords) if kw.strip()][:max_keywords]
+    failed: list[str] = []
+    searched = 0
+
+    def _search(kw: str) -> list[dict] | None:
+        for attempt in range(retries + 1):
+            pacer.wait()
+            try:
+                products = client._fetch(kw)
+                metrics.inc("snapshot_searches_total", result="ok")
+                return products
+            except requests.HTTPError as e:
+                pause = _retry_after(e)
+                if pause is not None:
+                    pacer.back_off(pause)
+            except requests.RequestException:
+                pass
+            metrics.inc("snapshot_searches_total", result="error")
+            if attempt < retries:
+                time.sleep(0.5 * 2 ** attempt)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="snapshot") as pool:
+        running = {}
+        while pending or running:
+            while pending and len(running) < max(1, concurrency):
+                kw = pending.pop(0)
+                running[pool.submit(_search, kw)] = kw
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                kw = running.pop(future)
+                searched += 1
+                products = future.result()
+                if products is None:
+                    failed.append(kw)
+                    continue
+                added = sum(1 for p in products if writer.add(p))
+                if progress is not None:
+                    progress(kw, len(products), added)
+                if expand:
+                    for p in products:
+                        for candidate in _expansions(p):
+                            key = candidate.lower()
+                            if key not in queued and len(queued) < max_keywords:
+                                queued.add(key)
+                                pending.append(candidate)
+    return CrawlResult(searched=searched, failed=failed)
@@ -0,0 +1,193 @@
+"""Typeahead over product names, slugs, occasions and categories (/api/suggest).
+
+A sorted-array prefix index: every product contributes one key per word start of its
+normalized name ("berry birthday box", "birthday box", "box") plus its URL slug when that
+differs, so "bir" and "berry bir" both find it with one bisect and a short scan. Occasions
+and categories are kept as a small facet list with product counts. Products are added
+incrementally as search results come through ProductIndex.update; a batch is merged into
+a new sorted array that replaces the old one, so lookups never take a lock. Products in
+the mapped catalog (CATALOG_FILE) are indexed when the file is first seen or replaced.
+"""
+
+import bisect
+import re
+import threading
+from typing import TypedDict
+
+from app.service import metrics
+from app.service.catalog_store import get_catalog
+
+SUGGEST_LIMIT = 8
+SUGGEST_MIN_CHARS = 2
+FACET_LIMIT = 3  # Occasion / category suggestions ahead of products
+SCAN_LIMIT = 256  # Keys examined per lookup, so short prefixes stay cheap
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9$]+")
+_SKIP_CATEGORIES = {"all products"}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop ®/™ and apostrophes, collapse everything else to single spaces."""
+    text = (text or "").lower().replace("®", "").replace("™", "").replace("'", "").replace("’", "")
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+class Suggestion(TypedDict, total=False):
+    type: str  # "product", "occasion" or "category"
+    text: str
+    id: str  # Products only
+    price: float | None  # Products only
+    count: int  # Facets only: products seen with it
+
+
+def _slug(url: str) -> str:
+    return normalize_text(url.rstrip("/").rsplit("/", 1)[-1]) if url else ""
+
+
+def _product_keys(name: str, url: str) -> list[tuple[str, int]]:
+    """(key, word position) for each word start of the name, plus the slug if different."""
+    words = normalize_text(name).split()
+    keys = [(" ".join(words[i:]), i) for i in range(len(words))]
+    slug = _slug(url)
+    if slug and slug != " ".join(words):
+        keys.append((slug, 0))
+    return keys
+
+
+def _facets(product: dict) -> list[tuple[str, str]]:
+    """(type, display text) for the product's occasions and categories."""
+    facets = []
+    for kind, field in (("occasion", "occasion"), ("category", "category")):
+        for part in (product.get(field) or "").split(","):
+            part = part.strip()
+            if part and part.lower() not in _SKIP_CATEGORIES:
+                facets.append((kind, part))
+    return facets
+
+
+def _merge(keys: list[str], refs: list, new: list[tuple[str, tuple]]) -> tuple[list[str], list]:
+    """New sorted (keys, refs) with `new` added; the inputs are left untouched for readers."""
+    if len(new) * 8 < len(keys):
+        # A few new products: copy and insert in place (memmove, no comparisons of refs)
+        keys, refs = keys[:], refs[:]
+        for key, ref in new:
+            j = bisect.bisect_right(keys, key)
+            keys.insert(j, key)
+            refs.insert(j, ref)
+        return keys, refs
+    all_keys = keys + [k for k, _ in new]
+    all_refs = refs + [r for _, r in new]
+    order = sorted(range(len(all_keys)), key=all_keys.__getitem__)
+    return [all_keys[j] for j in order], [all_refs[j] for j in order]
+
+
+class SuggestIndex:
+    """Prefix index over products and their facets. add() is serialized; lookups are lock-free."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (sorted keys, parallel refs), replaced as one tuple on each add
+        self._entries: tuple[list[str], list[tuple[int, str]]] = ([], [])  # ref: (word position, product id)
+        self._facet_entries: tuple[list[str], list[tuple[str, str]]] = ([], [])  # ref: (type, display text)
+        self._products: dict[str, tuple[str, str, float | None]] = {}  # id -> (name, url, price)
+        self._facet_counts: dict[tuple[str, str], int] = {}
+        self._catalog = None
+
+    def add(self, products: list[dict]) -> int:
+        """Index new or renamed products. Returns how many changed the index."""
+        with self._lock:
+            new_entries: list[tuple[str, tuple[int, str]]] = []
+            renamed: set[str] = set()
+            new_facets: list[tuple[str, tuple[str, str]]] = []
+            for p in products:
+                pid = p.get("id")
+                if not pid or not p.get("name"):
+                    continue
+                pid = str(pid)
+                signature = (p["name"], p.get("url") or "", p.get("price"))
+                old = self._products.get(pid)
+                if old == signature:
+                    continue
+                self._products[pid] = signature
+                if old is not None:
+                    if old[:2] == signature[:2]:
+                        continue  # Price change only
+                    renamed.add(pid)
+                else:
+                    for facet in _facets(p):
+                        if facet not in self._facet_counts:
+                            self._facet_counts[facet] = 0
+                            new_facets.append((normalize_text(facet[1]), facet))
+                        self._facet_counts[facet] += 1
+                new_entries.extend((key, (pos, pid)) for key, pos in _product_keys(signature[0], signature[1]))
+            if not new_entries and not new_facets:
+                return 0
+
+            keys, refs = self._entries
+            if renamed:
+                kept = [j for j, r in enumerate(refs) if r[1] not in renamed]
+                keys, refs = [keys[j] for j in kept], [refs[j] for j in kept]
+            self._entries = _merge(keys, refs, new_entries)
+            if new_facets:
+                facets = sorted([*zip(*self._facet_entries), *new_facets])
+                self._facet_entries = ([k for k, _ in facets], [r for _, r in facets])
+            size = len(self._products)
+        metrics.set_gauge("suggest_index_products", size)
+        return len({pid for _, (_, pid) in new_entries})
+
+    def sync_catalog(self) -> None:
+        """Index the mapped catalog once per file version."""
+        catalog = get_catalog()
+        if catalog is not None and catalog is not self._catalog:
+            self._catalog = catalog
+            self.add([catalog.product(i) for i in range(len(catalog))])
+
+    def suggest(self, query: str, limit: int = SUGGEST_LIMIT) -> list[Suggestion]:
+        """Ranked completions: matching facets (most products first), then products."""
+        self.sync_catalog()
+        q = normalize_text(query)
+        if len(q) < SUGGEST_MIN_CHARS:
+            return []
+        # add() swaps in new arrays rather than mutating these
+        (keys, refs), (facet_keys, facet_refs) = self._entries, self._facet_entries
+        products = self._products
+
+        facets = []
+        for j in range(bisect.bisect_left(facet_keys, q), len(facet_keys)):
+            if not facet_keys[j].startswith(q):
+                break
+            facets.append(facet_refs[j])
+        facets.sort(key=lambda f: -self._facet_counts.get(f, 0))
+        results: list[Suggestion] = [
+            Suggestion(type=kind, text=text, count=self._facet_counts.get((kind, text), 0))
+            for kind, text in facets[: min(FACET_LIMIT, limit)]
+        ]
+
+        best: dict[str, int] = {}  # product id -> earliest word position matched
+        start = bisect.bisect_left(keys, q)
+        for j in range(start, min(start + SCAN_LIMIT, len(keys))):
+            if not keys[j].startswith(q):
+                break
+            pos, pid = refs[j]
+            if pid not in best or pos < best[pid]:
+                best[pid] = pos
+        # Matches at the start of the name first, then shorter names
+        ranked = sorted(best, key=lambda pid: (best[pid] > 0, len(products[pid][0]), products[pid][0]))
+        for pid in ranked[: limit - len(results)]:
+            name, _, price = products[pid]
+            results.append(Suggestion(type="product", text=name, id=pid, price=price))
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = ([], [])
+            self._facet_entries = ([], [])
+            self._products = {}
+            self._facet_counts = {}
+            self._catalog = None
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+
+suggest_index = SuggestIndex()
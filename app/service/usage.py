@@ -0,0 +1,188 @@
+"""Token usage and cost accounting for LLM calls.
+
+Every llm_client call records one CallUsage tagged with its call site. Calls made
+inside track_request() are rolled up per request and per conversation.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, TypedDict
+
+from app.service import metrics
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES: dict[str, tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+}
+
+MAX_CONVERSATIONS = 1000  # Per-conversation totals kept in memory (LRU)
+
+
+class CallUsage(TypedDict):
+    """Usage for a single LLM call."""
+
+    call_site: str
+    model: str
+    input_tokens: int
+    cached_tokens: int
+    output_tokens: int
+    latency_ms: float
+    cost_usd: float
+
+
+class UsageTotals(TypedDict):
+    """Rolled-up usage for a request or conversation."""
+
+    calls: int
+    input_tokens: int
+    cached_tokens: int
+    output_tokens: int
+    latency_ms: float
+    cost_usd: float
+    by_call_site: dict[str, dict]
+
+
+_current: ContextVar[list[CallUsage] | None] = ContextVar("llm_usage_calls", default=None)
+_conversations: OrderedDict[str, UsageTotals] = OrderedDict()
+_lock = threading.Lock()
+
+
+def estimate_cost(model: str, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    """Estimate USD cost of a call. Unknown models cost 0."""
+    prices = MODEL_PRICES.get(model)
+    if not prices:
+        return 0.0
+    in_price, cached_price, out_price = prices
+    uncached = max(input_tokens - cached_tokens, 0)
+    return (uncached * in_price + cached_tokens * cached_price + output_tokens * out_price) / 1_000_000
+
+
+def _empty_totals() -> UsageTotals:
+    return UsageTotals(
+        calls=0,
+        input_tokens=0,
+        cached_tokens=0,
+        output_tokens=0,
+        latency_ms=0.0,
+        cost_usd=0.0,
+        by_call_site={},
+    )
+
+
+def _add(totals: UsageTotals, call: CallUsage) -> None:
+    """Add one call into totals (in place), overall and per call site."""
+    for target in (totals, totals["by_call_site"].setdefault(call["call_site"], {})):
+        target["calls"] = target.get("calls", 0) + 1
+        for field in ("input_tokens", "cached_tokens", "output_tokens"):
+            target[field] = target.get(field, 0) + call[field]
+        target["latency_ms"] = round(target.get("latency_ms", 0.0) + call["latency_ms"], 1)
+        target["cost_usd"] = round(target.get("cost_usd", 0.0) + call["cost_usd"], 8)
+
+
+def summarize(calls: list[CallUsage]) -> UsageTotals:
+    """Roll up a list of calls into totals."""
+    totals = _empty_totals()
+    for c in calls:
+        _add(totals, c)
+    return totals
+
+
+def record_call(
+    call_site: str,
+    model: str,
+    *,
+    input_tokens: int = 0,
+    cached_tokens: int = 0,
+    output_tokens: int = 0,
+    latency_ms: float = 0.0,
+) -> CallUsage:
+    """Record one LLM call: export metrics and attach it to the current request, if any."""
+    call = CallUsage(
+        call_site=call_site,
+        model=model,
+        input_tokens=int(input_tokens or 0),
+        cached_tokens=int(cached_tokens or 0),
+        output_tokens=int(output_tokens or 0),
+        latency_ms=round(latency_ms, 1),
+        cost_usd=round(estimate_cost(model, input_tokens or 0, cached_tokens or 0, output_tokens or 0), 8),
+    )
+    metrics.inc("llm_calls_total", call_site=call_site, model=model)
+    metrics.inc("llm_input_tokens_total", call["input_tokens"], call_site=call_site, model=model)
+    metrics.inc("llm_cached_tokens_total", call["cached_tokens"], call_site=call_site, model=model)
+    metrics.inc("llm_output_tokens_total", call["output_tokens"], call_site=call_site, model=model)
+    metrics.inc("llm_cost_usd_total", call["cost_usd"], call_site=call_site, model=model)
+    metrics.observe("llm_latency_seconds", latency_ms / 1000, call_site=call_site, model=model)
+
+    calls = _current.get()
+    if calls is not None:
+        calls.append(call)
+    return call
+
+
+def split_call(call: CallUsage, n: int) -> list[CallUsage]:
+    """
+    Split one shared call (e.g. a batched classification) into n shares.
+
+    Tokens are divided as evenly as integers allow and each share is re-priced; every
+    share keeps the full latency, since each member waited for the whole call.
+    """
+    shares = []
+    for i in range(n):
+        tokens = {
+            field: call[field] // n + (1 if i < call[field] % n else 0)
+            for field in ("input_tokens", "cached_tokens", "output_tokens")
+        }
+        cost = estimate_cost(call["model"], tokens["input_tokens"], tokens["cached_tokens"], tokens["output_tokens"])
+        shares.append(CallUsage(**{**call, **tokens, "cost_usd": round(cost, 8)}))
+    return shares
+
+
+def attach_calls(calls: list[CallUsage]) -> None:
+    """Attach calls recorded elsewhere to the current request (metrics were already exported)."""
+    current = _current.get()
+    if current is not None:
+        current.extend(calls)
+
+
+def current_calls() -> list[CallUsage]:
+    """Calls recorded so far in the current request (empty outside track_request)."""
+    return list(_current.get() or [])
+
+
+@contextmanager
+def track_request(conversation_id: str | None = None) -> Iterator[list[CallUsage]]:
+    """
+    Collect LLM calls made in this context. Yields the (live) list of calls.
+
+    On exit, the request's calls are added to the conversation's running totals.
+    """
+    calls: list[CallUsage] = []
+    token = _current.set(calls)
+    try:
+        yield calls
+    finally:
+        _current.reset(token)
+        if conversation_id and calls:
+            with _lock:
+                totals = _conversations.pop(conversation_id, None) or _empty_totals()
+                for c in calls:
+                    _add(totals, c)
+                _conversations[conversation_id] = totals
+                while len(_conversations) > MAX_CONVERSATIONS:
+                    _conversations.popitem(last=False)
+
+
+def conversation_usage(conversation_id: str | None) -> UsageTotals | None:
+    """Running totals for a conversation, or None if unknown."""
+    if not conversation_id:
+        return None
+    with _lock:
+        totals = _conversations.get(conversation_id)
+        if totals is None:
+            return None
+        return UsageTotals(**{**totals, "by_call_site": {k: dict(v) for k, v in totals["by_call_site"].items()}})
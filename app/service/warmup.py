@@ -0,0 +1,192 @@
+"""Catalog warm-up: pre-fetch hot search keywords into the search cache and product index.
+
+Runs once at process start and then on a schedule, so the first users after a deploy
+(and users after a cache TTL expiry) don't pay cold search latency. Each pass halves the
+recent-query counts, so top queries follow current traffic. After each scheduled pass, the
+most-compared product sets are precomputed on a separate thread, within
+COMPARISON_PRECOMPUTE_BUDGET (see precompute_comparisons), so slow LLM calls never delay
+the search refresh. A pass run directly (e.g. before fork in preload mode) starts no
+threads. Progress is exposed through
+warmup_status() for the readiness endpoint: the worker is ready once a pass has fetched at
+least one keyword, or WARMUP_READY_TIMEOUT seconds after the first pass started (so an
+upstream outage doesn't keep it out of rotation forever).
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.service import metrics
+from app.service.catalog_cache import normalize_keyword, search_cache
+from app.service.comparison import precompute_comparisons
+from app.service.comparison_cache import comparison_cache
+from app.service.edible_client import EdibleAPIClient
+from app.service.recommender import REFINEMENT_SEARCH_ADDITIONS
+
+DEFAULT_WARMUP_OCCASIONS = [
+    "birthday",
+    "anniversary",
+    "mother's day",
+    "thank you",
+    "sympathy",
+    "get well",
+    "congratulations",
+    "chocolate strawberries",
+    "gift",
+]
+WARMUP_INTERVAL_SECONDS = float(os.getenv("WARMUP_INTERVAL_SECONDS", "300"))
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "4"))
+WARMUP_TOP_QUERIES = int(os.getenv("WARMUP_TOP_QUERIES", "10"))
+WARMUP_READY_TIMEOUT = float(os.getenv("WARMUP_READY_TIMEOUT", "120"))  # seconds; ready even if every search failed
+
+_state = {
+    "status": "pending",  # pending -> running -> ready or failed (ready is kept across scheduled runs)
+    "runs": 0,
+    "total": 0,
+    "done": 0,
+    "failed": 0,
+    "first_started_at": None,
+    "last_started_at": None,
+    "last_finished_at": None,
+    "last_duration_s": None,
+}
+_state_lock = threading.Lock()
+_run_lock = threading.Lock()
+_scheduler: threading.Thread | None = None
+_precompute: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def warmup_keywords() -> list[str]:
+    """
+    Keywords to pre-fetch, deduplicated.
+
+    WARMUP_KEYWORDS (comma-separated) replaces the occasion list; the
+    REFINEMENT_SEARCH_ADDITIONS expansions and the most frequent recent queries are always added.
+    """
+    configured = os.getenv("WARMUP_KEYWORDS")
+    base = [k.strip() for k in configured.split(",")] if configured else list(DEFAULT_WARMUP_OCCASIONS)
+    expansions = [kw for additions in REFINEMENT_SEARCH_ADDITIONS.values() for kw in additions]
+    keywords: list[str] = []
+    seen: set[str] = set()
+    for kw in base + expansions + search_cache.top_queries(WARMUP_TOP_QUERIES):
+        key = normalize_keyword(kw)
+        if key and key not in seen:
+            seen.add(key)
+            keywords.append(kw)
+    return keywords
+
+
+def warmup_status() -> dict:
+    """
+    Snapshot of warm-up progress. ready is True once a pass has fetched at least one
+    keyword, or WARMUP_READY_TIMEOUT seconds after the first pass started.
+    """
+    with _state_lock:
+        status = dict(_state)
+    started = status["first_started_at"]
+    timed_out = started is not None and time.time() - started >= WARMUP_READY_TIMEOUT
+    status["ready"] = status["status"] == "ready" or timed_out
+    return status
+
+
+def run_warmup(keywords: list[str] | None = None, *, concurrency: int = WARMUP_CONCURRENCY) -> dict:
+    """
+    Fetch every keyword (bypassing the cache) so results are fresh in the cache and index.
+
+    Failures are counted, not raised. A pass where every search failed leaves the worker
+    unready ("failed") until a later pass succeeds or WARMUP_READY_TIMEOUT passes.
+    Returns the final warmup_status().
+    """
+    keywords = warmup_keywords() if keywords is None else keywords
+    with _run_lock:
+        start = time.monotonic()
+        with _state_lock:
+            if _state["status"] != "ready":
+                _state["status"] = "running"
+            _state.update(total=len(keywords), done=0, failed=0, last_started_at=time.time())
+            if _state["first_started_at"] is None:
+                _state["first_started_at"] = _state["last_started_at"]
+        search_cache.decay_queries()  # After picking this pass's top queries
+
+        client = EdibleAPIClient()
+
+        def _one(kw: str) -> None:
+            try:
+                client.search(kw, refresh=True)
+                ok = True
+            except Exception:
+                ok = False
+            with _state_lock:
+                _state["done"] += 1
+                if not ok:
+                    _state["failed"] += 1
+            metrics.inc("warmup_searches_total", result="ok" if ok else "error")
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="warmup") as pool:
+            list(pool.map(_one, keywords))
+
+        duration = time.monotonic() - start
+        with _state_lock:
+            # A pass where every search failed leaves a worker that isn't ready yet
+            fetched = _state["done"] > _state["failed"] or not keywords
+            _state.update(
+                status="ready" if fetched or _state["status"] == "ready" else "failed",
+                runs=_state["runs"] + 1,
+                last_finished_at=time.time(),
+                last_duration_s=round(duration, 3),
+            )
+        metrics.observe("warmup_duration_seconds", duration)
+    return warmup_status()
+
+
+def _precompute_comparisons() -> None:
+    try:
+        precompute_comparisons()
+    except Exception:
+        pass  # Comparisons are computed on demand instead
+    finally:
+        comparison_cache.decay_counts()
+
+
+def start_precompute() -> threading.Thread:
+    """Precompute popular comparisons on a daemon thread, unless the previous run is still going."""
+    global _precompute
+    with _state_lock:
+        if _precompute is None or not _precompute.is_alive():
+            _precompute = threading.Thread(target=_precompute_comparisons, name="comparison-precompute", daemon=True)
+            _precompute.start()
+        return _precompute
+
+
+def start_warmup_scheduler(interval: float = WARMUP_INTERVAL_SECONDS, *, first_delay: float = 0.0) -> threading.Thread:
+    """
+    Run warm-up after `first_delay` seconds and then every `interval` seconds on a daemon
+    thread (idempotent), precomputing comparisons after each pass.
+
+    Forked workers whose master already ran a pass use first_delay=interval, so they don't
+    all repeat it at boot.
+    """
+    global _scheduler
+    if _scheduler is not None and _scheduler.is_alive():
+        return _scheduler
+    _stop.clear()
+
+    def _loop() -> None:
+        if first_delay > 0 and _stop.wait(first_delay):
+            return
+        while not _stop.is_set():
+            run_warmup()
+            start_precompute()
+            if interval <= 0 or _stop.wait(interval):
+                break
+
+    _scheduler = threading.Thread(target=_loop, name="warmup-scheduler", daemon=True)
+    _scheduler.start()
+    return _scheduler
+
+
+def stop_warmup_scheduler() -> None:
+    """Stop the scheduler after its current pass (tests)."""
+    _stop.set()
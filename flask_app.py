@@ -1,6 +1,13 @@
-"""Flask app for AI-powered product discovery."""
+"""Flask app for AI-powered product discovery.
 
+create_app(mode) builds the app. "lazy" (default; CLI, tests, `flask run`) defers heavy
+imports to the first request. "preload" initializes them once up front, for pre-fork
+servers: APP_INIT_MODE=preload gunicorn --preload -w 4 flask_app:app
+"""
+
+import gzip
 import json
+import os
 import sys
 from pathlib import Path
 
@@ -8,37 +15,119 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from dotenv import load_dotenv
+
+# Before reading config below, so .env values apply to it too
+load_dotenv()
+
 POPULAR_PRODUCTS_PATH = PROJECT_ROOT / "data" / "popular_products.json"
+# Overall time budget for one /api/chat turn; stages degrade as it runs out (0 = no limit)
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "20"))
+# Default recommendation mode for /api/chat: "llm" or "local" (no recommender LLM call)
+RECOMMENDATION_MODE = os.getenv("RECOMMENDATION_MODE", "llm")
+# Pre-fetch hot search keywords at start and on a schedule (see app/service/warmup.py)
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1") != "0"
+# Allow per-request profiling ("profile" in the chat body; see app/service/profiling.py)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+# HTTP caching: seconds clients may reuse the shelf / product details / static files
+POPULAR_MAX_AGE = int(os.getenv("POPULAR_MAX_AGE", "300"))
+PRODUCT_MAX_AGE = int(os.getenv("PRODUCT_MAX_AGE", "300"))
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "86400"))
+SUGGEST_MAX_AGE = int(os.getenv("SUGGEST_MAX_AGE", "60"))
+# Compress text responses at least this big (gzip, or brotli if installed)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "500"))
+COMPRESS_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css", "application/javascript"}
+# Product fields the chat and shelf cards render; the rest via /api/products/<id>
+CARD_FIELDS = ("id", "name", "price", "url", "image_url", "recommendation")
+# Request caps: body size (413 above it) and list entries kept from a chat body
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(64 * 1024)))
+CHAT_MAX_HISTORY = int(os.getenv("CHAT_MAX_HISTORY", "20"))  # Most recent messages
+CHAT_MAX_LAST_PRODUCTS = int(os.getenv("CHAT_MAX_LAST_PRODUCTS", "12"))
+# "lazy" or "preload" (see create_app); used for the module-level app
+APP_INIT_MODE = os.getenv("APP_INIT_MODE", "lazy")
+INIT_MODES = ("lazy", "preload")
+
+from flask import Blueprint, Flask, jsonify, render_template, request
 
-from flask import Flask, jsonify, render_template, request
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
 
-app = Flask(__name__)
+bp = Blueprint("main", __name__)
+
+_popular_products: list[dict] | None = None  # In-memory copy of the popular products file
 
 
 def _load_popular_products() -> list[dict]:
-    """Load popular products from local JSON file. Returns empty list if missing or invalid."""
+    """Load popular products from local JSON file (cached in memory). Empty list if missing or invalid."""
+    global _popular_products
+    if _popular_products:
+        return _popular_products
     if not POPULAR_PRODUCTS_PATH.exists():
         return []
     try:
         data = json.loads(POPULAR_PRODUCTS_PATH.read_text())
-        return data.get("products", [])
+        _popular_products = data.get("products", [])
+        return _popular_products
     except (json.JSONDecodeError, OSError):
         return []
 
 
 def _save_popular_products(products: list[dict]) -> None:
     """Save popular products to local JSON file."""
+    global _popular_products
     POPULAR_PRODUCTS_PATH.parent.mkdir(parents=True, exist_ok=True)
     POPULAR_PRODUCTS_PATH.write_text(json.dumps({"products": products}, indent=2))
+    _popular_products = products
+
+
+def _card(p: dict) -> dict:
+    """Slim product projection for card rendering."""
+    return {k: p[k] for k in CARD_FIELDS if k in p}
+
 
+def _cacheable(payload: dict, max_age: int):
+    """JSON response with a weak ETag and public Cache-Control; 304 if the client's copy matches."""
+    response = jsonify(payload)
+    response.add_etag(weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
 
-@app.route("/")
+
+def _compress(response):
+    """Negotiated gzip / brotli for text responses (after_request)."""
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESS_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if brotli else ["gzip"])
+    if encoding == "br":
+        response.set_data(brotli.compress(data, quality=5))
+    elif encoding == "gzip":
+        response.set_data(gzip.compress(data, compresslevel=6))
+    else:
+        return response
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+@bp.route("/")
 def index():
     """Serve the chat UI."""
     return render_template("index.html")
 
 
-@app.route("/api/popular")
+@bp.route("/api/popular")
 def popular():
     """Return popular/featured products for the shelf. Loads from local file; fetches and saves if empty."""
     try:
@@ -52,48 +141,241 @@ def popular():
             for p in products:
                 p.pop("_search_score", None)
             _save_popular_products(products)
-        return jsonify({"products": products[3:]})
+        return _cacheable({"products": [_card(p) for p in products[3:]]}, POPULAR_MAX_AGE)
     except Exception as e:
         return jsonify({"products": [], "error": str(e)}), 500
 
 
-@app.route("/api/chat", methods=["POST"])
+@bp.route("/api/products/<product_id>")
+def product_detail(product_id: str):
+    """Full product fields (description, ingredients, allergy info) for one card, on demand."""
+    from app.service.catalog_cache import product_index
+
+    product = product_index.get(product_id) or next(
+        (p for p in _load_popular_products() if str(p.get("id")) == product_id), None
+    )
+    if product is None:
+        return jsonify({"error": "Product not found"}), 404
+    product = {k: v for k, v in product.items() if k != "_search_score"}
+    return _cacheable({"product": product}, PRODUCT_MAX_AGE)
+
+
+@bp.route("/api/suggest")
+def suggest():
+    """Typeahead completions (occasions, categories, products) for a partial query. No LLM call."""
+    from app.service.suggest import SUGGEST_LIMIT, suggest_index
+
+    query = request.args.get("q", "")[:100]
+    limit = max(1, min(request.args.get("limit", default=SUGGEST_LIMIT, type=int), 20))
+    suggest_index.add(_load_popular_products())
+    return _cacheable({"query": query, "suggestions": suggest_index.suggest(query, limit)}, SUGGEST_MAX_AGE)
+
+
+@bp.route("/api/chat", methods=["POST"])
 def chat():
     """Process user message and return assistant response with optional products."""
+    return _chat(RECOMMENDATION_MODE)
+
+
+@bp.route("/api/chat/local", methods=["POST"])
+def chat_local():
+    """Same as /api/chat, but recommendations are ranked and templated locally (no recommender LLM)."""
+    return _chat("local")
+
+
+def _capped(data: dict, field: str, limit: int, *, keep_last: bool = False) -> list:
+    """data[field] as a list of at most limit entries. ValueError if it isn't a list."""
+    items = data.get(field) or []
+    if not isinstance(items, list):
+        raise ValueError(f"{field} must be a list")
+    if len(items) > limit:
+        from app.service import metrics
+
+        metrics.inc("chat_input_truncated_total", field=field)
+        items = items[-limit:] if keep_last else items[:limit]
+    return items
+
+
+def _chat(default_mode: str):
+    """Handle a chat turn. The body's recommendation_mode overrides the route's default."""
     data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
     user_message = (data.get("message") or "").strip()
-    history = data.get("history") or []
-    last_products = data.get("last_products") or []
+    try:
+        history = _capped(data, "history", CHAT_MAX_HISTORY, keep_last=True)
+        last_products = _capped(data, "last_products", CHAT_MAX_LAST_PRODUCTS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     last_search_query = (data.get("last_search_query") or "").strip() or None
+    conversation_id = str(data.get("conversation_id") or "").strip()[:64] or None
+    recommendation_mode = data.get("recommendation_mode") or default_mode
     debug = bool(data.get("debug"))
+    # "full" returns whole product dicts instead of card fields
+    full_products = data.get("view") == "full"
+    # true / "wall" or "cpu"; ignored unless the server allows profiling
+    profile = data.get("profile") if PROFILING_ENABLED else None
 
     if not user_message:
         return jsonify({"error": "Message is required"}), 400
+    from app.service.recommender import RECOMMENDATION_MODES
+
+    # Checked before admission: the mode is part of the response-cache key
+    if recommendation_mode not in RECOMMENDATION_MODES:
+        return jsonify({"error": f"recommendation_mode must be one of {', '.join(RECOMMENDATION_MODES)}"}), 400
+
+    from app.service.admission import Overloaded, chat_admission
 
     try:
-        from app.service.orchestrator import respond
-
-        result = respond(
-            user_message,
-            history if history else None,
-            last_products=last_products if last_products else None,
-            last_search_query=last_search_query,
-            debug=debug,
-        )
-        payload = {
-            "message": result["message"],
-            "products": result.get("products", []),
-        }
-        if result.get("comparison_table") is not None:
-            payload["comparison_table"] = result["comparison_table"]
-        if result.get("debug_llm_response") is not None:
-            payload["debug_llm_response"] = result["debug_llm_response"]
-        return jsonify(payload)
+        with chat_admission.admit(request.remote_addr or "-"):
+            from app.service.deadline import Deadline
+            from app.service.orchestrator import respond
+
+            args = (user_message, history if history else None)
+            kwargs = dict(
+                last_products=last_products if last_products else None,
+                last_search_query=last_search_query,
+                conversation_id=conversation_id,
+                deadline=Deadline(CHAT_DEADLINE_SECONDS or None),
+                recommendation_mode=recommendation_mode,
+                debug=debug,
+            )
+            profile_info = None
+            if profile:
+                from app.service.profiling import profile_call
+
+                clock = profile if isinstance(profile, str) else "wall"
+                result, profile_info = profile_call(respond, *args, label=request.path, clock=clock, **kwargs)
+            else:
+                result = respond(*args, **kwargs)
+            products = result.get("products", [])
+            payload = {
+                "message": result["message"],
+                "products": products if full_products else [_card(p) for p in products],
+            }
+            if result.get("comparison_table") is not None:
+                payload["comparison_table"] = result["comparison_table"]
+            if result.get("degraded"):
+                payload["degraded"] = result["degraded"]
+            if result.get("debug_llm_response") is not None:
+                payload["debug_llm_response"] = result["debug_llm_response"]
+            if result.get("usage") is not None:
+                payload["debug"] = {"usage": result["usage"]}
+            if profile_info is not None:
+                payload["profile_id"] = profile_info["id"]
+            return jsonify(payload)
+    except Overloaded as e:
+        return jsonify({"error": "Server is busy, please retry shortly"}), 503, {"Retry-After": str(e.retry_after)}
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@bp.app_errorhandler(413)
+def too_large(e):
+    """JSON instead of the HTML error page for bodies over MAX_REQUEST_BYTES."""
+    return jsonify({"error": f"Request body too large (limit {MAX_REQUEST_BYTES} bytes)"}), 413
+
+
+@bp.route("/ready")
+def ready():
+    """Readiness probe: 503 until the first catalog warm-up pass has finished."""
+    if not WARMUP_ON_START:
+        return jsonify({"ready": True, "status": "disabled"})
+    from app.service.warmup import warmup_status
+
+    status = warmup_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@bp.route("/api/profiles")
+def profiles():
+    """Recent request profiles (summaries, newest first). 404 unless PROFILING_ENABLED."""
+    if not PROFILING_ENABLED:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    from app.service.profiling import list_profiles
+
+    limit = request.args.get("limit", default=20, type=int)
+    return jsonify({"profiles": list_profiles(limit)})
+
+
+@bp.route("/metrics")
+def metrics():
+    """Export in-process metrics (LLM calls, tokens, latency) in Prometheus text format."""
+    from app.service.metrics import render_prometheus
+
+    return render_prometheus(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+
+def _start_warmup_scheduler() -> None:
+    from app.service.warmup import start_warmup_scheduler
+
+    start_warmup_scheduler()
+
+
+def _start_warmup_scheduler_after_fork() -> None:
+    """In a worker forked after the preload pass: wait one interval before the next pass."""
+    from app.service.warmup import WARMUP_INTERVAL_SECONDS, start_warmup_scheduler
+
+    start_warmup_scheduler(first_delay=WARMUP_INTERVAL_SECONDS)
+
+
+def _preload() -> None:
+    """
+    Initialize everything the first request would otherwise pay for: service modules
+    (openai, httpx, prompts), routing config, the shared LLM client, the mapped catalog
+    (if CATALOG_FILE is set) and its typeahead index, and popular products.
+
+    With WARMUP_ON_START the first catalog warm-up pass also runs here, so every forked
+    worker inherits a warm search cache and product index. Threads don't survive fork (and
+    one holding a lock at fork time would leave it held), so the pass starts none: the
+    scheduler, and with it comparison precompute, is started in each child, one interval
+    after the pass the child inherited.
+    """
+    import app.prompts  # noqa: F401
+    from app.service import llm_client
+    from app.service import orchestrator  # noqa: F401
+    from app.service.catalog_store import get_catalog
+    from app.service.llm_routing import reload_routes
+    from app.service.suggest import suggest_index
+
+    llm_client.prewarm()
+    reload_routes()
+    get_catalog()
+    suggest_index.sync_catalog()
+    try:
+        llm_client._get_client()
+    except ValueError:
+        pass  # No key yet: the first chat request reports it
+    suggest_index.add(_load_popular_products())
+
+    if WARMUP_ON_START:
+        from app.service.warmup import run_warmup
+
+        run_warmup()
+        os.register_at_fork(after_in_child=_start_warmup_scheduler_after_fork)
+
+
+def create_app(mode: str = APP_INIT_MODE) -> Flask:
+    """Build the Flask app. mode is "lazy" (import on first use) or "preload" (import now)."""
+    if mode not in INIT_MODES:
+        raise ValueError(f"Unknown init mode {mode!r}; expected one of {INIT_MODES}")
+    flask_app = Flask(__name__)
+    flask_app.config["INIT_MODE"] = mode
+    flask_app.config["SEND_FILE_MAX_AGE_DEFAULT"] = STATIC_MAX_AGE
+    flask_app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
+    flask_app.register_blueprint(bp)
+    flask_app.after_request(_compress)
+    if mode == "preload":
+        _preload()
+    elif WARMUP_ON_START:
+        _start_warmup_scheduler()
+    return flask_app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark get_recommendations: LLM mode vs local (LLM-free) mode.
+
+Reports latency per mode (total, and the part spent in search) and how much the two modes'
+picks overlap. Every run starts with an empty search cache and product index, so neither
+mode is served results the other just fetched, and the order of the two modes alternates
+from query to query. By default runs against
+the local stand-ins (scripts/stub_servers.py); --live uses the real APIs from your env.
+
+    python scripts/bench_recommendation_modes.py --llm-delay 0.8 --repeat 3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+QUERIES = [
+    (["birthday", "gifts under $50"], "birthday gift under $50 for my girlfriend"),
+    (["chocolate strawberries"], "chocolate covered strawberries for my mom"),
+    (["anniversary"], "anniversary gift for my wife"),
+    (["thank you", "gifts under $40"], "thank you gift around $40"),
+    (["sympathy"], "something for a friend who lost a loved one"),
+    (["fruit bouquet", "get well"], "get well fruit bouquet"),
+    (["mother's day", "gifts under $75"], "Mother's Day gift under $75"),
+    (["congratulations", "luxury"], "fancy congratulations gift"),
+]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _search_seconds() -> float:
+    """Total time spent in upstream searches so far (search_latency_seconds sum)."""
+    from app.service import metrics
+
+    return metrics.snapshot()["histograms"].get("search_latency_seconds", {}).get("sum", 0.0)
+
+
+def run(repeat: int) -> None:
+    from app.service import usage
+    from app.service.catalog_cache import product_index, search_cache
+    from app.service.recommender import MODE_LLM, MODE_LOCAL, get_recommendations
+
+    latencies: dict[str, list[float]] = {MODE_LLM: [], MODE_LOCAL: []}
+    search_ms: dict[str, list[float]] = {MODE_LLM: [], MODE_LOCAL: []}
+    llm_calls: dict[str, int] = {MODE_LLM: 0, MODE_LOCAL: 0}
+    overlaps: list[float] = []
+    for r in range(repeat):
+        for q, (keywords, message) in enumerate(QUERIES):
+            picks = {}
+            modes = (MODE_LLM, MODE_LOCAL) if (r + q) % 2 == 0 else (MODE_LOCAL, MODE_LLM)
+            for mode in modes:
+                # Cold for each mode: the other mode's searches must not serve this one
+                search_cache.clear()
+                product_index.clear()
+                searched = _search_seconds()
+                with usage.track_request() as calls:
+                    start = time.perf_counter()
+                    result = get_recommendations(keywords, message, mode=mode)
+                    latencies[mode].append((time.perf_counter() - start) * 1000)
+                search_ms[mode].append((_search_seconds() - searched) * 1000)
+                llm_calls[mode] += len(calls)
+                picks[mode] = {str(p.get("id")) for p in result["products"]}
+            union = picks[MODE_LLM] | picks[MODE_LOCAL]
+            overlaps.append(len(picks[MODE_LLM] & picks[MODE_LOCAL]) / len(union) if union else 1.0)
+
+    print(f"{len(QUERIES)} queries x {repeat} runs\n")
+    print(f"{'mode':<8}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'search ms':>11}{'other ms':>10}{'LLM calls':>11}")
+    for mode, values in latencies.items():
+        searching = statistics.mean(search_ms[mode])
+        print(
+            f"{mode:<8}{_percentile(values, 50):>10.1f}{_percentile(values, 95):>10.1f}"
+            f"{statistics.mean(values):>10.1f}{searching:>11.1f}{statistics.mean(values) - searching:>10.1f}"
+            f"{llm_calls[mode]:>11}"
+        )
+    print(f"\nPick overlap (Jaccard of product ids), mean: {statistics.mean(overlaps):.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="Use the real search and LLM APIs")
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="Stand-in LLM latency (seconds)")
+    parser.add_argument("--search-delay", type=float, default=0.05, help="Stand-in search latency (seconds)")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.live:
+        run(args.repeat)
+        return
+
+    from scripts.stub_servers import StubEdibleServer, StubLLMServer
+
+    with StubLLMServer(delays={"*": args.llm_delay}) as llm, StubEdibleServer(delay=args.search_delay) as edible:
+        os.environ["OPENAI_BASE_URL"] = llm.url
+        os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "sk-stand-in"
+        from app.service.edible_client import EdibleAPIClient
+
+        EdibleAPIClient.BASE_URL = edible.url
+        run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Benchmark the recommender's LLM protocols: numbered candidates, exact product names and
+precomputed pitches.
+
+Reports input and output tokens, latency and unmatched picks (recommendations dropped
+because the reply didn't map back to a candidate) per protocol. By default runs against
+the local stand-ins (scripts/stub_servers.py), which model generation time per output
+token and paraphrase a share of product names the way a real model sometimes does; pitches
+for the stand-in catalog are generated first. --live uses the real APIs and PITCH_FILE
+from your env (without it, "pitched" falls back to "indexed").
+
+    python scripts/bench_recommender_protocol.py --ms-per-token 15 --garble-rate 0.1 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+QUERIES = [
+    (["birthday", "gifts under $50"], "birthday gift under $50 for my girlfriend"),
+    (["chocolate strawberries"], "chocolate covered strawberries for my mom"),
+    (["anniversary"], "anniversary gift for my wife"),
+    (["thank you", "gifts under $40"], "thank you gift around $40"),
+    (["sympathy"], "something for a friend who lost a loved one"),
+    (["fruit bouquet", "get well"], "get well fruit bouquet"),
+    (["mother's day", "gifts under $75"], "Mother's Day gift under $75"),
+    (["congratulations", "luxury"], "fancy congratulations gift"),
+]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _garble(name: str) -> str:
+    """A plausible paraphrase: drop the trailing word or swap word order."""
+    words = name.split()
+    if len(words) > 2 and random.random() < 0.5:
+        return " ".join(words[:-1])
+    return " ".join(words[1:] + words[:1])
+
+
+def stand_in_reply(
+    ms_per_token: float,
+    garble_rate: float,
+    *,
+    ms_per_input_token: float = 0.0,
+    model_speed: dict[str, float] | None = None,
+):
+    """
+    canned_reply, plus time per output token (and, optionally, per prompt token for
+    prefill) scaled by the model's slowdown factor in model_speed, and garbled names.
+    """
+    from scripts.stub_servers import _estimate_tokens, canned_reply
+
+    def _reply(body: dict) -> str:
+        text = canned_reply(body)
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            for r in data.get("recommendations") or []:
+                if random.random() < garble_rate:
+                    r["product_name"] = _garble(r["product_name"])
+            text = json.dumps(data)
+        prompt = f"{body.get('instructions') or ''}{json.dumps(body.get('input') or '')}"
+        delay = _estimate_tokens(text) * ms_per_token + _estimate_tokens(prompt) * ms_per_input_token
+        time.sleep(delay * (model_speed or {}).get(body.get("model"), 1.0) / 1000)
+        return text
+
+    return _reply
+
+
+def run(repeat: int) -> None:
+    from app.service import metrics, usage
+    from app.service.recommender import RECOMMENDER_PROTOCOLS, get_recommendations
+
+    metrics.reset()
+    latencies: dict[str, list[float]] = {p: [] for p in RECOMMENDER_PROTOCOLS}
+    input_tokens: dict[str, list[int]] = {p: [] for p in RECOMMENDER_PROTOCOLS}
+    output_tokens: dict[str, list[int]] = {p: [] for p in RECOMMENDER_PROTOCOLS}
+    shown: dict[str, int] = {p: 0 for p in RECOMMENDER_PROTOCOLS}
+    for _ in range(repeat):
+        for keywords, message in QUERIES:
+            for protocol in RECOMMENDER_PROTOCOLS:
+                with usage.track_request() as calls:
+                    start = time.perf_counter()
+                    result = get_recommendations(keywords, message, protocol=protocol)
+                    latencies[protocol].append((time.perf_counter() - start) * 1000)
+                input_tokens[protocol].append(sum(c["input_tokens"] for c in calls))
+                output_tokens[protocol].append(sum(c["output_tokens"] for c in calls))
+                shown[protocol] += len(result["products"])
+
+    counters = metrics.snapshot()["counters"]
+    print(f"{len(QUERIES)} queries x {repeat} runs\n")
+    print(f"{'protocol':<10}{'in tok':>9}{'out tok':>9}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}{'unmatched':>11}{'shown':>7}")
+    for protocol in RECOMMENDER_PROTOCOLS:
+        unmatched = counters.get(f"recommender_unmatched_picks_total{{protocol={protocol}}}", 0)
+        values = latencies[protocol]
+        print(
+            f"{protocol:<10}{statistics.mean(input_tokens[protocol]):>9.0f}{statistics.mean(output_tokens[protocol]):>9.0f}"
+            f"{_percentile(values, 50):>9.1f}{_percentile(values, 95):>9.1f}{statistics.mean(values):>9.1f}{int(unmatched):>11}{shown[protocol]:>7}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="Use the real search and LLM APIs")
+    parser.add_argument("--ms-per-token", type=float, default=15.0, help="Stand-in generation time per output token")
+    parser.add_argument("--garble-rate", type=float, default=0.1, help="Share of product names the stand-in paraphrases")
+    parser.add_argument("--search-delay", type=float, default=0.05, help="Stand-in search latency (seconds)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    if args.live:
+        run(args.repeat)
+        return
+
+    from app.service.edible_client import EdibleAPIClient, _normalize_product
+    from app.service.pitches import generate_pitches
+    from scripts.stub_servers import StubEdibleServer, StubLLMServer
+
+    os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "sk-stand-in"
+    reply = stand_in_reply(args.ms_per_token, args.garble_rate)
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        StubLLMServer(reply) as llm,
+        StubEdibleServer(delay=args.search_delay) as edible,
+    ):
+        # The offline job, without the per-token delay
+        pitch_file = Path(tmp) / "pitches.jsonl"
+        with StubLLMServer() as pitch_llm:
+            os.environ["OPENAI_BASE_URL"] = pitch_llm.url
+            generate_pitches([_normalize_product(p) for p in edible.catalog], pitch_file)
+        os.environ["PITCH_FILE"] = str(pitch_file)
+        os.environ["OPENAI_BASE_URL"] = llm.url
+        EdibleAPIClient.BASE_URL = edible.url
+        run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark worker startup: lazy vs preload app init.
+
+Each run is a fresh interpreter (like a new worker) that imports flask_app with
+APP_INIT_MODE set, then times the first and second /api/chat and the first /api/popular.
+In preload mode the init cost moves from the first request to import/create_app, which a
+pre-fork server pays once in the master. Runs against the local stand-ins
+(scripts/stub_servers.py) with catalog warm-up off.
+
+    python scripts/bench_startup.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+MODES = ("lazy", "preload")
+COLUMNS = ("import_ms", "first_chat_ms", "second_chat_ms", "first_popular_ms")
+
+# Runs in the child interpreter; prints one JSON line of timings
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import flask_app
+timings = {"import_ms": (time.perf_counter() - start) * 1000}
+client = flask_app.app.test_client()
+for key in ("first_chat_ms", "second_chat_ms"):
+    start = time.perf_counter()
+    res = client.post("/api/chat", json={"message": "birthday gift for my mom"})
+    assert res.status_code == 200, res.get_data(as_text=True)
+    timings[key] = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+client.get("/api/popular")
+timings["first_popular_ms"] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+"""
+
+
+def _run_child(mode: str, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        cwd=PROJECT_ROOT,
+        env={**env, "APP_INIT_MODE": mode},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int, env: dict) -> None:
+    print(f"{repeat} fresh interpreters per mode (median ms)\n")
+    print(f"{'mode':<9}" + "".join(f"{c:>18}" for c in COLUMNS))
+    for mode in MODES:
+        runs = [_run_child(mode, env) for _ in range(repeat)]
+        print(f"{mode:<9}" + "".join(f"{statistics.median(r[c] for r in runs):>18.1f}" for c in COLUMNS))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="Stand-in LLM latency (seconds)")
+    args = parser.parse_args()
+
+    from scripts.stub_servers import StubEdibleServer, StubLLMServer
+
+    with StubLLMServer(delays={"*": args.llm_delay}) as llm, StubEdibleServer() as edible:
+        env = dict(os.environ)
+        env.update(
+            OPENAI_BASE_URL=llm.url,
+            OPENAI_API_KEY=env.get("OPENAI_API_KEY") or "sk-stand-in",
+            EDIBLE_API_URL=edible.url,
+            WARMUP_ON_START="0",
+        )
+        run(args.repeat, env)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Build the memory-mapped catalog file (see app/service/catalog_store.py).
+
+Searches every keyword (the warm-up keywords by default) and writes the union of the
+normalized products, or reads them from a snapshot written by scripts/build_snapshot.py.
+The file is swapped in atomically, so running workers pick up the new version within
+CATALOG_RECHECK_SECONDS.
+
+    python scripts/build_catalog.py --out data/catalog.bin
+    python scripts/build_catalog.py --out data/catalog.bin --keywords "birthday,anniversary"
+    python scripts/build_catalog.py --out data/catalog.bin --snapshot data/snapshot
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_OUT = Path(__file__).resolve().parent.parent / "data" / "catalog.bin"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--keywords", help="Comma-separated keywords (default: warm-up keywords)")
+    parser.add_argument("--snapshot", type=Path, help="Read products from this snapshot directory instead")
+    args = parser.parse_args()
+
+    from app.service.catalog_store import build_catalog
+    from app.service.edible_client import EdibleAPIClient
+    from app.service.warmup import warmup_keywords
+
+    if args.snapshot:
+        from app.service.snapshot import iter_snapshot
+
+        start = time.perf_counter()
+        try:
+            # Streamed shard by shard; a checksum mismatch aborts before the file is swapped in
+            count = build_catalog(iter_snapshot(args.snapshot), args.out)
+        except ValueError as e:
+            sys.exit(str(e))
+        size = args.out.stat().st_size
+        print(f"Wrote {count} products ({size / 1024:.0f} KiB) to {args.out} in {time.perf_counter() - start:.1f}s")
+        return
+
+    keywords = [k.strip() for k in args.keywords.split(",") if k.strip()] if args.keywords else warmup_keywords()
+    client = EdibleAPIClient()
+    products: dict[str, dict] = {}
+    start = time.perf_counter()
+    for kw in keywords:
+        try:
+            found = client.search(kw, refresh=True)["products"]
+        except Exception as e:
+            print(f"  {kw!r}: failed ({e})", file=sys.stderr)
+            continue
+        for p in found:
+            if p.get("id"):
+                products.setdefault(str(p["id"]), p)
+        print(f"  {kw!r}: {len(found)} products")
+
+    count = build_catalog(list(products.values()), args.out)
+    size = args.out.stat().st_size
+    print(f"Wrote {count} products ({size / 1024:.0f} KiB) to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
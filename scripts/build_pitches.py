@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Precompute per-product pitches, tags and summaries (see app/service/pitches.py).
+
+Reads the catalog file written by scripts/build_catalog.py and asks the LLM, in concurrent
+batches at background priority, for each product's pitch. Safe to interrupt and rerun:
+products with a current line in the output are skipped. Point workers at the output with
+PITCH_FILE and set RECOMMENDER_PROTOCOL=pitched.
+
+    python scripts/build_pitches.py --catalog data/catalog.bin --out data/pitches.jsonl
+    python scripts/build_pitches.py --batch-size 10 --concurrency 8 --limit 50
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog", type=Path, default=Path(os.getenv("CATALOG_FILE") or DATA_DIR / "catalog.bin"))
+    parser.add_argument("--out", type=Path, default=Path(os.getenv("PITCH_FILE") or DATA_DIR / "pitches.jsonl"))
+    parser.add_argument("--batch-size", type=int, help="Products per LLM call (default PITCH_BATCH_SIZE)")
+    parser.add_argument("--concurrency", type=int, help="Batches in flight (default PITCH_CONCURRENCY)")
+    parser.add_argument("--limit", type=int, help="Only the first N catalog products")
+    args = parser.parse_args()
+
+    from app.service.catalog_store import MappedCatalog
+    from app.service.pitches import PITCH_BATCH_SIZE, PITCH_CONCURRENCY, generate_pitches
+
+    try:
+        catalog = MappedCatalog(args.catalog)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Can't read catalog {args.catalog}: {e} (build it with scripts/build_catalog.py)")
+    count = len(catalog) if args.limit is None else min(args.limit, len(catalog))
+    products = [catalog.product(i) for i in range(count)]
+
+    start = time.perf_counter()
+
+    def _progress(stats: dict) -> None:
+        done = stats["skipped"] + stats["written"] + stats["failed"]
+        print(f"  {done}/{stats['products']} ({stats['written']} written, {stats['failed']} failed)", flush=True)
+
+    stats = generate_pitches(
+        products,
+        args.out,
+        batch_size=args.batch_size or PITCH_BATCH_SIZE,
+        concurrency=args.concurrency or PITCH_CONCURRENCY,
+        progress=_progress,
+    )
+    print(
+        f"{stats['written']} written, {stats['skipped']} already current, {stats['failed']} failed "
+        f"-> {args.out} in {time.perf_counter() - start:.1f}s"
+    )
+    if stats["failed"]:
+        print("Rerun to retry the failed products.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Crawl the search API into a catalog snapshot (see app/service/snapshot.py).
+
+Searches the keyword seed set (the warm-up keywords by default) with bounded concurrency
+and a request-rate cap, streaming deduplicated, normalized products to sharded JSON-lines
+files. Rerunning into the same directory rewrites only the shards whose products changed;
+manifest.json lists counts and checksums. Build the memory-mapped catalog from it with
+scripts/build_catalog.py --snapshot.
+
+    python scripts/build_snapshot.py --out data/snapshot
+    python scripts/build_snapshot.py --out data/snapshot --keywords-file seeds.txt --expand --rate 1
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_OUT = Path(__file__).resolve().parent.parent / "data" / "snapshot"
+
+
+def main() -> None:
+    from app.service.snapshot import SNAPSHOT_CONCURRENCY, SNAPSHOT_RATE, SNAPSHOT_RETRIES
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="Snapshot directory")
+    parser.add_argument("--keywords", help="Comma-separated seed keywords (default: warm-up keywords)")
+    parser.add_argument("--keywords-file", type=Path, help="Seed keywords, one per line")
+    parser.add_argument("--expand", action="store_true", help="Also search occasions and categories found")
+    parser.add_argument("--max-keywords", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=SNAPSHOT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=SNAPSHOT_RATE, help="Max search requests per second (0 = no cap)")
+    parser.add_argument("--retries", type=int, default=SNAPSHOT_RETRIES)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    from app.service.snapshot import SnapshotWriter, crawl
+    from app.service.warmup import warmup_keywords
+
+    keywords: list[str] = []
+    if args.keywords:
+        keywords += [k.strip() for k in args.keywords.split(",") if k.strip()]
+    if args.keywords_file:
+        keywords += [k.strip() for k in args.keywords_file.read_text().splitlines() if k.strip()]
+    keywords = keywords or warmup_keywords()
+
+    def _progress(kw: str, found: int, added: int) -> None:
+        if not args.quiet:
+            print(f"  {kw!r}: {found} products, {added} new", flush=True)
+
+    start = time.perf_counter()
+    writer = SnapshotWriter(args.out)
+    result = crawl(
+        keywords,
+        writer,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        retries=args.retries,
+        expand=args.expand,
+        max_keywords=args.max_keywords,
+        progress=_progress,
+    )
+    failed = result["failed"]
+    manifest = writer.finish(keywords=result["searched"], keywords_failed=failed)
+    print(
+        f"{manifest['products']} products ({manifest['added']} added, {manifest['changed']} changed, "
+        f"{manifest['removed']} removed, {manifest['carried_over']} carried over); "
+        f"{manifest['shards_rewritten']}/{len(manifest['shards'])} shards rewritten -> {args.out} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    if failed:
+        print(f"{len(failed)} keywords failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
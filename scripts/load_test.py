@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Load generator for /api/chat and /api/popular with latency SLO reporting.
+
+Replays multi-turn conversation scripts (greeting, vague, search, refinement, compare) the
+way the chat UI sends them: history, last_products and last_search_query, and a
+conversation_id. New conversations arrive open-loop (Poisson) at each target rate. Every
+conversation first loads /api/popular, like a page view. For each rate the tool reports
+throughput, p50/p95/p99 latency per intent type and error rates. The saturation point is
+the first rate that breaks the SLO.
+
+By default the app runs in-process against the local stand-ins (scripts/stub_servers.py),
+so the numbers measure this service with simulated upstream latency. --url targets a
+running deployment instead.
+
+    python scripts/load_test.py --rates 1,2,4,8 --duration 20 --llm-delay 0.6
+    python scripts/load_test.py --url http://localhost:5000 --rates 2,4
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# (weight, turns); each turn is (intent type, message)
+CONVERSATIONS = [
+    (3, [
+        ("greeting", "hi"),
+        ("vague", "I need a gift"),
+        ("search", "birthday gift under $50"),
+        ("refinement", "something cheaper"),
+        ("compare", "compare the first two"),
+    ]),
+    (3, [
+        ("search", "chocolate strawberries for my mom"),
+        ("refinement", "something different"),
+        ("compare", "compare the first two"),
+    ]),
+    (2, [
+        ("vague", "help me find something nice"),
+        ("search", "anniversary gift for my wife under $100"),
+        ("refinement", "fancier"),
+    ]),
+    (2, [
+        ("greeting", "hello"),
+        ("search", "thank you gift around 40 dollars"),
+    ]),
+]
+REQUEST_TIMEOUT = 60.0
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Recorder:
+    """Thread-safe list of (intent type, latency ms, ok) samples, plus a count of shed (503) turns."""
+
+    def __init__(self):
+        self.samples: list[tuple[str, float, bool]] = []
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, latency_ms: float, ok: bool, *, shed: bool = False) -> None:
+        with self._lock:
+            self.samples.append((kind, latency_ms, ok))
+            self.shed += shed
+
+
+def run_conversation(base_url: str, turns: list[tuple[str, str]], recorder: Recorder) -> None:
+    """Play one conversation; stop early if a turn fails (like a user giving up)."""
+    http = requests.Session()
+    conversation_id = uuid.uuid4().hex
+    history: list[dict] = []
+    last_products: list[dict] = []
+    last_search_query = None
+
+    start = time.perf_counter()
+    try:
+        ok = http.get(f"{base_url}/api/popular", timeout=REQUEST_TIMEOUT).ok
+    except requests.RequestException:
+        ok = False
+    recorder.add("popular", (time.perf_counter() - start) * 1000, ok)
+
+    for kind, message in turns:
+        payload = {"message": message, "history": history, "conversation_id": conversation_id}
+        if last_products:
+            payload.update(last_products=last_products, last_search_query=last_search_query)
+        start = time.perf_counter()
+        try:
+            res = http.post(f"{base_url}/api/chat", json=payload, timeout=REQUEST_TIMEOUT)
+            ok, shed = res.status_code == 200, res.status_code == 503
+            data = res.json() if ok else {}
+        except (requests.RequestException, ValueError):
+            ok, shed, data = False, False, {}
+        recorder.add(kind, (time.perf_counter() - start) * 1000, ok, shed=shed)
+        if not ok:
+            return
+        history += [{"role": "user", "content": message}, {"role": "assistant", "content": data.get("message", "")}]
+        if data.get("products") and not data.get("comparison_table"):
+            last_products, last_search_query = data["products"], message
+
+
+def run_step(base_url: str, rate: float, duration: float, max_concurrency: int, seed: int) -> dict:
+    """Offer `rate` new conversations/s for `duration` seconds, then wait for them to finish."""
+    rng = random.Random(seed)
+    weights = [w for w, _ in CONVERSATIONS]
+    recorder = Recorder()
+    started = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="load") as pool:
+        next_at = start
+        while next_at - start < duration:
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+            turns = rng.choices(CONVERSATIONS, weights=weights)[0][1]
+            pool.submit(run_conversation, base_url, turns, recorder)
+            started += 1
+            next_at += rng.expovariate(rate)
+    elapsed = time.perf_counter() - start
+
+    by_kind: dict[str, list[tuple[float, bool]]] = {}
+    for kind, latency, ok in recorder.samples:
+        by_kind.setdefault(kind, []).append((latency, ok))
+    chat = [(lat, ok) for kind, lat, ok in recorder.samples if kind != "popular"]
+    return {
+        "rate": rate,
+        "conversations": started,
+        "requests": len(recorder.samples),
+        "throughput": len(recorder.samples) / elapsed,
+        "shed": recorder.shed,
+        "error_rate": sum(not ok for _, _, ok in recorder.samples) / max(1, len(recorder.samples)),
+        "chat_p95": _percentile([lat for lat, _ in chat], 95) if chat else 0.0,
+        "by_kind": {
+            kind: {
+                "n": len(values),
+                "errors": sum(not ok for _, ok in values),
+                "p50": _percentile([v for v, _ in values], 50),
+                "p95": _percentile([v for v, _ in values], 95),
+                "p99": _percentile([v for v, _ in values], 99),
+                "mean": statistics.mean(v for v, _ in values),
+            }
+            for kind, values in sorted(by_kind.items())
+        },
+    }
+
+
+def print_step(step: dict) -> None:
+    print(
+        f"\n== {step['rate']:g} conv/s: {step['conversations']} conversations, {step['requests']} requests, "
+        f"{step['throughput']:.1f} req/s, errors {step['error_rate']:.1%} ({step['shed']} shed with 503)"
+    )
+    print(f"  {'intent':<12}{'n':>6}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for kind, s in step["by_kind"].items():
+        print(
+            f"  {kind:<12}{s['n']:>6}{s['errors']:>6}{s['p50']:>10.0f}{s['p95']:>10.0f}"
+            f"{s['p99']:>10.0f}{s['mean']:>10.0f}"
+        )
+
+
+def run(base_url: str, args) -> None:
+    sustained = None
+    for i, rate in enumerate(args.rates):
+        step = run_step(base_url, rate, args.duration, args.max_concurrency, args.seed + i)
+        print_step(step)
+        if step["chat_p95"] > args.slo_p95_ms or step["error_rate"] > args.max_error_rate:
+            print(
+                f"\nSaturation point: {rate:g} conv/s (chat p95 {step['chat_p95']:.0f} ms, "
+                f"errors {step['error_rate']:.1%}; SLO p95 <= {args.slo_p95_ms:g} ms, "
+                f"errors <= {args.max_error_rate:.1%})"
+            )
+            break
+        sustained = step
+    else:
+        print(f"\nNo saturation up to {args.rates[-1]:g} conv/s")
+    if sustained:
+        print(f"Sustained: {sustained['rate']:g} conv/s ({sustained['throughput']:.1f} req/s) within SLO")
+
+
+def _serve_local(args):
+    """Start the stand-ins and the app in-process. Returns (base_url, stop callable)."""
+    from scripts.stub_servers import StubEdibleServer, StubLLMServer, synthetic_catalog
+
+    llm = StubLLMServer(delays={"*": args.llm_delay}).start()
+    edible = StubEdibleServer(synthetic_catalog(args.catalog_size), delay=args.search_delay).start()
+    os.environ.update(
+        OPENAI_BASE_URL=llm.url,
+        OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY") or "sk-stand-in",
+        EDIBLE_API_URL=edible.url,
+        WARMUP_ON_START="0",
+        APP_INIT_MODE="preload",  # Don't count the first request's imports against step 1
+    )
+    # Every simulated user connects from 127.0.0.1; don't treat them as one client
+    os.environ.setdefault("CHAT_MAX_PER_CLIENT", "0")
+    from werkzeug.serving import make_server
+
+    import flask_app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # No per-request access log
+    server = make_server("127.0.0.1", 0, flask_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop() -> None:
+        server.shutdown()
+        llm.stop()
+        edible.stop()
+
+    return f"http://127.0.0.1:{server.server_port}", stop
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target a running app (default: in-process app + stand-ins)")
+    parser.add_argument("--rates", default="1,2,4,8", help="Comma-separated new conversations per second")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of arrivals per rate")
+    parser.add_argument("--max-concurrency", type=int, default=256, help="Max in-flight conversations")
+    parser.add_argument("--slo-p95-ms", type=float, default=5000.0, help="Chat p95 latency SLO")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="Stand-in LLM latency (seconds)")
+    parser.add_argument("--search-delay", type=float, default=0.1, help="Stand-in search latency (seconds)")
+    parser.add_argument("--catalog-size", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    args.rates = [float(r) for r in args.rates.split(",") if r.strip()]
+
+    if args.url:
+        run(args.url.rstrip("/"), args)
+        return
+    base_url, stop = _serve_local(args)
+    try:
+        run(base_url, args)
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
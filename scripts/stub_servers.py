@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""Local stand-ins for the OpenAI Responses API and the Edible search API.
+
+For tests, load tests and benchmarks. Point the app at them with
+OPENAI_BASE_URL=<llm.url> (any OPENAI_API_KEY works) and EDIBLE_API_URL=<edible.url>.
+
+    python scripts/stub_servers.py --llm-port 8101 --edible-port 8102
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+GREETING_WORDS = ("hi", "hello", "hey", "how are you", "good morning", "good evening")
+OCCASION_WORDS = (
+    "birthday", "anniversary", "mother's day", "valentine", "thank you", "sympathy",
+    "get well", "congratulations", "graduation", "christmas", "holiday", "wedding",
+)
+PRODUCT_WORDS = ("chocolate", "strawberr", "fruit", "bouquet", "cheesecake", "cookie", "box")
+REFINEMENT_WORDS = ("cheaper", "more fun", "different", "fancier", "luxurious", "affordable", "for kids", "budget")
+
+SYNTHETIC_OCCASIONS = ["Birthday", "Anniversary", "Mother's Day", "Thank You", "Sympathy", "Get Well", "Congratulations"]
+SYNTHETIC_KINDS = [
+    ("Chocolate Dipped Strawberries", "Chocolate Dipped Fruit", "Strawberry - Semisweet Chocolate,Strawberry - White Chocolate"),
+    ("Fruit Bouquet", "Fruit Arrangements", "Pineapple Daisy,Cantaloupe,Honeydew,Grapes,Strawberry"),
+    ("Berry Box", "Boxes of Chocolate Covered Fruit", "Box Berry - Semi - Sprinkles,Box Berry - Milk Chocolate"),
+    ("Cheesecake Gift", "Bakery", "Cheesecake Bites - Dark Chocolate,Cookie - Chocolate Chip"),
+    ("Luxe Gift Set", "Gift Sets", "Strawberry - Dark Chocolate - Gold Drizzle,Pineapple - White Chocolate,Truffles"),
+]
+
+
+def synthetic_catalog(n: int = 120) -> list[dict]:
+    """Raw-API-shaped products (same field names as the real search API)."""
+    products = []
+    for i in range(n):
+        occasion = SYNTHETIC_OCCASIONS[i % len(SYNTHETIC_OCCASIONS)]
+        kind, category, ingredients = SYNTHETIC_KINDS[(i // len(SYNTHETIC_OCCASIONS)) % len(SYNTHETIC_KINDS)]
+        name = f"{occasion} {kind} {i}"
+        price = round(24.99 + (i * 7.5) % 140, 2)
+        products.append({
+            "id": str(1000 + i),
+            "name": name,
+            "minPrice": price,
+            "maxPrice": round(price + 20, 2),
+            "url": name.lower().replace("'", "").replace(" ", "-"),
+            "image": f"https://example.invalid/img/{1000 + i}.jpg",
+            "description": f"A {occasion.lower()} {kind.lower()} made with fresh fruit and premium chocolate. " * 3,
+            "occasion": occasion,
+            "category": f"All Products,{category}",
+            "ingrediantNames": ingredients,
+            "sizeCount": 1 + i % 3,
+            "allergyinformation": "Edible Arrangements products may contain egg, wheat, soy, milk, peanuts, and tree nuts.",
+        })
+    return products
+
+
+def raw_product(p: dict) -> dict:
+    """Raw-API-shaped product from a normalized one, to serve a recorded catalog (snapshot)."""
+    url = p.get("url") or ""
+    return {
+        "id": str(p["id"]),
+        "name": p.get("name") or "",
+        "minPrice": p.get("price") or 0,
+        "url": url.rsplit("/fruit-gifts/", 1)[-1] if url else "",
+        "image": p.get("image_url") or "",
+        "description": p.get("description") or "",
+        "occasion": p.get("occasion") or "",
+        "category": p.get("category") or "",
+        "ingrediantNames": p.get("ingredients") or "",
+        "sizeCount": p.get("size_count"),
+        "allergyinformation": p.get("allergy_info") or "",
+    }
+
+
+def search_catalog(catalog: list[dict], keyword: str) -> list[dict]:
+    """Token-overlap keyword search with an @search.score, like the real API's ranking."""
+    low = (keyword or "").lower()
+    budget = re.search(r"under \$?(\d+)", low)
+    tokens = [t for t in re.findall(r"[a-z']+", low) if len(t) > 2 and t not in ("gifts", "gift", "under", "for")]
+    results = []
+    for p in catalog:
+        haystack = f"{p['name']} {p['occasion']} {p['category']} {p['ingrediantNames']}".lower()
+        score = sum(1.0 for t in tokens if t in haystack)
+        if budget and p["minPrice"] <= float(budget.group(1)):
+            score += 1.0
+        elif not tokens and not budget:
+            score = 0.5
+        if score > 0:
+            results.append({**p, "@search.score": score + (int(p["id"]) % 100) / 1000})
+    results.sort(key=lambda p: p["@search.score"], reverse=True)
+    return results[:40]
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+def _latest_user_message(text: str) -> str:
+    """Pull the user's latest message out of an intent-classifier prompt."""
+    m = re.search(r"Latest user message: (.*?)(?:\n\n\[|\n\nRespond with JSON\.|$)", text, re.S)
+    if m:
+        return m.group(1).strip()
+    return text.split("\n\n[", 1)[0].replace("Respond with JSON.", "").strip()
+
+
+def canned_intent(prompt: str) -> dict:
+    """Rough keyword-rule intent classification, shaped like INTENT_CLASSIFIER output."""
+    message = _latest_user_message(prompt)
+    low = message.lower()
+    recs_shown = "just showed product recommendations" in prompt
+    intent = {
+        "intent_type": "vague",
+        "keywords": [],
+        "needs_followup": True,
+        "followup_reason": "occasion and budget unclear",
+        "comparison_requested": False,
+        "products_to_compare": [],
+        "confidence": "medium",
+    }
+    if low.strip(" !.?") in GREETING_WORDS or low.startswith(("hi ", "hello ", "hey ")):
+        intent.update(intent_type="greeting", needs_followup=False, followup_reason=None)
+    elif "compare" in low:
+        names = re.search(r"Recently shown products[^:]*: (.*?)\]", prompt)
+        shown = [n.strip() for n in names.group(1).split(",")] if names else []
+        rest = re.sub(r"^.*?compare\s*", "", message, flags=re.I)
+        items = [x.strip() for x in re.split(r"\s+(?:vs\.?|and|with)\s+|,", rest) if x.strip()]
+        if not items or rest.lower().startswith(("these", "the first", "them")):
+            items = shown[:2]
+        intent.update(
+            intent_type="compare", needs_followup=False, followup_reason=None,
+            comparison_requested=True, products_to_compare=items,
+        )
+    elif recs_shown and any(w in low for w in REFINEMENT_WORDS):
+        intent.update(intent_type="refinement", keywords=[w for w in REFINEMENT_WORDS if w in low][:2],
+                      needs_followup=False, followup_reason=None)
+    else:
+        keywords = [w for w in OCCASION_WORDS if w in low]
+        keywords += [w if w != "strawberr" else "strawberries" for w in PRODUCT_WORDS if w in low]
+        budget = re.search(r"\$\s?(\d+)|(\d+)\s*dollars", low)
+        if budget:
+            keywords.append(f"gifts under ${budget.group(1) or budget.group(2)}")
+        if keywords:
+            intent.update(intent_type="search", keywords=keywords, needs_followup=False, followup_reason=None)
+    return intent
+
+
+def canned_intent_batch(prompt: str) -> dict:
+    """Classify each {"key", "message"} entry of a batched intent prompt."""
+    return {req["key"]: canned_intent(req["message"]) for req in json.loads(prompt)}
+
+
+def canned_recommendations(prompt: str, limit: int = 4) -> dict:
+    """Pick the first products listed in a recommender prompt (by number if they're numbered)."""
+    numbered = re.findall(r"^\[(\d+)\] (.+?) \| \$", prompt, re.M)
+    if numbered:
+        return {
+            "intro_message": "Here are a few picks I think you'll love.",
+            "picks": [{"i": int(i), "why": f"{n} is a crowd-pleaser for this occasion."} for i, n in numbered[:limit]],
+            "fallback_message": None,
+        }
+    names = re.findall(r"^- (.+?) \| \$", prompt, re.M)
+    if not names:
+        return {"intro_message": None, "recommendations": [], "fallback_message": "No match."}
+    return {
+        "intro_message": "Here are a few picks I think you'll love.",
+        "recommendations": [
+            {"product_name": n, "recommendation": f"{n} is a crowd-pleaser for this occasion."}
+            for n in names[:limit]
+        ],
+        "fallback_message": None,
+    }
+
+
+def canned_pitches(prompt: str) -> dict:
+    """A pitch, tags and summary for each numbered product in a pitch-job prompt."""
+    items = []
+    for i, name, occasion in re.findall(r"^\[(\d+)\] (.+)\n(?:  Occasion: (.+))?", prompt, re.M):
+        items.append({
+            "i": int(i),
+            "pitch": f"{name} is a thoughtful way to say it with fruit.",
+            "occasions": [occasion.lower()] if occasion else [],
+            "recipients": ["friend", "family"],
+            "summary": f"{name.rsplit(' ', 1)[0]}, fresh fruit and chocolate",
+        })
+    return {"items": items}
+
+
+def canned_comparison(prompt: str) -> dict:
+    """Compare the products named in a comparison prompt."""
+    names = re.findall(r"^\*\*(.+?)\*\*$", prompt, re.M)
+    return {
+        "intro_message": "Here's how these stack up.",
+        "best_for": [{"product_name": n, "verdict": "Best for a thoughtful surprise"} for n in names],
+    }
+
+
+def canned_reply(body: dict) -> str:
+    """Default reply: route on the system prompt, like the real prompts would."""
+    instructions = body.get("instructions") or ""
+    prompt = body.get("input") or ""
+    if isinstance(prompt, list):
+        prompt = json.dumps(prompt)
+    if instructions.startswith("You are an intent classifier"):
+        if "Batch mode:" in instructions:
+            return json.dumps(canned_intent_batch(prompt.replace("\n\nRespond with JSON.", "")))
+        return json.dumps(canned_intent(prompt))
+    if "that best match their request" in instructions or "Pick 4 that best match" in instructions:
+        count = re.search(r"(\d+) (?:BEST|NEW)", prompt)
+        data = canned_recommendations(prompt, int(count.group(1)) if count else 4)
+        if "Do not write product descriptions" in instructions:
+            data["picks"] = [r["i"] for r in data.get("picks") or []]
+        return json.dumps(data)
+    if "writing catalog copy ahead of time" in instructions:
+        return json.dumps(canned_pitches(prompt))
+    if "comparing 2-3 products" in instructions:
+        return json.dumps(canned_comparison(prompt))
+    if "json" in json.dumps(body.get("text") or {}):
+        return "{}"
+    if "too vague" in instructions:
+        return "What's the occasion? And do you have a budget in mind?"
+    return "Hi there! What kind of gift are you looking for today?"
+
+
+class _StubServer:
+    """Run a ThreadingHTTPServer on a background thread."""
+
+    handler_class: type[BaseHTTPRequestHandler]
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), self.handler_class)
+        self._server.daemon_threads = True
+        self._server.stub = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+        self.requests: list[dict] = []
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _log(self, body: dict) -> None:
+        with self._lock:
+            self.requests.append(body)
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - silence per-request logging
+        pass
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw or b"{}")
+
+    def _send_json(self, status: int, payload, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up (timeout); nothing to do
+
+
+class _LLMHandler(_JSONHandler):
+    def do_POST(self):
+        stub: StubLLMServer = self.server.stub  # type: ignore[attr-defined]
+        if not self.path.rstrip("/").endswith("/responses"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        body = self._read_json()
+        prompt = f"{body.get('instructions') or ''}\n{body.get('input') or ''}"
+        retry_after = stub._over_limit(_estimate_tokens(prompt) + (body.get("max_output_tokens") or 0))
+        if retry_after is not None:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                headers={"retry-after-ms": str(int(retry_after * 1000))},
+            )
+            return
+        stub._log(body)
+        model = body.get("model") or "gpt-4o-mini"
+        delay = stub.delays.get(model, stub.delays.get("*", 0.0))
+        if delay:
+            time.sleep(delay)
+        reply = stub.reply(body)
+        text = reply if isinstance(reply, str) else json.dumps(reply)
+        in_tokens, out_tokens = _estimate_tokens(prompt), _estimate_tokens(text)
+        self._send_json(200, {
+            "id": f"resp_stub_{len(stub.requests)}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": model,
+            "status": "completed",
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [{
+                "type": "message",
+                "id": "msg_stub",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }],
+            "usage": {
+                "input_tokens": in_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": out_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": in_tokens + out_tokens,
+            },
+        })
+
+
+class StubLLMServer(_StubServer):
+    """
+    Minimal OpenAI Responses API stand-in.
+
+    reply(body) returns the output text (str) or a JSON-able object; defaults to canned_reply.
+    delays maps model name (or "*") to seconds slept before replying. rpm / tpm enforce
+    request and token budgets per rate_window seconds like the real API: token buckets
+    (prompt estimate + max_output_tokens), and a 429 with retry-after-ms when exceeded.
+    Rejected requests are counted in rate_limited and not recorded in requests.
+    """
+
+    handler_class = _LLMHandler
+
+    def __init__(
+        self,
+        reply: Callable[[dict], str | dict] | None = None,
+        *,
+        delays: dict[str, float] | None = None,
+        rpm: int | None = None,
+        tpm: int | None = None,
+        rate_window: float = 60.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        super().__init__(host, port)
+        self.reply = reply or canned_reply
+        self.delays = dict(delays or {})
+        self.rate_limited = 0
+        self._window = rate_window
+        # name -> [capacity, level]; refilled continuously
+        self._buckets = {k: [float(v), float(v)] for k, v in (("requests", rpm), ("tokens", tpm)) if v}
+        self._refilled = time.monotonic()
+
+    def _over_limit(self, tokens: int) -> float | None:
+        """Take one request and `tokens` from the budgets; seconds to wait if they can't cover it."""
+        if not self._buckets:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self._buckets.values():
+                bucket[1] = min(bucket[0], bucket[1] + (now - self._refilled) * bucket[0] / self._window)
+            self._refilled = now
+            need = {"requests": 1, "tokens": tokens}
+            short = [(need[k] - b[1]) * self._window / b[0] for k, b in self._buckets.items() if b[1] < need[k]]
+            if short:
+                self.rate_limited += 1
+                return max(short)
+            for k, b in self._buckets.items():
+                b[1] -= need[k]
+            return None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+
+class _EdibleHandler(_JSONHandler):
+    def do_POST(self):
+        stub: StubEdibleServer = self.server.stub  # type: ignore[attr-defined]
+        body = self._read_json()
+        stub._log(body)
+        if stub.delay:
+            time.sleep(stub.delay)
+        self._send_json(200, search_catalog(stub.catalog, body.get("keyword") or ""))
+
+
+class StubEdibleServer(_StubServer):
+    """Edible search API stand-in: POST {"keyword": ...} returns a list of raw products."""
+
+    handler_class = _EdibleHandler
+
+    def __init__(
+        self,
+        catalog: list[dict] | None = None,
+        *,
+        delay: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        super().__init__(host, port)
+        self.catalog = catalog if catalog is not None else synthetic_catalog()
+        self.delay = delay
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/search/"
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-port", type=int, default=8101)
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="Seconds to sleep per LLM call")
+    parser.add_argument("--edible-port", type=int, default=8102)
+    parser.add_argument("--edible-delay", type=float, default=0.0, help="Seconds to sleep per search")
+    parser.add_argument("--catalog-size", type=int, default=120)
+    args = parser.parse_args()
+
+    llm = StubLLMServer(delays={"*": args.llm_delay}, port=args.llm_port).start()
+    edible = StubEdibleServer(synthetic_catalog(args.catalog_size), delay=args.edible_delay, port=args.edible_port).start()
+    print(f"LLM stand-in:     OPENAI_BASE_URL={llm.url}")
+    print(f"Search stand-in:  EDIBLE_API_URL={edible.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        llm.stop()
+        edible.stop()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
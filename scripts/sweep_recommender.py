@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Sweep recommender settings and report what each costs in latency, tokens and quality.
+
+Replays a labelled query set through get_recommendations for every combination of:
+    --candidates         products sent to the LLM (RECOMMENDER_MAX_CANDIDATES)
+    --limits             picks per turn (the limit argument / MAX_RECOMMENDATIONS)
+    --description-chars  description length per candidate (RECOMMENDER_DESCRIPTION_CHARS)
+    --models             recommender model (LLM_RECOMMENDER_MODEL)
+    --protocols          RECOMMENDER_PROTOCOL
+and prints one row per configuration: p50/p95 latency, prompt and output tokens per turn,
+match-failure rate (LLM picks that didn't map to a candidate) and agreement with the
+reference picks (share of the reference found in the picks). Rows marked * are on the
+Pareto front: no other configuration is at least as good on p95 latency, tokens, failures
+and agreement, and better on one.
+
+Upstreams are stand-ins by default: the synthetic catalog (or a recorded one with
+--snapshot DIR, from scripts/build_snapshot.py) and an LLM stand-in that models prefill
+and generation time per token, per-model speed (--model-speed gpt-4o=2.5) and paraphrased
+names. --live-llm uses the real LLM; --live uses the real LLM and search API.
+
+Queries are JSON lines: {"keywords": [...], "message": "...", "reference": ["id", ...]}
+(default: the protocol benchmark's queries, unlabelled). --record-reference FILE runs the
+largest setting of each dimension, on the first model and protocol, and writes its picks
+as the labels; review them, then sweep with --queries FILE.
+
+    python scripts/sweep_recommender.py --record-reference data/sweep_queries.jsonl
+    python scripts/sweep_recommender.py --queries data/sweep_queries.jsonl \\
+        --candidates 6,10,15 --description-chars 0,150,500 --models gpt-4o-mini,gpt-4o \\
+        --model-speed gpt-4o=2.5 --json sweep.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import TypedDict
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class Config(TypedDict):
+    candidates: int
+    limit: int
+    description_chars: int
+    model: str
+    protocol: str
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _strs(value: str) -> list[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def load_queries(path: Path | None) -> list[dict]:
+    if path is None:
+        from scripts.bench_recommender_protocol import QUERIES
+
+        return [{"keywords": kw, "message": message} for kw, message in QUERIES]
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def _apply(config: Config) -> None:
+    from app.service import llm_routing, recommender
+
+    recommender.MAX_PRODUCTS_FOR_LLM = config["candidates"]
+    recommender.LLM_DESCRIPTION_CHARS = config["description_chars"]
+    os.environ["LLM_RECOMMENDER_MODEL"] = config["model"]
+    llm_routing.reload_routes()
+
+
+def run_config(config: Config, queries: list[dict], repeat: int) -> dict:
+    """Replay the queries under one configuration and summarize."""
+    from app.service import metrics, usage
+    from app.service.recommender import get_recommendations
+
+    _apply(config)
+    metrics.reset()
+    latencies: list[float] = []
+    input_tokens: list[int] = []
+    output_tokens: list[int] = []
+    agreement: list[float] = []
+    matched = empty = 0
+    picks: list[list[str]] = []
+    for _ in range(repeat):
+        picks = []
+        for q in queries:
+            with usage.track_request() as calls:
+                start = time.perf_counter()
+                result = get_recommendations(
+                    q["keywords"], q["message"], limit=config["limit"], protocol=config["protocol"]
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+            input_tokens.append(sum(c["input_tokens"] for c in calls))
+            output_tokens.append(sum(c["output_tokens"] for c in calls))
+            ids = [str(p.get("id")) for p in result["products"]]
+            picks.append(ids)
+            matched += len(ids)
+            empty += not ids
+            reference = [str(r) for r in q.get("reference") or []]
+            if reference:
+                wanted = reference[: config["limit"]]
+                agreement.append(len(set(ids) & set(wanted)) / len(wanted))
+    counters = metrics.snapshot()["counters"]
+    unmatched = sum(v for k, v in counters.items() if k.startswith("recommender_unmatched_picks_total"))
+    turns = len(latencies)
+    return {
+        "config": config,
+        "turns": turns,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "input_tokens": statistics.mean(input_tokens),
+        "output_tokens": statistics.mean(output_tokens),
+        "match_failure": unmatched / (unmatched + matched) if unmatched + matched else 0.0,
+        "empty": empty / turns,
+        "agreement": statistics.mean(agreement) if agreement else None,
+        "picks": picks,
+    }
+
+
+def _objectives(row: dict) -> tuple:
+    """Smaller is better on every axis."""
+    agreement = row["agreement"] if row["agreement"] is not None else 0.0
+    return (row["p95_ms"], row["input_tokens"] + row["output_tokens"], row["match_failure"], -agreement)
+
+
+def pareto_front(rows: list[dict]) -> list[bool]:
+    """Whether each row is Pareto-optimal (not dominated by any other row)."""
+    objectives = [_objectives(r) for r in rows]
+    front = []
+    for i, mine in enumerate(objectives):
+        dominated = any(
+            all(a <= b for a, b in zip(other, mine)) and other != mine
+            for j, other in enumerate(objectives)
+            if j != i
+        )
+        front.append(not dominated)
+    return front
+
+
+def print_table(rows: list[dict]) -> None:
+    front = pareto_front(rows)
+    order = sorted(range(len(rows)), key=lambda i: (rows[i]["p95_ms"], rows[i]["input_tokens"]))
+    print(
+        f"  {'cand':>4}{'limit':>6}{'desc':>6}  {'model':<14}{'protocol':<9}"
+        f"{'p50 ms':>8}{'p95 ms':>8}{'in tok':>8}{'out tok':>8}{'fail':>7}{'empty':>7}{'agree':>7}"
+    )
+    for i in order:
+        r, c = rows[i], rows[i]["config"]
+        agree = f"{r['agreement']:.2f}" if r["agreement"] is not None else "-"
+        print(
+            f"{'*' if front[i] else ' '} {c['candidates']:>4}{c['limit']:>6}{c['description_chars']:>6}  "
+            f"{c['model']:<14}{c['protocol']:<9}{r['p50_ms']:>8.0f}{r['p95_ms']:>8.0f}"
+            f"{r['input_tokens']:>8.0f}{r['output_tokens']:>8.0f}{r['match_failure']:>7.1%}{r['empty']:>7.1%}{agree:>7}"
+        )
+    print("\n* Pareto-optimal on p95 latency, tokens, match failures and agreement")
+
+
+def sweep(args, queries: list[dict]) -> None:
+    from app.service.recommender import get_recommendations
+
+    configs = [
+        Config(candidates=c, limit=n, description_chars=d, model=m, protocol=p)
+        for c, n, d, m, p in itertools.product(
+            args.candidates, args.limits, args.description_chars, args.models, args.protocols
+        )
+    ]
+    # Fill the search cache first, so every configuration sees the same (warm) search latency
+    for q in queries:
+        get_recommendations(q["keywords"], q["message"], mode="local")
+
+    if args.record_reference:
+        reference = Config(
+            candidates=max(args.candidates),
+            limit=max(args.limits),
+            description_chars=max(args.description_chars),
+            model=args.models[0],
+            protocol=args.protocols[0],
+        )
+        row = run_config(reference, queries, 1)
+        with open(args.record_reference, "w") as f:
+            for q, ids in zip(queries, row["picks"]):
+                f.write(json.dumps({**q, "reference": ids}) + "\n")
+        print(f"Wrote {len(queries)} labelled queries to {args.record_reference} ({reference})")
+        return
+
+    rows = []
+    for n, config in enumerate(configs, 1):
+        print(f"  [{n}/{len(configs)}] {config}", file=sys.stderr, flush=True)
+        rows.append(run_config(config, queries, args.repeat))
+    labelled = sum(1 for q in queries if q.get("reference"))
+    print(f"\n{len(queries)} queries ({labelled} labelled) x {args.repeat} runs, {len(configs)} configurations\n")
+    print_table(rows)
+    if args.json:
+        front = pareto_front(rows)
+        out = [{k: v for k, v in r.items() if k != "picks"} | {"pareto": f} for r, f in zip(rows, front)]
+        args.json.write_text(json.dumps(out, indent=2))
+
+
+def main() -> None:
+    from app.service.llm_routing import get_route
+    from app.service.recommender import LLM_DESCRIPTION_CHARS, MAX_PRODUCTS_FOR_LLM, MAX_RECOMMENDATIONS, RECOMMENDER_PROTOCOL
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=Path, help="Labelled queries (JSON lines)")
+    parser.add_argument("--record-reference", type=Path, help="Write reference picks for the queries to this file")
+    parser.add_argument("--candidates", type=_ints, default=sorted({6, 10, MAX_PRODUCTS_FOR_LLM}))
+    parser.add_argument("--limits", type=_ints, default=[MAX_RECOMMENDATIONS])
+    parser.add_argument("--description-chars", type=_ints, default=sorted({0, 150, LLM_DESCRIPTION_CHARS}))
+    parser.add_argument("--models", type=_strs, default=[get_route("recommender")["model"]])
+    parser.add_argument("--protocols", type=_strs, default=[RECOMMENDER_PROTOCOL])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="Also write the rows as JSON")
+    parser.add_argument("--snapshot", type=Path, help="Serve search from a recorded snapshot directory")
+    parser.add_argument("--live-llm", action="store_true", help="Use the real LLM (search stays a stand-in)")
+    parser.add_argument("--live", action="store_true", help="Use the real LLM and search APIs")
+    parser.add_argument("--ms-per-token", type=float, default=15.0, help="Stand-in generation time per output token")
+    parser.add_argument("--ms-per-input-token", type=float, default=0.1, help="Stand-in prefill time per prompt token")
+    parser.add_argument("--model-speed", action="append", default=[], help="Stand-in slowdown, e.g. gpt-4o=2.5")
+    parser.add_argument("--garble-rate", type=float, default=0.05, help="Share of product names the stand-in paraphrases")
+    parser.add_argument("--search-delay", type=float, default=0.05, help="Stand-in search latency (seconds)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    queries = load_queries(args.queries)
+
+    if args.live:
+        sweep(args, queries)
+        return
+
+    from app.service.edible_client import EdibleAPIClient
+    from app.service.snapshot import iter_snapshot
+    from scripts.bench_recommender_protocol import stand_in_reply
+    from scripts.stub_servers import StubEdibleServer, StubLLMServer, raw_product
+
+    catalog = [raw_product(p) for p in iter_snapshot(args.snapshot)] if args.snapshot else None
+    speeds = {k: float(v) for k, v in (s.split("=", 1) for s in args.model_speed)}
+    reply = stand_in_reply(
+        args.ms_per_token, args.garble_rate, ms_per_input_token=args.ms_per_input_token, model_speed=speeds
+    )
+    with StubEdibleServer(catalog, delay=args.search_delay) as edible, StubLLMServer(reply) as llm:
+        EdibleAPIClient.BASE_URL = edible.url
+        if not args.live_llm:
+            os.environ["OPENAI_BASE_URL"] = llm.url
+            os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "sk-stand-in"
+        sweep(args, queries)
+
+
+if __name__ == "__main__":
+    main()
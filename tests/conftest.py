@@ -0,0 +1,33 @@
+"""Shared pytest fixtures."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Importing flask_app must not start background warm-up against the real catalog
+os.environ.setdefault("WARMUP_ON_START", "0")
+# Nor background refinement prefetch, which would race tests that count upstream searches
+os.environ.setdefault("PREFETCH_WORKERS", "0")
+
+
+@pytest.fixture(autouse=True)
+def _clear_catalog_cache():
+    """Each test starts with empty search, response and comparison caches, product, typeahead and pitch stores."""
+    from app.service.catalog_cache import product_index, search_cache
+    from app.service.comparison_cache import comparison_cache
+    from app.service.pitches import pitch_store
+    from app.service.response_cache import response_cache
+    from app.service.suggest import suggest_index
+
+    search_cache.clear()
+    product_index.clear()
+    response_cache.clear()
+    suggest_index.clear()
+    comparison_cache.clear()
+    pitch_store.clear()
+    yield
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Test admission control, load shedding and request caps for /api/chat."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import flask_app
+from app.service import admission, metrics
+from app.service.admission import AdmissionController, Overloaded
+
+
+def _hold(controller: AdmissionController, client: str, release: threading.Event, order: list | None = None):
+    """Start a thread that holds a slot until release is set. Returns the thread."""
+
+    def _run():
+        try:
+            with controller.admit(client):
+                if order is not None:
+                    order.append(client)
+                release.wait(5)
+        except Overloaded:
+            if order is not None:
+                order.append(f"shed:{client}")
+
+    t = threading.Thread(target=_run)
+    t.start()
+    return t
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    end = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < end:
+        time.sleep(0.005)
+
+
+def test_queue_full_and_timeout_shed_fast():
+    metrics.reset()
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.2, max_per_client=0)
+    release = threading.Event()
+    holder = _hold(controller, "a", release)
+    _wait_for(lambda: controller.stats()["inflight"] == 1)
+    order: list[str] = []
+    queued = _hold(controller, "b", threading.Event(), order)
+    _wait_for(lambda: controller.stats()["queued"] == 1)
+
+    with pytest.raises(Overloaded) as exc:
+        with controller.admit("c"):
+            pass
+    assert exc.value.reason == admission.SHED_QUEUE_FULL and exc.value.retry_after >= 1
+
+    queued.join()
+    assert order == ["shed:b"]
+    release.set()
+    holder.join()
+    counters = metrics.snapshot()["counters"]
+    assert counters["admission_shed_total{reason=queue_full}"] == 1
+    assert counters["admission_shed_total{reason=timeout}"] == 1
+    assert controller.stats() == {"inflight": 0, "queued": 0}
+
+
+def test_slots_go_round_robin_across_clients():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, queue_timeout=5, max_per_client=0)
+    order: list[str] = []
+    releases = []
+    threads = []
+    for client in ["first", "a", "a", "a", "b"]:
+        releases.append(threading.Event())
+        threads.append(_hold(controller, client, releases[-1], order))
+        _wait_for(lambda: sum(controller.stats().values()) == len(threads))
+    for release in releases:  # Every holder exits as soon as it gets its slot
+        release.set()
+    for t in threads:
+        t.join()
+    assert order == ["first", "a", "b", "a", "a"]
+
+
+def test_per_client_limit():
+    controller = AdmissionController(max_concurrent=4, max_queue=4, queue_timeout=1, max_per_client=1)
+    release = threading.Event()
+    holder = _hold(controller, "a", release)
+    _wait_for(lambda: controller.stats()["inflight"] == 1)
+    with pytest.raises(Overloaded) as exc:
+        with controller.admit("a"):
+            pass
+    assert exc.value.reason == admission.SHED_CLIENT_LIMIT
+    with controller.admit("b"):
+        pass
+    release.set()
+    holder.join()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(flask_app, "_popular_products", [{"id": str(i), "name": f"Gift {i}"} for i in range(6)])
+    return flask_app.app.test_client()
+
+
+def test_overloaded_chat_gets_503_and_shelf_stays_up(client, monkeypatch):
+    controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.1, max_per_client=0)
+    monkeypatch.setattr(admission, "chat_admission", controller)
+    release = threading.Event()
+    holder = _hold(controller, "someone", release)
+    _wait_for(lambda: controller.stats()["inflight"] == 1)
+    try:
+        start = time.perf_counter()
+        res = client.post("/api/chat", json={"message": "birthday gift"})
+        assert res.status_code == 503 and int(res.headers["Retry-After"]) >= 1
+        assert time.perf_counter() - start < 1
+        assert client.get("/api/popular").status_code == 200
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_body_and_list_caps(client, monkeypatch):
+    res = client.post("/api/chat", data="x" * (flask_app.MAX_REQUEST_BYTES + 1), content_type="application/json")
+    assert res.status_code == 413 and "too large" in res.get_json()["error"]
+    assert client.post("/api/chat", json={"message": "hi", "history": "nope"}).status_code == 400
+    # Rejected before admission, so it can't mint response-cache keys
+    res = client.post("/api/chat", json={"message": "hi", "recommendation_mode": "llm-v2"})
+    assert res.status_code == 400 and "recommendation_mode" in res.get_json()["error"]
+
+    seen = {}
+
+    def _respond(message, history, **kwargs):
+        seen.update(history=history, last_products=kwargs["last_products"])
+        return {"message": "ok", "products": []}
+
+    monkeypatch.setattr("app.service.orchestrator.respond", _respond)
+    history = [{"role": "user", "content": str(i)} for i in range(50)]
+    products = [{"id": str(i)} for i in range(50)]
+    res = client.post("/api/chat", json={"message": "hi", "history": history, "last_products": products})
+    assert res.status_code == 200
+    assert seen["history"] == history[-flask_app.CHAT_MAX_HISTORY:]
+    assert seen["last_products"] == products[:flask_app.CHAT_MAX_LAST_PRODUCTS]
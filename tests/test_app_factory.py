@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Test the app factory's init modes and the shared LLM client (local stand-ins)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import flask_app
+from app.service import llm_client, warmup
+from app.service.catalog_cache import search_cache
+from app.service.edible_client import EdibleAPIClient
+from scripts.stub_servers import StubEdibleServer
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        flask_app.create_app("eager")
+
+
+def test_lazy_app_serves_routes():
+    app = flask_app.create_app("lazy")
+    assert app.config["INIT_MODE"] == "lazy"
+    assert app.test_client().get("/metrics").status_code == 200
+
+
+def test_preload_warms_catalog_and_hooks_fork(monkeypatch):
+    monkeypatch.setenv("WARMUP_KEYWORDS", "birthday")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(flask_app, "WARMUP_ON_START", True)
+    monkeypatch.setitem(warmup._state, "status", "pending")
+    fork_hooks = []
+    monkeypatch.setattr(flask_app.os, "register_at_fork", lambda **kw: fork_hooks.append(kw))
+
+    with StubEdibleServer() as server:
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", server.url)
+        app = flask_app.create_app("preload")
+
+    assert "app.service.orchestrator" in sys.modules
+    assert search_cache.contains("birthday") and warmup.warmup_status()["ready"]
+    assert fork_hooks == [{"after_in_child": flask_app._start_warmup_scheduler_after_fork}]
+    assert app.test_client().get("/ready").status_code == 200
+
+
+def test_llm_client_is_shared_until_config_changes(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:1/v1")
+    first = llm_client._get_client()
+    assert llm_client._get_client() is first
+
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:2/v1")
+    assert llm_client._get_client() is not first
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Test that refinement turns reuse the conversation's candidate pool (local stand-ins)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_routing
+from app.service.catalog_cache import product_index, search_cache
+from app.service.edible_client import EdibleAPIClient
+from app.service.orchestrator import respond
+from app.service.sessions import sessions
+from scripts.stub_servers import StubEdibleServer, StubLLMServer
+
+
+@pytest.fixture
+def edible(monkeypatch):
+    sessions.clear()
+    with StubLLMServer() as llm, StubEdibleServer() as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", server.url)
+        llm_routing.reload_routes()
+        yield server
+
+
+def _refine(feedback: str, first: dict, conversation_id: str | None):
+    search_cache.clear()  # Count upstream calls, not cache hits
+    return respond(
+        feedback,
+        last_products=first["products"],
+        last_search_query="birthday gift under $50",
+        conversation_id=conversation_id,
+    )
+
+
+def test_something_different_needs_no_search(edible):
+    first = respond("birthday gift under $50", conversation_id="c1")
+    calls = len(edible.requests)
+
+    result = _refine("something different", first, "c1")
+
+    assert len(edible.requests) == calls
+    assert len(result["products"]) == 4
+    shown = {p["id"] for p in first["products"]}
+    assert not shown & {p["id"] for p in result["products"]}
+
+
+def test_cheaper_searches_only_unseen_expansions_and_sorts_by_price(edible):
+    first = respond("birthday gift under $50", conversation_id="c2")
+    calls = len(edible.requests)
+
+    result = _refine("cheaper", first, "c2")
+
+    # "gifts under $50" was already searched; "cheaper" is feedback, not a catalog term
+    assert [r["keyword"] for r in edible.requests[calls:]] == ["affordable"]
+    prices = [p["price"] for p in result["products"]]
+    assert prices == sorted(prices)
+    assert max(prices) < min(p["price"] for p in first["products"])
+
+
+def test_cheaper_resolves_only_products_below_the_shown_prices(edible, monkeypatch):
+    first = respond("birthday gift under $50", conversation_id="c3")
+    bound = min(p["price"] for p in first["products"])
+    resolved = []
+    get = product_index.get
+    monkeypatch.setattr(product_index, "get", lambda pid: resolved.append(get(pid)) or resolved[-1])
+
+    result = _refine("cheaper", first, "c3")
+
+    assert len(result["products"]) == 4
+    assert resolved and all(p["price"] < bound for p in resolved)  # Filtered by price first
+
+
+def test_without_conversation_id_refinement_searches_again(edible):
+    first = respond("birthday gift under $50")
+    calls = len(edible.requests)
+
+    _refine("cheaper", first, None)
+
+    assert len(edible.requests) - calls == 3  # cheaper, affordable, gifts under $50
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test the memory-mapped columnar catalog."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import catalog_store
+from app.service.catalog_cache import product_index
+from app.service.catalog_store import MappedCatalog, build_catalog, get_catalog
+from app.service.edible_client import _normalize_product
+from scripts.stub_servers import synthetic_catalog
+
+
+def _products(n: int) -> list[dict]:
+    products = [_normalize_product(p) for p in synthetic_catalog(n)]
+    for p in products:
+        p.pop("_search_score")
+    return products
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.bin"
+    build_catalog(_products(200), path)
+    monkeypatch.setenv("CATALOG_FILE", str(path))
+    monkeypatch.setattr(catalog_store, "CATALOG_RECHECK_SECONDS", 0.0)
+    catalog_store.reset_catalog()
+    yield path
+    catalog_store.reset_catalog()
+
+
+def test_round_trip(catalog_file):
+    catalog = MappedCatalog(catalog_file)
+    products = _products(200)
+    assert len(catalog) == 200
+    assert catalog.get("1042") == products[42]
+    assert catalog.get("1199") == products[199]
+    assert catalog.get("999") is None and catalog.get("1042x") is None
+
+
+def test_missing_fields_round_trip(tmp_path):
+    path = tmp_path / "c.bin"
+    build_catalog([{"id": 7, "name": "Café Box ☕", "price": None, "size_count": None}], path)
+    p = MappedCatalog(path).get(7)
+    assert p["name"] == "Café Box ☕" and p["price"] is None and p["size_count"] is None and p["occasion"] == ""
+
+
+def test_filter_reads_columns(catalog_file):
+    catalog = MappedCatalog(catalog_file)
+    rows = catalog.filter(max_price=40, occasion="birthday")
+    expected = [i for i, p in enumerate(_products(200)) if p["price"] <= 40 and p["occasion"] == "Birthday"]
+    assert rows == expected and rows
+    assert catalog.filter(occasion="no such occasion") == []
+    assert catalog.filter([expected[-1], 1, expected[0]], max_price=40, occasion="birthday") == [
+        expected[-1], expected[0]
+    ]
+
+
+def test_price_filter_uses_overlays_and_the_mapping(catalog_file, monkeypatch):
+    products = _products(200)
+    ids = [p["id"] for p in products[:20]]
+    product_index.update([{**products[5], "price": 1.0}])  # Repriced: overlay
+    built = []
+    monkeypatch.setattr(MappedCatalog, "product", lambda self, i: built.append(i))
+    cheap = product_index.filter_ids([*ids, "no-such-id"], max_price=30)
+    assert cheap == [p["id"] for i, p in enumerate(products[:20]) if i == 5 or p["price"] <= 30]
+    assert built == []  # Decided from the price column, no product dicts
+
+
+def test_atomic_swap_is_picked_up(catalog_file):
+    first = get_catalog()
+    assert len(first) == 200
+    build_catalog(_products(50), catalog_file)
+    second = get_catalog()
+    assert second is not first and len(second) == 50
+    assert first.get("1100")["id"] == "1100"  # Old mapping still readable
+    assert not list(catalog_file.parent.glob(".catalog.bin.*"))  # No temp files left
+
+
+def test_product_index_reads_through_mapped_catalog(catalog_file):
+    assert product_index.get("1010")["name"] == _products(11)[10]["name"]
+    # Products already in the file aren't copied into this worker's memory
+    assert product_index.update(_products(5)) == 0 and len(product_index) == 0
+    new = {**_products(1)[0], "id": "9999"}
+    assert product_index.update([new]) == 1 and product_index.get("9999")["id"] == "9999"
+
+
+def test_fresh_search_results_override_the_catalog_file(catalog_file):
+    repriced = {**_products(4)[3], "price": 1.0}
+    assert product_index.update([repriced]) == 0 and len(product_index) == 1
+    assert product_index.get("1003")["price"] == 1.0
+    # Back in line with the file: the overlay is dropped and the mapping serves it again
+    product_index.update(_products(4)[3:])
+    assert len(product_index) == 0 and product_index.get("1003") == _products(4)[3]
+
+
+def test_no_catalog_file(monkeypatch):
+    monkeypatch.delenv("CATALOG_FILE", raising=False)
+    catalog_store.reset_catalog()
+    assert get_catalog() is None
+    assert get_catalog(os.devnull + ".missing") is None
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Test the comparison table: factual rows built locally, LLM verdicts only (local stand-ins)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_routing
+from app.service.comparison import _fact_rows, get_comparison
+from app.service.deadline import COMPARISON_PARTIAL, Deadline
+from app.service.edible_client import _normalize_product, parse_chocolate_types
+from scripts.stub_servers import StubLLMServer, synthetic_catalog
+
+PRODUCTS = [_normalize_product(p) for p in synthetic_catalog(35)[::7][:3]]
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    with StubLLMServer() as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        llm_routing.reload_routes()
+        yield server
+
+
+def test_parse_chocolate_types():
+    assert parse_chocolate_types("Box Berry - Semi - Sprinkles,Box Berry - Milk Chocolate") == ["Milk", "Semisweet"]
+    assert parse_chocolate_types("Pineapple Daisy,Cantaloupe") == []
+    assert parse_chocolate_types("Chocolate Chip Cookie,Whiteout Cake") == []
+
+
+def test_fact_rows_from_product_fields():
+    rows = {r["attribute"]: r["values"] for r in _fact_rows(PRODUCTS)}
+    assert rows["Price"] == [f"${p['price']:.2f}" for p in PRODUCTS]
+    assert rows["Ingredients"] == [
+        "Strawberry",
+        "Pineapple Daisy, Cantaloupe, Honeydew, Grapes, Strawberry",
+        "Box Berry",
+    ]
+    assert rows["Chocolate type"] == ["Semisweet, White", "None", "Milk, Semisweet"]
+
+
+def test_llm_writes_only_intro_and_verdicts(llm):
+    result = get_comparison(["first", "second"], last_products=PRODUCTS)
+
+    table = result["comparison_table"]
+    assert [r["attribute"] for r in table] == [
+        "Price", "Occasion", "Size options", "Ingredients", "Chocolate type", "Best For",
+    ]
+    assert table[-1]["values"] == ["Best for a thoughtful surprise"] * 2
+    assert result["message"] == "Here's how these stack up."
+    body = llm.requests[-1]
+    assert "comparison_rows" not in body["instructions"]
+    assert body["max_output_tokens"] == 300
+
+
+def test_no_budget_returns_fact_rows_without_llm(llm):
+    result = get_comparison(["first", "second"], last_products=PRODUCTS, deadline=Deadline(0.5))
+    assert result["degraded"] == [COMPARISON_PARTIAL]
+    assert [r["attribute"] for r in result["comparison_table"]][-1] == "Chocolate type"
+    assert not llm.requests
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test the order-insensitive comparison cache and the precompute pass (local stand-ins)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_routing, metrics
+from app.service.catalog_cache import product_index
+from app.service.comparison import get_comparison, precompute_comparisons
+from app.service.comparison_cache import ComparisonCache, comparison_cache, comparison_key
+from app.service.edible_client import _normalize_product
+from scripts.stub_servers import StubLLMServer, synthetic_catalog
+
+PRODUCTS = [_normalize_product(p) for p in synthetic_catalog(35)[::7][:3]]
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    with StubLLMServer() as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        llm_routing.reload_routes()
+        yield server
+
+
+def test_key_ignores_order():
+    assert comparison_key(PRODUCTS) == comparison_key(PRODUCTS[::-1])
+    assert comparison_key([{"name": "No id"}]) is None
+
+
+def test_reordered_set_is_served_from_cache(llm):
+    metrics.reset()
+    first = get_comparison(["first", "second", "third"], last_products=PRODUCTS)
+    second = get_comparison(["first", "second", "third"], last_products=PRODUCTS[::-1])
+    assert len(llm.requests) == 1
+    assert second["message"] == first["message"]
+    assert [p["id"] for p in second["products"]] == [p["id"] for p in PRODUCTS[::-1]]
+    first_rows = {r["attribute"]: r["values"] for r in first["comparison_table"]}
+    second_rows = {r["attribute"]: r["values"] for r in second["comparison_table"]}
+    assert second_rows == {k: v[::-1] for k, v in first_rows.items()}
+    counters = metrics.snapshot()["counters"]
+    assert counters["comparison_cache_total{result=hit}"] == 1
+    assert counters["comparison_cache_total{result=miss}"] == 1
+
+
+def test_changed_product_invalidates_entry(llm):
+    get_comparison(["first", "second"], last_products=PRODUCTS[:2])
+    repriced = [dict(PRODUCTS[0], price=PRODUCTS[0]["price"] + 5), PRODUCTS[1]]
+    result = get_comparison(["first", "second"], last_products=repriced)
+    assert len(llm.requests) == 2
+    assert result["comparison_table"][0]["values"][0] == f"${repriced[0]['price']:.2f}"
+
+
+def test_ttl_and_capacity():
+    cache = ComparisonCache(ttl=60, max_entries=1)
+    cache.put(PRODUCTS[:2], "intro", {})
+    cache.put(PRODUCTS[1:], "intro", {})
+    assert cache.get(PRODUCTS[:2]) is None and cache.get(PRODUCTS[1:]) is not None
+    assert ComparisonCache(ttl=0).get(PRODUCTS) is None
+
+
+def test_precompute_fills_most_compared_sets(llm):
+    product_index.update(PRODUCTS)
+    pair, triple = PRODUCTS[:2], PRODUCTS
+    for _ in range(3):
+        comparison_cache.get(pair)
+    comparison_cache.get(triple)
+    assert precompute_comparisons(n=1) == 1
+    assert comparison_cache.get(pair[::-1], count=False) is not None
+    assert comparison_cache.get(triple, count=False) is None
+    assert precompute_comparisons(n=2) == 1  # The pair is still fresh
+    assert len(llm.requests) == 2
+
+    get_comparison(["first", "second", "third"], last_products=triple[::-1])
+    assert len(llm.requests) == 2
+
+
+def test_precompute_stops_at_its_budget(llm):
+    metrics.reset()
+    product_index.update(PRODUCTS)
+    comparison_cache.get(PRODUCTS[:2])
+    assert precompute_comparisons(n=1, budget=0.5) == 0  # Less than one comparison's worth
+    assert llm.requests == []
+    assert metrics.snapshot()["counters"]["comparison_precompute_total{result=out_of_budget}"] == 1
+
+
+def test_counts_decay_and_stay_bounded():
+    cache = ComparisonCache(ttl=60, max_count_keys=2)
+    for _ in range(4):
+        cache.get(PRODUCTS[:2])
+    cache.get(PRODUCTS[1:])
+    cache.decay_counts()
+    assert cache.top_sets(5) == [comparison_key(PRODUCTS[:2]).split(",")]
+
+    cache.get(PRODUCTS)
+    cache.get(PRODUCTS[::2])
+    assert len(cache._counts) <= 2 and cache.top_sets(1) == [comparison_key(PRODUCTS[:2]).split(",")]
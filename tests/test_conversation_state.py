@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Test the rolling conversation state that bounds the intent-classifier prompt."""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import intent_classifier
+from app.service.conversation_state import render_state, state_from_history, update_state
+
+LONG_REPLY = "Here are my top picks for you! " + "This gorgeous arrangement is perfect for any celebration. " * 20
+
+
+def _intent_prompt(monkeypatch, **kwargs) -> str:
+    seen = {}
+
+    def _fake(system_prompt, user_content, **kw):
+        seen["prompt"] = user_content
+        return {"intent_type": "search", "keywords": ["birthday"]}
+
+    monkeypatch.setattr(intent_classifier, "complete_json", _fake)
+    intent_classifier.get_intent("something cheaper", **kwargs)
+    return seen["prompt"]
+
+
+def test_state_tracks_slots_across_turns():
+    state = update_state(None, "gift for my girlfriend", assistant_message="What's the occasion?")
+    state = update_state(
+        state,
+        "birthday, around $50",
+        assistant_message=LONG_REPLY,
+        intent={"intent_type": "clarify", "keywords": ["birthday", "gifts under $50"]},
+        products=[{"name": f"Box {i}"} for i in range(10)],
+    )
+    assert state["recipient"] == "girlfriend"
+    assert state["occasion"] == "birthday"
+    assert state["budget"] == 50
+    assert state["shown_product_names"] == [f"Box {i}" for i in range(6)]
+    assert len(state["last_assistant_message"]) <= 200
+    text = render_state(state)
+    assert "occasion: birthday" in text and "budget: under $50" in text
+
+
+def test_intent_prompt_size_is_bounded(monkeypatch):
+    history = []
+    sizes = []
+    for turn in range(30):
+        history += [
+            {"role": "user", "content": f"birthday gift for my mom under $50, option {turn}"},
+            {"role": "assistant", "content": LONG_REPLY},
+        ]
+        state = state_from_history(history)
+        sizes.append(len(_intent_prompt(monkeypatch, conversation_history=history, conversation_state=state)))
+
+    assert max(sizes) <= 1200
+    assert max(sizes[4:]) - min(sizes[4:]) < 50  # Flat once the summary window is full
+
+    raw = _intent_prompt(monkeypatch, conversation_history=history)
+    assert len(raw) > 2 * max(sizes)  # Raw transcript of 6 long messages is much bigger
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Test deadline propagation and graceful degradation in respond() (local stand-ins)."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_routing
+from app.service.comparison import get_comparison
+from app.service.deadline import Deadline
+from app.service.edible_client import EdibleAPIClient
+from app.service.orchestrator import respond
+from app.service.recommender import get_recommendations
+from scripts.stub_servers import StubEdibleServer, StubLLMServer, canned_reply
+
+SLOW_FLOWS: dict[str, float] = {}
+
+
+def _reply(body: dict):
+    """canned_reply, sleeping first for flows listed in SLOW_FLOWS (matched on the system prompt)."""
+    for marker, delay in SLOW_FLOWS.items():
+        if marker in (body.get("instructions") or ""):
+            time.sleep(delay)
+    return canned_reply(body)
+
+
+@pytest.fixture(autouse=True)
+def stubs(monkeypatch):
+    SLOW_FLOWS.clear()
+    with StubLLMServer(_reply) as llm, StubEdibleServer() as edible:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+        yield llm, edible
+
+
+def test_no_degradation_with_ample_budget():
+    result = respond("birthday gift under $50", deadline=Deadline(10))
+    assert result["degraded"] == []
+    assert len(result["products"]) == 4
+
+
+def test_slow_recommender_falls_back_to_search_ranked_products():
+    SLOW_FLOWS["that best match their request"] = 3.0
+    start = time.perf_counter()
+    result = respond("birthday gift under $50", deadline=Deadline(2.5))
+    assert time.perf_counter() - start < 2.8
+    assert result["degraded"] == ["recommender_skipped"]
+    assert len(result["products"]) == 4
+    assert all(p["recommendation"] for p in result["products"])
+    assert all("_search_score" not in p for p in result["products"])
+
+
+def test_short_budget_uses_followup_template():
+    SLOW_FLOWS["intent classifier"] = 0.6
+    result = respond("I need a gift", deadline=Deadline(1.2))
+    assert result["degraded"] == ["followup_template"]
+    assert result["message"] == "What's the occasion? And do you have a budget in mind?"
+
+
+def test_intent_timeout_asks_the_template_question():
+    SLOW_FLOWS["intent classifier"] = 3.0
+    start = time.perf_counter()
+    result = respond("birthday gift under $50", deadline=Deadline(1.0))
+    assert time.perf_counter() - start < 2.0
+    assert result["degraded"] == ["intent_timeout"] and result["products"] == []
+    assert result["message"] == "What's the occasion? And do you have a budget in mind?"
+
+
+def test_slow_comparison_returns_partial_table():
+    SLOW_FLOWS["comparing 2-3 products"] = 3.0
+    shown = [
+        {"id": "1", "name": "Happy Birthday Box", "price": 56.99, "occasion": "Birthday",
+         "ingredients": "Strawberry - Semisweet", "size_count": 1},
+        {"id": "2", "name": "Berry Birthday Box", "price": 44.0, "occasion": "Birthday",
+         "ingredients": "Box Berry - White Chocolate", "size_count": 2},
+    ]
+    result = respond(
+        "compare the first two",
+        last_products=shown,
+        last_search_query="birthday",
+        deadline=Deadline(2.5),
+    )
+    assert result["degraded"] == ["comparison_partial"]
+    rows = {r["attribute"]: r["values"] for r in result["comparison_table"]}
+    assert rows["Price"] == ["$56.99", "$44.00"]
+
+
+def _expired() -> Deadline:
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    return deadline
+
+
+def test_expired_deadline_skips_search_instead_of_failing(stubs):
+    _, edible = stubs
+    assert EdibleAPIClient().search_multiple(["birthday"], deadline=_expired()) == {
+        "products": [], "searched": [], "truncated": True,
+    }
+    result = get_recommendations(["birthday"], "birthday gift", deadline=_expired())
+    assert result["degraded"] == ["search_truncated"] and result["products"] == []
+    result = get_comparison(["Happy Birthday Box", "Berry Bouquet"], deadline=_expired())
+    assert result["degraded"] == ["search_truncated"] and result["comparison_table"] is None
+    assert edible.requests == []
+
+
+def test_search_timeout_truncates(stubs):
+    _, edible = stubs
+    edible.delay = 1.0
+    result = EdibleAPIClient().search_multiple(["birthday", "anniversary"], deadline=Deadline(0.8))
+    assert result == {"products": [], "searched": [], "truncated": True}
+    assert [r["keyword"] for r in edible.requests] == ["birthday"]
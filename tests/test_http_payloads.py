@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Test response compression, slim product cards and HTTP caching (local stand-ins)."""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import flask_app
+from app.service import llm_routing
+from app.service.edible_client import EdibleAPIClient
+from app.service.sessions import sessions
+from scripts.stub_servers import StubEdibleServer, StubLLMServer
+
+POPULAR = [
+    {"id": str(i), "name": f"Gift {i}", "price": 30 + i, "url": "u", "image_url": "i", "description": "d" * 400}
+    for i in range(6)
+]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "popular.json"
+    path.write_text(json.dumps({"products": POPULAR}))
+    monkeypatch.setattr(flask_app, "POPULAR_PRODUCTS_PATH", path)
+    monkeypatch.setattr(flask_app, "_popular_products", None)
+    sessions.clear()
+    with StubLLMServer() as llm, StubEdibleServer() as edible:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+        yield flask_app.app.test_client()
+
+
+def test_chat_returns_card_fields_and_details_on_demand(client):
+    res = client.post("/api/chat", json={"message": "birthday gift under $50"})
+    products = res.get_json()["products"]
+    assert products and set(products[0]) <= set(flask_app.CARD_FIELDS)
+    assert "recommendation" in products[0]
+
+    detail = client.get(f"/api/products/{products[0]['id']}").get_json()["product"]
+    assert detail["description"] and detail["ingredients"]
+    assert client.get("/api/products/nope").status_code == 404
+
+    full = client.post("/api/chat", json={"message": "birthday gift under $50", "view": "full"})
+    assert "description" in full.get_json()["products"][0]
+
+
+def test_compare_hydrates_card_only_products(client):
+    first = client.post("/api/chat", json={"message": "birthday gift under $50"}).get_json()
+    res = client.post("/api/chat", json={
+        "message": "compare the first two",
+        "last_products": first["products"],
+        "last_search_query": "birthday gift under $50",
+    })
+    rows = {r["attribute"]: r["values"] for r in res.get_json()["comparison_table"]}
+    assert "N/A" not in rows["Ingredients"] and "N/A" not in rows["Occasion"]
+
+
+def test_gzip_negotiated(client):
+    res = client.post("/api/chat", json={"message": "birthday gift under $50"}, headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip" and "Accept-Encoding" in res.headers["Vary"]
+    assert json.loads(gzip.decompress(res.data))["products"]
+
+    plain = client.post("/api/chat", json={"message": "birthday gift under $50"})
+    assert "Content-Encoding" not in plain.headers and plain.get_json()["products"]
+    small = client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers or len(small.get_data()) >= flask_app.COMPRESS_MIN_BYTES
+
+
+def test_popular_etag_and_cache_control(client):
+    res = client.get("/api/popular")
+    assert [p["id"] for p in res.get_json()["products"]] == ["3", "4", "5"]
+    assert "description" not in res.get_json()["products"][0]
+    assert res.cache_control.public and res.cache_control.max_age == flask_app.POPULAR_MAX_AGE
+    etag = res.headers["ETag"]
+
+    again = client.get("/api/popular", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+    assert again.status_code == 304 and not again.data
+    assert client.get("/api/products/4").get_json()["product"]["description"] == "d" * 400
+
+
+def test_static_files_cacheable(client):
+    res = client.get("/static/edible-logo.webp")
+    assert res.cache_control.max_age == flask_app.STATIC_MAX_AGE and res.headers.get("ETag")
+    res.close()
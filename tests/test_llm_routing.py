@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test per-call-site LLM routing against the local stand-in LLM server."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_client, llm_routing, metrics, usage
+from scripts.stub_servers import StubLLMServer
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    with StubLLMServer(delays={"slow-model": 2.0}) as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        yield server
+    llm_routing.reload_routes()
+
+
+def test_env_and_json_overrides(tmp_path):
+    cfg = tmp_path / "routing.json"
+    cfg.write_text(json.dumps({"greeting": {"model": "file-model", "timeout": 3}, "newsite": {"model": "x"}}))
+    routes = llm_routing.load_routes({
+        "LLM_ROUTING_FILE": str(cfg),
+        "LLM_ROUTING": json.dumps({"greeting": {"max_output_tokens": 64}}),
+        "LLM_GREETING_FALLBACK_MODEL": "fast-model",
+        "LLM_RECOMMENDER_MAX_OUTPUT_TOKENS": "none",
+    })
+    assert routes["greeting"]["model"] == "file-model"
+    assert routes["greeting"]["timeout"] == 3.0
+    assert routes["greeting"]["max_output_tokens"] == 64
+    assert routes["greeting"]["fallback_model"] == "fast-model"
+    assert routes["recommender"]["max_output_tokens"] is None
+    assert routes["newsite"]["model"] == "x"
+    assert routes["intent"] == llm_routing.DEFAULT_ROUTES["intent"]
+
+    with pytest.raises(ValueError):
+        llm_routing.load_routes({"LLM_ROUTING": json.dumps({"intent": {"temperature": 1}})})
+
+
+def test_route_sets_model_and_output_cap(llm, monkeypatch):
+    monkeypatch.setenv("LLM_GREETING_MODEL", "tiny-model")
+    monkeypatch.setenv("LLM_GREETING_MAX_OUTPUT_TOKENS", "50")
+    llm_routing.reload_routes()
+
+    text = llm_client.complete("You are friendly.", "hi", call_site="greeting")
+
+    assert text
+    assert llm.requests[-1]["model"] == "tiny-model"
+    assert llm.requests[-1]["max_output_tokens"] == 50
+
+
+def test_fast_tier_fallback_when_primary_exceeds_budget(llm, monkeypatch):
+    metrics.reset()
+    monkeypatch.setenv("LLM_RECOMMENDER_MODEL", "slow-model")
+    monkeypatch.setenv("LLM_RECOMMENDER_TIMEOUT", "0.3")
+    monkeypatch.setenv("LLM_RECOMMENDER_FALLBACK_MODEL", "fast-model")
+    llm_routing.reload_routes()
+
+    start = time.perf_counter()
+    with usage.track_request() as calls:
+        data = llm_client.complete_json(
+            "Pick 4 that best match", "- Berry Box | $40", call_site="recommender"
+        )
+    elapsed = time.perf_counter() - start
+
+    assert data["recommendations"][0]["product_name"] == "Berry Box"
+    assert elapsed < 1.5  # Did not wait for the slow primary
+    assert [r["model"] for r in llm.requests] == ["slow-model", "fast-model"]
+    assert calls[0]["model"] == "fast-model"
+    counters = metrics.snapshot()["counters"]
+    assert counters["llm_timeouts_total{call_site=recommender,model=slow-model}"] == 1
+    assert counters["llm_fallbacks_total{call_site=recommender,model=fast-model}"] == 1
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test the LLM-free recommendation mode (local ranking + templates)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_client
+from app.service.edible_client import EdibleAPIClient
+from app.service.local_ranker import extract_budget, extract_occasion, rank_products
+from app.service.recommender import MODE_LOCAL, get_recommendations, template_blurb
+from scripts.stub_servers import StubEdibleServer
+
+
+def _p(pid, price, score, occasion="Birthday", category="All Products,Fruit Arrangements"):
+    return {"id": pid, "name": f"P{pid}", "price": price, "_search_score": score,
+            "occasion": occasion, "category": category}
+
+
+def test_extractors():
+    assert extract_budget("birthday gift under $50") == 50
+    assert extract_budget("around 40 dollars") == 40
+    assert extract_budget("something sweet") is None
+    assert extract_occasion("Gift for Mothers Day") == "mother's day"
+    assert extract_occasion("happy BIRTHDAY") == "birthday"
+
+
+def test_rank_prefers_budget_occasion_and_diversity():
+    products = [
+        _p("1", 120.0, 10.0),
+        _p("2", 45.0, 9.0),
+        _p("3", 40.0, 8.5),
+        _p("4", 35.0, 8.0, category="All Products,Bakery"),
+        _p("5", 30.0, 9.5, occasion="Sympathy", category="All Products,Bakery"),
+    ]
+    picks = [p["id"] for p in rank_products(products, budget=50, occasion="birthday", limit=3)]
+    assert picks[0] == "2"  # Top in-budget birthday match
+    assert "1" not in picks  # Way over budget
+    assert "4" in picks  # Pulled up by category diversity over "3"
+
+
+def test_template_blurb_uses_product_fields():
+    blurb = template_blurb({
+        "price": 56.99, "occasion": "Birthday",
+        "ingredients": "Box Berry - Semi - Sprinkles,Box Berry - White Chocolate,Pineapple Cake - White Chocolate",
+    })
+    assert blurb == "A birthday favorite featuring box berry and pineapple cake, at $56.99."
+
+
+def test_local_mode_never_calls_llm(monkeypatch):
+    def _fail(*args, **kwargs):
+        raise AssertionError("LLM called in local mode")
+
+    monkeypatch.setattr(llm_client, "_get_client", _fail)
+    with StubEdibleServer() as edible:
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        result = get_recommendations(["birthday", "gifts under $50"], "birthday gift under $50", mode=MODE_LOCAL)
+
+    assert result["message"] == "Here are 4 Birthday gift ideas under $50:"
+    assert len(result["products"]) == 4
+    assert all(p["recommendation"] for p in result["products"])
+    assert all("_search_score" not in p for p in result["products"])
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        get_recommendations(["birthday"], "birthday", mode="bogus")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Test the offline pitch job and the recommender's pitched protocol (local stand-ins)."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_routing
+from app.service.edible_client import EdibleAPIClient, _normalize_product
+from app.service.pitches import generate_pitches, pitch_store, read_pitches
+from app.service.recommender import PROTOCOL_INDEXED, PROTOCOL_PITCHED, get_recommendations
+from scripts.stub_servers import StubEdibleServer, StubLLMServer, canned_reply, synthetic_catalog
+
+CATALOG = [_normalize_product(p) for p in synthetic_catalog()]
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    servers = []
+
+    def _serve(reply=canned_reply):
+        llm, edible = StubLLMServer(reply=reply).start(), StubEdibleServer().start()
+        servers.extend([llm, edible])
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+        return llm
+
+    yield _serve
+    for server in servers:
+        server.stop()
+
+
+def _input(body: dict) -> str:
+    prompt = body["input"]
+    return prompt if isinstance(prompt, str) else json.dumps(prompt)
+
+
+def test_failed_batches_are_retried_on_the_next_run(serve, tmp_path):
+    calls = []
+
+    def _flaky(body: dict) -> str:
+        calls.append(body)
+        return "not json" if len(calls) == 1 else canned_reply(body)
+
+    llm = serve(_flaky)
+    path = tmp_path / "pitches.jsonl"
+    first = generate_pitches(CATALOG[:12], path, batch_size=5, concurrency=1)
+    assert first == {"products": 12, "skipped": 0, "written": 7, "failed": 5}
+
+    second = generate_pitches(CATALOG[:12], path, batch_size=5, concurrency=1)
+    assert second == {"products": 12, "skipped": 7, "written": 5, "failed": 0}
+    assert len(llm.requests) == 4 and llm.requests[-1]["max_output_tokens"] == 2000
+    assert len(path.read_text().splitlines()) == 12  # Compacted
+    pitch = read_pitches(path)[CATALOG[0]["id"]]
+    assert pitch["occasions"] == ["birthday"] and pitch["summary"]
+
+
+def test_changed_product_gets_a_new_pitch(serve, tmp_path, monkeypatch):
+    serve()
+    path = tmp_path / "pitches.jsonl"
+    generate_pitches(CATALOG[:3], path)
+    monkeypatch.setenv("PITCH_FILE", str(path))
+    assert pitch_store.get(CATALOG[0])["pitch"].startswith(CATALOG[0]["name"])
+
+    changed = [dict(CATALOG[0], description="Now with pineapple."), *CATALOG[1:3]]
+    assert pitch_store.get(changed[0]) is None  # Stale pitch is not served
+    assert generate_pitches(changed, path)["written"] == 1
+
+
+def test_pitched_protocol_sends_summaries_and_uses_stored_blurbs(serve, tmp_path, monkeypatch):
+    llm = serve()
+    path = tmp_path / "pitches.jsonl"
+    generate_pitches(CATALOG, path, batch_size=20)
+    monkeypatch.setenv("PITCH_FILE", str(path))
+    pitches = read_pitches(path)
+
+    indexed = get_recommendations(["birthday"], "birthday gift for my sister", protocol=PROTOCOL_INDEXED)
+    pitched = get_recommendations(["birthday"], "birthday gift for my sister", protocol=PROTOCOL_PITCHED)
+    indexed_body, pitched_body = llm.requests[-2], llm.requests[-1]
+
+    assert [p["id"] for p in pitched["products"]] == [p["id"] for p in indexed["products"]]
+    assert [p["recommendation"] for p in pitched["products"]] == [pitches[p["id"]]["pitch"] for p in pitched["products"]]
+    assert "for friend, family" in _input(pitched_body)
+    assert len(_input(pitched_body)) < len(_input(indexed_body)) / 2
+
+
+def test_pitched_protocol_without_pitches_falls_back_to_indexed(serve):
+    llm = serve()
+    result = get_recommendations(["birthday"], "birthday gift", protocol=PROTOCOL_PITCHED)
+    assert len(result["products"]) == 4 and all(p["recommendation"] for p in result["products"])
+    assert '"why"' in llm.requests[-1]["instructions"]
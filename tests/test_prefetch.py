@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test background prefetch of refinement searches after a search turn (local stand-ins)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_routing, metrics, orchestrator
+from app.service.admission import chat_admission
+from app.service.catalog_cache import search_cache
+from app.service.edible_client import EdibleAPIClient
+from app.service.orchestrator import respond
+from app.service.prefetch import RefinementPrefetcher, refinement_keywords
+from app.service.sessions import sessions
+from scripts.stub_servers import StubEdibleServer, StubLLMServer
+
+
+@pytest.fixture
+def prefetcher():
+    prefetcher = RefinementPrefetcher(workers=2, max_per_session=2)
+    yield prefetcher
+    prefetcher.shutdown()
+
+
+def _searched(server, since: int = 0) -> list[str]:
+    return [r["keyword"] for r in server.requests[since:]]
+
+
+def test_search_turn_warms_refinement_searches(prefetcher, monkeypatch):
+    sessions.clear()
+    prefetcher.max_per_session = 8
+    monkeypatch.setattr(orchestrator, "refinement_prefetcher", prefetcher)
+    with StubLLMServer() as llm, StubEdibleServer() as edible:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+
+        first = respond("birthday gift under $50", conversation_id="p1")
+        assert prefetcher.wait(timeout=5)
+        pool_keywords = set(sessions.get("p1")["candidate_pool"]["keywords"])
+        prefetched = set(_searched(edible)) - pool_keywords
+        assert {"affordable", "luxury", "premium", "kids"} <= prefetched
+        assert "gifts under $50" in pool_keywords  # Searched by the turn itself, not again
+
+        calls = len(edible.requests)
+        result = respond(
+            "fancier",
+            last_products=first["products"],
+            last_search_query="birthday gift under $50",
+            conversation_id="p1",
+        )
+        assert len(edible.requests) == calls  # luxury and premium come from the cache
+        assert len(result["products"]) == 4
+
+
+def test_turn_without_conversation_id_is_not_prefetched(prefetcher, monkeypatch):
+    monkeypatch.setattr(orchestrator, "refinement_prefetcher", prefetcher)
+    scheduled = []
+    monkeypatch.setattr(prefetcher, "schedule", lambda *a, **kw: scheduled.append(a) or [])
+    with StubLLMServer() as llm, StubEdibleServer() as edible:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+
+        assert respond("anniversary gift under $75")["products"]
+    assert scheduled == []  # No session to hold its share
+
+
+def test_session_cap_in_flight_and_cached_keywords(prefetcher, monkeypatch):
+    metrics.reset()
+    with StubEdibleServer(delay=0.2) as edible:
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        search_cache.put("luxury", [])
+
+        first = prefetcher.schedule("s1", exclude=["affordable"])
+        assert first == ["gifts under $50", "birthday"]
+        assert prefetcher.schedule("s1") == []  # At its share
+        second = prefetcher.schedule("s2")
+        assert second == ["affordable", "fun"]
+        assert prefetcher.wait(timeout=5)
+
+        assert sorted(_searched(edible)) == sorted(first + second)
+        counters = metrics.snapshot()["counters"]
+        assert counters["prefetch_searches_total{result=ok}"] == 4
+        assert counters["prefetch_skipped_total{reason=session_cap}"] > 0
+        assert counters["prefetch_skipped_total{reason=in_flight}"] == 4  # s1 again, then s2
+        assert counters["prefetch_skipped_total{reason=cached}"] == 3  # luxury, on every call
+        assert prefetcher.stats() == {"pending": 0, "sessions": 0}
+
+
+def test_busy_or_disabled_queues_nothing(prefetcher, monkeypatch):
+    monkeypatch.setattr(chat_admission, "stats", lambda: {"inflight": 32, "queued": 3})
+    assert prefetcher.schedule("s1") == []
+    assert RefinementPrefetcher(workers=0).schedule("s1") == []
+    assert len(refinement_keywords()) == len(set(refinement_keywords()))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test opt-in request profiling (local stand-ins)."""
+
+import pstats
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import flask_app
+from app.service import llm_routing, profiling
+from app.service.edible_client import EdibleAPIClient
+from scripts.stub_servers import StubEdibleServer, StubLLMServer
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    return tmp_path
+
+
+def _slow(n: int) -> int:
+    time.sleep(0.05)
+    return sum(i * i for i in range(n))
+
+
+def test_profile_call_writes_pstats_and_summary(profile_dir):
+    result, info = profiling.profile_call(_slow, 10_000, label="unit")
+
+    assert result == sum(i * i for i in range(10_000))
+    assert info["wall_ms"] >= 50 and info["cpu_ms"] < info["wall_ms"]
+    assert any("sleep" in row["function"] for row in info["top"])  # Blocked time shows up
+    assert pstats.Stats(str(profile_dir / info["file"])).total_calls > 0
+    assert profiling.list_profiles() == [info]
+
+
+def test_old_profiles_pruned(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_KEEP", 2)
+    for _ in range(4):
+        profiling.profile_call(_slow, 10)
+    assert len(list(profile_dir.glob("*.pstats"))) == 2 and len(profiling.list_profiles()) == 2
+
+
+def test_chat_profile_flag_requires_server_setting(profile_dir, monkeypatch):
+    client = flask_app.app.test_client()
+    assert client.get("/api/profiles").status_code == 404
+
+    with StubLLMServer() as llm, StubEdibleServer() as edible:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+
+        res = client.post("/api/chat", json={"message": "hi", "profile": True})
+        assert "profile_id" not in res.get_json() and not list(profile_dir.iterdir())
+
+        monkeypatch.setattr(flask_app, "PROFILING_ENABLED", True)
+        res = client.post("/api/chat", json={"message": "birthday gift under $50", "profile": "wall"})
+        profile_id = res.get_json()["profile_id"]
+
+    listed = client.get("/api/profiles").get_json()["profiles"]
+    assert [p["id"] for p in listed] == [profile_id]
+    assert listed[0]["label"] == "/api/chat"
+    assert any("post" in row["function"] or "recv" in row["function"] for row in listed[0]["top"])
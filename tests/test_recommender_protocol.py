@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Test the recommender's indexed (numbered candidates) and name-matching protocols (local stand-ins)."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_routing, metrics, recommender
+from app.service.edible_client import EdibleAPIClient
+from app.service.recommender import PROTOCOL_INDEXED, PROTOCOL_NAMES, get_recommendations
+from scripts.stub_servers import StubEdibleServer, StubLLMServer, canned_reply
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    servers = []
+
+    def _serve(reply=canned_reply):
+        llm, edible = StubLLMServer(reply=reply).start(), StubEdibleServer().start()
+        servers.extend([llm, edible])
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+        return llm
+
+    yield _serve
+    for server in servers:
+        server.stop()
+
+
+def test_indexed_picks_map_by_number(serve):
+    llm = serve(lambda body: {
+        "intro_message": "Hi!",
+        "picks": [{"i": 2, "why": "Second."}, {"i": 1, "why": "First."}],
+        "fallback_message": None,
+    })
+    result = get_recommendations(["birthday"], "birthday gift", protocol=PROTOCOL_INDEXED)
+
+    prompt = llm.requests[0]["input"]
+    prompt = prompt if isinstance(prompt, str) else json.dumps(prompt)
+    assert "[1] " in prompt and "[2] " in prompt
+    assert [p["recommendation"] for p in result["products"]] == ["Second.", "First."]
+    assert result["products"][0]["name"] in prompt.split("[2] ", 1)[1].split(" | $", 1)[0]
+
+
+def test_invalid_numbers_are_counted_and_dropped(serve):
+    metrics.reset()
+    serve(lambda body: {
+        "intro_message": "Hi!",
+        "picks": [{"i": 99, "why": "?"}, {"i": "x", "why": "?"}, {"i": 1, "why": "Ok."}, {"i": 1, "why": "Dup."}],
+    })
+    result = get_recommendations(["birthday"], "birthday gift", protocol=PROTOCOL_INDEXED)
+
+    assert [p["recommendation"] for p in result["products"]] == ["Ok."]
+    assert metrics.snapshot()["counters"]["recommender_unmatched_picks_total{protocol=indexed}"] == 2
+
+
+def test_names_protocol_still_matches(serve):
+    llm = serve()
+    result = get_recommendations(["birthday"], "birthday gift", protocol=PROTOCOL_NAMES)
+
+    assert len(result["products"]) == 4
+    assert '"recommendations"' in llm.requests[0]["instructions"]
+
+
+def test_unknown_protocol():
+    with pytest.raises(ValueError):
+        get_recommendations(["birthday"], "birthday gift", protocol="guess")
+
+
+def test_limit_and_description_length_shape_the_prompt(serve, monkeypatch):
+    llm = serve()
+    monkeypatch.setattr(recommender, "MAX_PRODUCTS_FOR_LLM", 5)
+    monkeypatch.setattr(recommender, "LLM_DESCRIPTION_CHARS", 0)
+    result = get_recommendations(["birthday"], "birthday gift", limit=2)
+
+    prompt = llm.requests[0]["input"]
+    assert "the 2 BEST" in prompt and "[5] " in prompt and "[6] " not in prompt
+    assert "made with fresh fruit" not in prompt
+    assert len(result["products"]) == 2
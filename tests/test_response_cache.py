@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Test the first-turn response cache (local stand-ins)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_routing
+from app.service.catalog_cache import product_index
+from app.service.edible_client import EdibleAPIClient
+from app.service.orchestrator import respond
+from app.service.response_cache import ResponseCache, normalize_message
+from app.service.sessions import sessions
+from scripts.stub_servers import StubEdibleServer, StubLLMServer, canned_reply
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    sessions.clear()
+    with StubLLMServer() as llm, StubEdibleServer() as edible:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+        yield llm, edible
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["Birthday gift under $50!", "birthday  gift, under 50 dollars", "BIRTHDAY GIFT UNDER $ 50.00"],
+)
+def test_normalize_message(message):
+    assert normalize_message(message) == "birthday gift under $50"
+
+
+def test_normalize_keeps_meaningful_differences():
+    assert normalize_message("gift under $50") != normalize_message("gift under $500")
+    assert normalize_message("Mother's Day gift.") == "mothers day gift"
+    assert normalize_message("a $12.50 treat") == "a $12.50 treat"
+
+
+def test_equivalent_first_turn_served_from_memory(stubs):
+    llm, edible = stubs
+    first = respond("Birthday gift under $50!")
+    calls = (len(llm.requests), len(edible.requests))
+
+    second = respond("birthday gift under 50 dollars", conversation_id="c1")
+
+    assert (len(llm.requests), len(edible.requests)) == calls
+    assert second["products"] == first["products"] and second["message"] == first["message"]
+    second["products"].clear()  # Callers get copies
+    assert respond("birthday gift under $50")["products"] == first["products"]
+
+
+def test_cached_search_turn_still_seeds_candidate_pool(stubs):
+    respond("birthday gift under $50", conversation_id="c1")
+    respond("birthday gift under $50", conversation_id="c2")
+    assert sessions.peek("c2")["candidate_pool"] == sessions.peek("c1")["candidate_pool"]
+    assert sessions.peek("c2")["conversation_state"]["turns"] == 1
+
+
+def test_turns_with_context_are_not_cached(stubs):
+    llm, _ = stubs
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "Hello!"}]
+    respond("birthday gift under $50", history)
+    calls = len(llm.requests)
+    respond("birthday gift under $50", history)
+    assert len(llm.requests) > calls
+
+
+def test_error_fallbacks_are_not_cached(monkeypatch):
+    def reply(body: dict):
+        if "that best match their request" in (body.get("instructions") or ""):
+            return "not json"
+        return canned_reply(body)
+
+    with StubLLMServer(reply) as llm, StubEdibleServer() as edible:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", llm.url)
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+        llm_routing.reload_routes()
+        first = respond("birthday gift under $50")
+        assert first["products"] == [] and first["error"]
+        calls = len(llm.requests)
+        respond("birthday gift under $50")
+        assert len(llm.requests) > calls
+
+
+def test_changed_price_drops_cached_answer(stubs):
+    llm, _ = stubs
+    first = respond("birthday gift under $50")
+    product = dict(first["products"][0], price=first["products"][0]["price"] + 5)
+    product_index.update([product])
+    calls = len(llm.requests)
+
+    respond("birthday gift under $50")
+
+    assert len(llm.requests) > calls
+
+
+def test_variants_fill_before_serving():
+    cache = ResponseCache(ttl=60, max_variants=2)
+    cache.put("hi", {"result": {"message": "a"}})
+    assert cache.get("hi") is None
+    cache.put("hi", {"result": {"message": "b"}})
+    cache.put("hi", {"result": {"message": "c"}})  # Oldest variant dropped
+    assert {cache.get("hi")["result"]["message"] for _ in range(30)} == {"b", "c"}
+
+
+def test_expired_and_disabled():
+    cache = ResponseCache(ttl=0.01)
+    cache.put("hi", {"result": {}})
+    assert cache.get("hi") is not None
+    import time
+
+    time.sleep(0.02)
+    assert cache.get("hi") is None
+    off = ResponseCache(ttl=0)
+    off.put("hi", {"result": {}})
+    assert off.get("hi") is None and len(off) == 0
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Test the catalog snapshot crawler and its incremental rewrites (local search stand-in)."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service.catalog_store import MappedCatalog, build_catalog
+from app.service.edible_client import EdibleAPIClient
+from app.service.snapshot import SnapshotWriter, crawl, iter_snapshot, load_manifest
+from scripts.stub_servers import StubEdibleServer, search_catalog, synthetic_catalog
+
+KEYWORDS = ["birthday", "anniversary", "chocolate strawberries", "fruit bouquet", "birthday"]
+
+
+@pytest.fixture
+def edible(monkeypatch):
+    with StubEdibleServer(synthetic_catalog(80)) as server:
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", server.url)
+        yield server
+
+
+def _snapshot(directory: Path, keywords=KEYWORDS, **kwargs):
+    writer = SnapshotWriter(directory)
+    result = crawl(keywords, writer, rate=0, **kwargs)
+    return result, writer.finish(keywords=result["searched"], keywords_failed=result["failed"])
+
+
+def test_crawl_dedupes_and_writes_manifest(edible, tmp_path):
+    result, manifest = _snapshot(tmp_path)
+    expected = {p["id"] for kw in set(KEYWORDS) for p in search_catalog(edible.catalog, kw)}
+
+    assert result == {"searched": 4, "failed": []}
+    assert manifest["products"] == manifest["added"] == len(expected)
+    assert sum(s["count"] for s in manifest["shards"]) == len(expected)
+    products = list(iter_snapshot(tmp_path))
+    assert {p["id"] for p in products} == expected and len(products) == len(expected)
+    assert "_search_score" not in products[0]
+    assert not list(tmp_path.glob(".staging-*"))
+
+    build_catalog(iter_snapshot(tmp_path), tmp_path / "catalog.bin")  # Streamed into the catalog file builder
+    catalog = MappedCatalog(tmp_path / "catalog.bin")
+    assert len(catalog) == len(expected) and catalog.get(products[0]["id"]) == products[0]
+
+
+def test_corrupt_shard_leaves_catalog_file_untouched(edible, tmp_path):
+    _snapshot(tmp_path)
+    build_catalog(iter_snapshot(tmp_path), tmp_path / "catalog.bin")
+    before = (tmp_path / "catalog.bin").read_bytes()
+    shard = tmp_path / load_manifest(tmp_path)["shards"][-1]["file"]
+    shard.write_text(shard.read_text() + "\n")
+
+    with pytest.raises(ValueError):
+        build_catalog(iter_snapshot(tmp_path), tmp_path / "catalog.bin")
+    assert (tmp_path / "catalog.bin").read_bytes() == before
+    assert not list(tmp_path.glob(".catalog.bin.*"))
+
+
+def test_rerun_rewrites_only_changed_shards(edible, tmp_path):
+    _, first = _snapshot(tmp_path)
+    mtimes = {s["file"]: (tmp_path / s["file"]).stat().st_mtime_ns for s in first["shards"]}
+
+    _, same = _snapshot(tmp_path)
+    assert (same["added"], same["changed"], same["removed"], same["shards_rewritten"]) == (0, 0, 0, 0)
+    assert same["sha256"] == first["sha256"]
+
+    product = next(p for p in iter_snapshot(tmp_path))
+    raw = next(r for r in edible.catalog if r["id"] == product["id"])
+    raw["minPrice"] += 1
+    time.sleep(0.01)
+    _, changed = _snapshot(tmp_path)
+    assert (changed["changed"], changed["shards_rewritten"]) == (1, 1)
+    rewritten = [s["file"] for s in changed["shards"] if (tmp_path / s["file"]).stat().st_mtime_ns != mtimes[s["file"]]]
+    assert len(rewritten) == 1
+
+
+def test_failed_keyword_carries_products_over(edible, tmp_path, monkeypatch):
+    _snapshot(tmp_path)
+    before = load_manifest(tmp_path)["products"]
+    monkeypatch.setattr(EdibleAPIClient, "BASE_URL", "http://127.0.0.1:9/api/search/")
+    result, manifest = _snapshot(tmp_path, ["birthday"], retries=0)
+    assert result["failed"] == ["birthday"]
+    assert manifest["products"] == manifest["carried_over"] == before and manifest["removed"] == 0
+
+    # A clean crawl of fewer keywords drops what it no longer sees
+    monkeypatch.setattr(EdibleAPIClient, "BASE_URL", edible.url)
+    _, manifest = _snapshot(tmp_path, ["birthday"])
+    assert manifest["removed"] > 0 and manifest["products"] == before - manifest["removed"]
+
+
+def test_expand_and_rate_limit(edible, tmp_path):
+    writer = SnapshotWriter(tmp_path)
+    start = time.perf_counter()
+    result = crawl(["birthday"], writer, expand=True, max_keywords=6, rate=20, concurrency=4)
+    assert result["searched"] == 6
+    assert time.perf_counter() - start >= 5 / 20
+    writer.finish(keywords=result["searched"], keywords_failed=result["failed"])
+    searched = [r["keyword"] for r in edible.requests]
+    assert len(searched) == 6 and searched[0] == "birthday"
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Test the typeahead prefix index and /api/suggest."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import flask_app
+from app.service import catalog_store
+from app.service.catalog_cache import product_index
+from app.service.catalog_store import build_catalog
+from app.service.edible_client import _normalize_product
+from app.service.suggest import SuggestIndex, suggest_index
+from scripts.stub_servers import synthetic_catalog
+
+
+def _products(n: int) -> list[dict]:
+    return [_normalize_product(p) for p in synthetic_catalog(n)]
+
+
+def test_word_prefixes_and_ranking():
+    index = SuggestIndex()
+    index.add([
+        {"id": "1", "name": "Berry Birthday Box®", "price": 49.99, "url": "https://x/fruit-gifts/berry-bday-box"},
+        {"id": "2", "name": "Birthday Bouquet", "price": 39.99, "occasion": "Birthday"},
+        {"id": "3", "name": "Birthday Celebration Deluxe Bouquet", "price": 89.99, "occasion": "Birthday"},
+    ])
+    assert [s["id"] for s in index.suggest("berry bir")] == ["1"]
+    assert [s["id"] for s in index.suggest("BERRY-BDAY")] == ["1"]  # Slug
+    results = index.suggest("birth")
+    assert results[0] == {"type": "occasion", "text": "Birthday", "count": 2}
+    # Name starts before mid-name matches, shorter names first
+    assert [s["id"] for s in results[1:]] == ["2", "3", "1"]
+    assert index.suggest("b") == [] and index.suggest("zzz") == []
+
+
+def test_incremental_add_and_rename():
+    index = SuggestIndex()
+    assert index.add([{"id": "1", "name": "Fruit Bouquet"}]) == 1
+    assert index.add([{"id": "1", "name": "Fruit Bouquet"}]) == 0
+    assert index.add([{"id": "1", "name": "Fruit Bouquet", "price": 10}]) == 0  # Price only
+    assert index.suggest("fruit")[0]["price"] == 10
+    assert index.add([{"id": "1", "name": "Melon Bouquet"}, {"id": "2", "name": "Fruit Box"}]) == 2
+    assert [s["id"] for s in index.suggest("fruit")] == ["2"]
+    assert [s["id"] for s in index.suggest("melon")] == ["1"]
+    keys, refs = index._entries
+    assert keys == sorted(keys) and len(keys) == len(refs) == 4
+
+
+def test_lookup_is_sub_millisecond():
+    index = SuggestIndex()
+    products = _products(5000)
+    for i in range(0, len(products), 50):  # Batches, like search results arriving
+        index.add(products[i:i + 50])
+    for query in ("bi", "birthday berry", "chocolate dipped straw"):
+        start = time.perf_counter()
+        for _ in range(200):
+            assert index.suggest(query)
+        assert (time.perf_counter() - start) / 200 < 0.001
+
+
+def test_search_results_and_catalog_file_feed_the_index(tmp_path, monkeypatch):
+    product_index.update(_products(3))
+    assert [s["id"] for s in suggest_index.suggest("birthday chocolate")] == ["1000"]
+
+    path = tmp_path / "catalog.bin"
+    build_catalog([{k: v for k, v in p.items() if k != "_search_score"} for p in _products(40)], path)
+    monkeypatch.setenv("CATALOG_FILE", str(path))
+    monkeypatch.setattr(catalog_store, "CATALOG_RECHECK_SECONDS", 0.0)
+    catalog_store.reset_catalog()
+    try:
+        expected = {p["id"] for p in _products(40) if p["name"].startswith("Anniversary Luxe")}
+        assert expected and {s["id"] for s in suggest_index.suggest("anniversary luxe")} == expected
+    finally:
+        catalog_store.reset_catalog()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(flask_app, "_popular_products", [{"id": "p1", "name": "Sunny Day Bouquet", "price": 45}])
+    return flask_app.app.test_client()
+
+
+def test_suggest_endpoint(client):
+    res = client.get("/api/suggest?q=sunny")
+    assert res.status_code == 200 and res.cache_control.max_age == flask_app.SUGGEST_MAX_AGE
+    assert res.get_json() == {
+        "query": "sunny",
+        "suggestions": [{"type": "product", "text": "Sunny Day Bouquet", "id": "p1", "price": 45}],
+    }
+    assert client.get("/api/suggest?q=s").get_json()["suggestions"] == []
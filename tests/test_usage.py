@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Test LLM token usage accounting (offline, fake OpenAI client)."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.service import llm_client, metrics, usage
+
+
+class _FakeResponses:
+    def __init__(self, text: str, input_tokens: int, cached: int, output_tokens: int):
+        self._response = SimpleNamespace(
+            output_text=text,
+            model="gpt-4o-mini",
+            usage=SimpleNamespace(
+                input_tokens=input_tokens,
+                input_tokens_details=SimpleNamespace(cached_tokens=cached),
+                output_tokens=output_tokens,
+            ),
+        )
+
+    def create(self, **kwargs):
+        return self._response
+
+
+def _fake_client(monkeypatch, **kw):
+    client = SimpleNamespace(responses=_FakeResponses(**kw))
+    monkeypatch.setattr(llm_client, "_get_client", lambda: client)
+
+
+def test_calls_are_tagged_and_rolled_up(monkeypatch):
+    metrics.reset()
+    _fake_client(monkeypatch, text='{"ok": true}', input_tokens=1000, cached=400, output_tokens=50)
+
+    with usage.track_request("conv-1") as calls:
+        llm_client.complete_json("sys", "hi", call_site="intent")
+        llm_client.complete("sys", "hi", call_site="greeting")
+
+    assert [c["call_site"] for c in calls] == ["intent", "greeting"]
+    totals = usage.summarize(calls)
+    assert totals["calls"] == 2
+    assert totals["input_tokens"] == 2000
+    assert totals["cached_tokens"] == 800
+    assert totals["output_tokens"] == 100
+    assert totals["by_call_site"]["intent"]["calls"] == 1
+    # 600 uncached @0.15 + 400 cached @0.075 + 50 out @0.60 per 1M
+    assert abs(totals["by_call_site"]["intent"]["cost_usd"] - 0.00015) < 1e-9
+
+    with usage.track_request("conv-1"):
+        llm_client.complete("sys", "again", call_site="followup")
+    conv = usage.conversation_usage("conv-1")
+    assert conv["calls"] == 3
+    assert set(conv["by_call_site"]) == {"intent", "greeting", "followup"}
+
+    text = metrics.render_prometheus()
+    assert 'llm_calls_total{call_site="intent",model="gpt-4o-mini"} 1' in text
+    assert 'llm_input_tokens_total{call_site="followup",model="gpt-4o-mini"} 1000' in text
+    assert "llm_latency_seconds_count" in text
+
+
+def test_calls_outside_request_only_export_metrics(monkeypatch):
+    metrics.reset()
+    _fake_client(monkeypatch, text="hello", input_tokens=10, cached=0, output_tokens=2)
+    assert llm_client.complete("sys", "hi", call_site="warmup") == "hello"
+    assert usage.current_calls() == []
+    assert metrics.snapshot()["counters"]["llm_calls_total{call_site=warmup,model=gpt-4o-mini}"] == 1
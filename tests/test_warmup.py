@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Test catalog warm-up, the search cache and the readiness endpoint (local search stand-in)."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import flask_app
+from app.service import warmup
+from app.service.catalog_cache import SearchCache, product_index, search_cache
+from app.service.edible_client import EdibleAPIClient
+from scripts.stub_servers import StubEdibleServer
+
+
+@pytest.fixture
+def edible(monkeypatch):
+    monkeypatch.setitem(warmup._state, "status", "pending")
+    monkeypatch.setitem(warmup._state, "first_started_at", None)
+    with StubEdibleServer() as server:
+        monkeypatch.setattr(EdibleAPIClient, "BASE_URL", server.url)
+        yield server
+
+
+def test_keywords_include_expansions_and_top_queries(monkeypatch):
+    monkeypatch.setenv("WARMUP_KEYWORDS", "birthday, Birthday ,anniversary")
+    search_cache.get("fruit bouquet for mom")  # Counts as a recent query
+    keywords = warmup.warmup_keywords()
+    assert keywords[:2] == ["birthday", "anniversary"]
+    assert "gifts under $50" in keywords and "luxury" in keywords
+    assert "fruit bouquet for mom" in keywords
+    assert len(keywords) == len({k.lower() for k in keywords})
+
+
+def test_warmup_populates_cache_and_index(edible):
+    status = warmup.run_warmup(["birthday", "anniversary"], concurrency=2)
+    assert status["ready"] and status["done"] == 2 and status["failed"] == 0
+    assert search_cache.contains("birthday")
+    assert len(product_index) > 0
+
+    calls = len(edible.requests)
+    products = EdibleAPIClient().search("  BIRTHDAY ")["products"]
+    assert products and len(edible.requests) == calls  # Served from the warm cache
+
+
+def test_readiness_endpoint_tracks_warmup(edible, monkeypatch):
+    monkeypatch.setattr(flask_app, "WARMUP_ON_START", True)
+    client = flask_app.app.test_client()
+
+    res = client.get("/ready")
+    assert res.status_code == 503 and res.get_json()["status"] == "pending"
+
+    warmup.run_warmup(["gift"])
+    res = client.get("/ready")
+    assert res.status_code == 200 and res.get_json()["ready"] is True
+
+
+def test_failed_pass_is_not_ready_until_timeout(edible, monkeypatch):
+    monkeypatch.setattr(EdibleAPIClient, "BASE_URL", "http://127.0.0.1:9/api/search/")
+    status = warmup.run_warmup(["birthday", "anniversary"])
+    assert status["status"] == "failed" and not status["ready"] and status["failed"] == 2
+
+    monkeypatch.setattr(warmup, "WARMUP_READY_TIMEOUT", 0.0)
+    assert warmup.warmup_status()["ready"]
+
+
+def test_query_counts_decay_and_stay_bounded():
+    cache = SearchCache(max_query_keys=4)
+    for _ in range(4):
+        cache.get("birthday")
+    cache.get("anniversary")
+    cache.decay_queries()
+    assert cache.top_queries() == ["birthday"]  # Seen once: forgotten
+
+    for i in range(10):
+        cache.get(f"query {i}")
+    assert len(cache._query_counts) <= 4 and cache.top_queries(1) == ["birthday"]
+
+
+def test_comparison_precompute_runs_after_a_scheduled_pass(edible, monkeypatch):
+    monkeypatch.setenv("WARMUP_KEYWORDS", "birthday")
+    monkeypatch.setattr(warmup, "precompute_comparisons", lambda: time.sleep(0.5))
+    monkeypatch.setattr(warmup, "_precompute", None)
+    warmup.run_warmup(["birthday"])
+    assert warmup._precompute is None  # A direct (pre-fork) pass starts no threads
+
+    start = time.perf_counter()
+    warmup.start_warmup_scheduler(interval=0).join(timeout=5)
+    assert warmup.warmup_status()["ready"] and time.perf_counter() - start < 0.4
+    thread = warmup.start_precompute()  # Still running: not started twice
+    assert thread is warmup._precompute and thread.is_alive()
+    thread.join()
+
+
+def test_forked_worker_waits_before_its_first_pass(edible):
+    calls = len(edible.requests)
+    thread = warmup.start_warmup_scheduler(interval=0, first_delay=5)
+    warmup.stop_warmup_scheduler()
+    thread.join(timeout=1)
+    assert not thread.is_alive() and len(edible.requests) == calls